@@ -200,6 +200,24 @@ STATIC_URL = "http://localhost:8000/static/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
+# Chunked uploads of attachments. The chunks are written to
+# a private directory (outside MEDIA_ROOT) until the upload
+# is complete and the attachment is created. The abandoned
+# uploads are removed by the remove_expired_uploads command
+# (run it periodically).
+ATTACHMENTS_UPLOADS_PATH = os.path.join(BASE_DIR, "uploads")
+ATTACHMENTS_UPLOADS_MAX_AGE = 60 * 60 * 24  # seconds
+ATTACHMENTS_UPLOADS_MAX_CHUNK_SIZE = 5 * 1024 * 1024  # bytes
+ATTACHMENTS_UPLOADS_MAX_SIZE = 100 * 1024 * 1024  # bytes
+
+# Attachment downloads are offloaded to the web server using
+# "X-Accel-Redirect" (nginx) or "X-Sendfile" (apache, lighttpd).
+# With X-Accel-Redirect, ATTACHMENTS_SENDFILE_URL must be an
+# internal location pointing to MEDIA_ROOT. If no header is
+# set, downloads are redirected to the attachment url.
+ATTACHMENTS_SENDFILE_HEADER = None
+ATTACHMENTS_SENDFILE_URL = "/protected/"
+
 STATICFILES_FINDERS = [
     "django.contrib.staticfiles.finders.FileSystemFinder",
     "django.contrib.staticfiles.finders.AppDirectoriesFinder",
@@ -221,6 +239,7 @@ TEMPLATE_LOADERS = [
 ]
 
 MIDDLEWARE_CLASSES = [
+    "taiga.base.middleware.instrumentation.InstrumentationMiddleware",
     "taiga.base.middleware.cors.CoorsMiddleware",
     "taiga.events.middleware.SessionIDMiddleware",
 
@@ -377,6 +396,21 @@ AUTHENTICATION_BACKENDS = (
 MAX_AGE_AUTH_TOKEN = None
 MAX_AGE_CANCEL_ACCOUNT = 30 * 24 * 60 * 60 # 30 days in seconds
 
+# Caches used by the token authentication
+VERIFIED_TOKENS_CACHE_SIZE = 10000
+USERS_CACHE_TIMEOUT = 60  # In seconds
+USERS_LOCAL_CACHE_TIMEOUT = 5  # In seconds
+USERS_LOCAL_CACHE_SIZE = 1000
+
+# Milestone stats and burndown data
+MILESTONES_STATS_CACHE_TIMEOUT = 60 * 60 * 24  # In seconds
+
+# Rendered markdown texts
+MDRENDER_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # In seconds
+
+# Number of rows loaded per query in the csv exports
+CSV_EXPORT_CHUNK_SIZE = 500
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         # Mainly used by taiga-front
@@ -466,10 +500,35 @@ EXPORTS_TTL = 60 * 60 * 24  # 24 hours
 CELERY_ENABLED = False
 WEBHOOKS_ENABLED = False
 
+# Store the history entries (and the timeline entries, webhooks and
+# notifications that follow them) in background workers instead of
+# in the requests. The snapshots of every object are stored in order.
+HISTORY_ASYNC_ENABLED = False
+
+# Store the history entries without locking the object, retrying them
+# when other entry of the object was stored meanwhile (only when the
+# history is stored in the requests).
+HISTORY_OPTIMISTIC_SNAPSHOTS = False
+HISTORY_OPTIMISTIC_RETRIES = 5
+
+# Log a warning when the lock of an object history is waited for
+# longer than this (in seconds).
+HISTORY_LOCK_WAIT_WARNING = 1
+
+# Record the SQL queries, cache lookups, time and response size of the
+# requests by endpoint (returned in the response headers in debug mode)
+# and log a warning for the requests that run too many queries.
+API_METRICS_ENABLED = False
+API_METRICS_QUERIES_WARNING = 100
+# The metrics aggregated by every process are logged every
+# API_METRICS_LOG_INTERVAL seconds (None to disable it).
+API_METRICS_LOG_INTERVAL = 60 * 5
+
 
 # If is True /front/sitemap.xml show a valid sitemap of taiga-front client
 FRONT_SITEMAP_ENABLED = False
 FRONT_SITEMAP_CACHE_TIMEOUT = 24*60*60  # In second
+FRONT_SITEMAP_PATH = os.path.join(MEDIA_ROOT, "sitemaps")
 
 
 from .sr import *
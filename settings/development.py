@@ -19,6 +19,8 @@ from .common import *
 DEBUG = True
 TEMPLATE_DEBUG = DEBUG
 
+API_METRICS_ENABLED = True
+
 TEMPLATE_CONTEXT_PROCESSORS += [
     "django.core.context_processors.debug",
 ]
@@ -22,6 +22,7 @@ CELERY_ALWAYS_EAGER = True
 CELERY_ENABLED = False
 
 MEDIA_ROOT = "/tmp"
+ATTACHMENTS_UPLOADS_PATH = "/tmp/uploads"
 
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 INSTALLED_APPS = INSTALLED_APPS + [
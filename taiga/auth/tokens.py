@@ -14,12 +14,19 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import time
+
 from taiga.base import exceptions as exc
+from taiga.base.utils.lru import LRUCache
 
-from django.apps import apps
+from django.conf import settings
 from django.core import signing
 from django.utils.translation import ugettext as _
 
+# Verified tokens, so the signature of the tokens of the most
+# active clients is not checked on every request.
+_verified_tokens = LRUCache(maxsize=getattr(settings, "VERIFIED_TOKENS_CACHE_SIZE", 10000))
+
 
 def get_token_for_user(user, scope):
     """
@@ -30,6 +37,20 @@ def get_token_for_user(user, scope):
     return signing.dumps(data)
 
 
+def _loads_token(token, max_age=None):
+    cached = _verified_tokens.get(token)
+    if cached is None:
+        data = signing.loads(token, max_age=max_age)
+        timestamp = signing.b62_decode(token.rsplit(":", 2)[1])
+        _verified_tokens.set(token, (data, timestamp))
+        return data
+
+    data, timestamp = cached
+    if max_age is not None and time.time() - timestamp > max_age:
+        raise signing.SignatureExpired("Signature age > {} seconds".format(max_age))
+    return data
+
+
 def get_user_for_token(token, scope, max_age=None):
     """
     Given a selfcontained token and a scope try to parse and
@@ -41,16 +62,18 @@ def get_user_for_token(token, scope, max_age=None):
     a user instance corresponding with user_id stored
     in the incoming token.
     """
+    from taiga.users.services import get_cached_user
+
     try:
-        data = signing.loads(token, max_age=max_age)
+        data = _loads_token(token, max_age=max_age)
     except signing.BadSignature:
         raise exc.NotAuthenticated(_("Invalid token"))
 
-    model_cls = apps.get_model("users", "User")
-
     try:
-        user = model_cls.objects.get(pk=data["user_%s_id" % (scope)])
-    except (model_cls.DoesNotExist, KeyError):
+        user = get_cached_user(data["user_%s_id" % (scope)])
+    except KeyError:
+        raise exc.NotAuthenticated(_("Invalid token"))
+
+    if user is None:
         raise exc.NotAuthenticated(_("Invalid token"))
-    else:
-        return user
+    return user
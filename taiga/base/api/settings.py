@@ -79,6 +79,7 @@ DEFAULTS = {
         "user": None,
         "anon": None,
     },
+    "DEFAULT_THROTTLE_STORAGE_CLASS": "taiga.base.api.throttling.CacheThrottleStorage",
 
     # Pagination
     "PAGINATE_BY": None,
@@ -141,6 +142,7 @@ IMPORT_STRINGS = (
     "DEFAULT_AUTHENTICATION_CLASSES",
     "DEFAULT_PERMISSION_CLASSES",
     "DEFAULT_THROTTLE_CLASSES",
+    "DEFAULT_THROTTLE_STORAGE_CLASS",
     "DEFAULT_CONTENT_NEGOTIATION_CLASS",
     "DEFAULT_MODEL_SERIALIZER_CLASS",
     "DEFAULT_FILTER_BACKENDS",
@@ -26,9 +26,94 @@ from django.core.exceptions import ImproperlyConfigured
 
 from .settings import api_settings
 
+import threading
 import time
 
 
+class BaseThrottleStorage(object):
+    """
+    Storage of the requests made by every throttle key.
+    """
+    def hit(self, key, num_requests, duration, now):
+        """
+        Register a request for `key` and return a two tuple of: <if the
+        request is allowed>, <seconds to wait for the next allowed request>.
+        It must be atomic, concurrent requests can't be lost.
+        """
+        raise NotImplementedError(".hit() must be overridden")
+
+
+class CacheThrottleStorage(BaseThrottleStorage):
+    """
+    Fixed window counters stored in the default cache. The window of a key
+    starts with its first request and every check is a single atomic `incr`
+    (one round trip with memcached or redis).
+    """
+    cache = default_cache
+
+    def hit(self, key, num_requests, duration, now):
+        start_key = "{}_start".format(key)
+        try:
+            count = self.cache.incr(key)
+        except ValueError:
+            # The key doesn't exist or has expired, start a new window
+            if self.cache.add(key, 1, duration):
+                self.cache.set(start_key, now, duration)
+                count = 1
+            else:
+                count = self.cache.incr(key)
+
+        if count <= num_requests:
+            return (True, None)
+
+        start = self.cache.get(start_key, now)
+        return (False, max(start + duration - now, 0))
+
+
+class LocalMemoryThrottleStorage(BaseThrottleStorage):
+    """
+    Fixed window counters stored in the memory of the process. Useful for
+    tests and single process deployments.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def hit(self, key, num_requests, duration, now):
+        with self._lock:
+            start, count = self._windows.get(key, (None, 0))
+            if start is None or now - start >= duration:
+                start, count = now, 0
+
+            count += 1
+            self._windows[key] = (start, count)
+
+        if count <= num_requests:
+            return (True, None)
+        return (False, max(start + duration - now, 0))
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+
+_storages = {}
+
+
+def get_throttle_storage(storage_class=None):
+    """
+    Get the shared instance of a throttle storage class (by default
+    `DEFAULT_THROTTLE_STORAGE_CLASS`).
+    """
+    if storage_class is None:
+        storage_class = api_settings.DEFAULT_THROTTLE_STORAGE_CLASS
+
+    storage = _storages.get(storage_class, None)
+    if storage is None:
+        storage = _storages.setdefault(storage_class, storage_class())
+    return storage
+
+
 class BaseThrottle(object):
     """
     Rate throttling of requests.
@@ -57,12 +142,13 @@ class SimpleRateThrottle(BaseThrottle):
 
     Period should be one of: ("s", "sec", "m", "min", "h", "hour", "d", "day")
 
-    Previous request information used for throttling is stored in the cache.
+    The number of requests made in the current window is stored in the
+    throttle storage (see `DEFAULT_THROTTLE_STORAGE_CLASS`).
     """
 
-    cache = default_cache
+    storage_class = None
     timer = time.time
-    cache_format = "throtte_%(scope)s_%(ident)s"
+    cache_format = "throttle_%(scope)s_%(ident)s"
     scope = None
     THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
 
@@ -121,24 +207,17 @@ class SimpleRateThrottle(BaseThrottle):
         if self.key is None:
             return True
 
-        self.history = self.cache.get(self.key, [])
         self.now = self.timer()
-
-        # Drop any requests from the history which have now passed the
-        # throttle duration
-        while self.history and self.history[-1] <= self.now - self.duration:
-            self.history.pop()
-        if len(self.history) >= self.num_requests:
+        storage = get_throttle_storage(self.storage_class)
+        allowed, self.wait_duration = storage.hit(self.key, self.num_requests, self.duration, self.now)
+        if not allowed:
             return self.throttle_failure()
         return self.throttle_success()
 
     def throttle_success(self):
         """
-        Inserts the current request's timestamp along with the key
-        into the cache.
+        Called when a request to the API has been allowed.
         """
-        self.history.insert(0, self.now)
-        self.cache.set(self.key, self.history, self.duration)
         return True
 
     def throttle_failure(self):
@@ -151,16 +230,7 @@ class SimpleRateThrottle(BaseThrottle):
         """
         Returns the recommended next request time in seconds.
         """
-        if self.history:
-            remaining_duration = self.duration - (self.now - self.history[-1])
-        else:
-            remaining_duration = self.duration
-
-        available_requests = self.num_requests - len(self.history) + 1
-        if available_requests <= 0:
-            return None
-
-        return remaining_duration / float(available_requests)
+        return getattr(self, "wait_duration", None)
 
 
 class AnonRateThrottle(SimpleRateThrottle):
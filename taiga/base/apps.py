@@ -15,8 +15,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.apps import AppConfig
+from django.db.models import signals
 
 
 class BaseAppConfig(AppConfig):
     name = "taiga.base"
     verbose_name = "Base App Config"
+
+    def ready(self):
+        from taiga.base.utils import db
+        db.build_models_registry()
+        signals.post_migrate.connect(db.clear_content_type_ids_cache,
+                                     dispatch_uid="clear_content_type_ids_cache")
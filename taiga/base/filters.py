@@ -23,6 +23,7 @@ from django.utils.translation import ugettext as _
 
 from taiga.base import exceptions as exc
 from taiga.base.api.utils import get_object_or_404
+from taiga.base.utils.db import get_content_type_id_for_typename
 
 
 logger = logging.getLogger(__name__)
@@ -117,6 +118,23 @@ class FilterBackend(OrderByFilterMixin):
 # Permissions filters
 #####################################################################
 
+def get_projects_with_permission_subquery(user, permission, project_id=None):
+    """
+    Return a subquery with the ids of the projects where `user` has
+    `permission` by its role or because it is the owner.
+
+    It's meant to be used in `__in` filters so the permissions check is
+    done by the database (as a semi-join) in the same query.
+    """
+    membership_model = apps.get_model("projects", "Membership")
+    memberships_qs = membership_model.objects.filter(user=user)
+    if project_id:
+        memberships_qs = memberships_qs.filter(project_id=project_id)
+    memberships_qs = memberships_qs.filter(Q(role__permissions__contains=[permission]) |
+                                           Q(is_owner=True))
+    return memberships_qs.values("project_id")
+
+
 class PermissionBasedFilterBackend(FilterBackend):
     permission = None
 
@@ -137,16 +155,9 @@ class PermissionBasedFilterBackend(FilterBackend):
         if request.user.is_authenticated() and request.user.is_superuser:
             qs = qs
         elif request.user.is_authenticated():
-            membership_model = apps.get_model('projects', 'Membership')
-            memberships_qs = membership_model.objects.filter(user=request.user)
-            if project_id:
-                memberships_qs = memberships_qs.filter(project_id=project_id)
-            memberships_qs = memberships_qs.filter(Q(role__permissions__contains=[self.permission]) |
-                                                   Q(is_owner=True))
-
-            projects_list = [membership.project_id for membership in memberships_qs]
-
-            qs = qs.filter(Q(project_id__in=projects_list) |
+            projects_qs = get_projects_with_permission_subquery(request.user, self.permission,
+                                                                project_id=project_id)
+            qs = qs.filter(Q(project_id__in=projects_qs) |
                            Q(project__public_permissions__contains=[self.permission]))
         else:
             qs = qs.filter(project__anon_permissions__contains=[self.permission])
@@ -188,8 +199,8 @@ class PermissionBasedAttachmentFilterBackend(PermissionBasedFilterBackend):
     def filter_queryset(self, request, queryset, view):
         qs = super().filter_queryset(request, queryset, view)
 
-        ct = view.get_content_type()
-        return qs.filter(content_type=ct)
+        ct_id = get_content_type_id_for_typename(view.content_type)
+        return qs.filter(content_type_id=ct_id)
 
 
 class CanViewUserStoryAttachmentFilterBackend(PermissionBasedAttachmentFilterBackend):
@@ -226,16 +237,9 @@ class CanViewProjectObjFilterBackend(FilterBackend):
         if request.user.is_authenticated() and request.user.is_superuser:
             qs = qs
         elif request.user.is_authenticated():
-            membership_model = apps.get_model("projects", "Membership")
-            memberships_qs = membership_model.objects.filter(user=request.user)
-            if project_id:
-                memberships_qs = memberships_qs.filter(project_id=project_id)
-            memberships_qs = memberships_qs.filter(Q(role__permissions__contains=['view_project']) |
-                                                   Q(is_owner=True))
-
-            projects_list = [membership.project_id for membership in memberships_qs]
-
-            qs = qs.filter((Q(id__in=projects_list) |
+            projects_qs = get_projects_with_permission_subquery(request.user, "view_project",
+                                                                project_id=project_id)
+            qs = qs.filter((Q(id__in=projects_qs) |
                             Q(public_permissions__contains=["view_project"])))
         else:
             qs = qs.filter(anon_permissions__contains=["view_project"])
@@ -277,22 +281,15 @@ class MembersFilterBackend(PermissionBasedFilterBackend):
         if request.user.is_authenticated() and request.user.is_superuser:
             qs = qs
         elif request.user.is_authenticated():
-            Membership = apps.get_model('projects', 'Membership')
-            memberships_qs = Membership.objects.filter(user=request.user)
-            if project_id:
-                memberships_qs = memberships_qs.filter(project_id=project_id)
-            memberships_qs = memberships_qs.filter(Q(role__permissions__contains=[self.permission]) |
-                                                   Q(is_owner=True))
-
-            projects_list = [membership.project_id for membership in memberships_qs]
+            projects_qs = get_projects_with_permission_subquery(request.user, self.permission,
+                                                                project_id=project_id)
 
             if project:
-                is_member = project.id in projects_list
                 has_project_public_view_permission = "view_project" in project.public_permissions
-                if not is_member and not has_project_public_view_permission:
+                if not has_project_public_view_permission and not projects_qs.exists():
                     qs = qs.none()
 
-            q = Q(memberships__project_id__in=projects_list) | Q(id=request.user.id)
+            q = Q(memberships__project_id__in=projects_qs) | Q(id=request.user.id)
 
             #If there is no selected project we want access to users from public projects
             if not project:
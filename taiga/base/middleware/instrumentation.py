@@ -0,0 +1,140 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from taiga.base.utils import instrumentation
+
+
+log = logging.getLogger("taiga.instrumentation")
+
+
+class InstrumentationMiddleware(object):
+    """
+    Record the SQL queries, the cache lookups, the time waiting for locks,
+    the time and the size of the response of every request. They are aggregated by endpoint and,
+    in debug mode, returned in the response headers too. The metrics of
+    the streaming responses are recorded when their content is consumed.
+    """
+
+    def __init__(self):
+        if not getattr(settings, "API_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed()
+
+    def process_request(self, request):
+        request._metrics = instrumentation.start_request_metrics()
+        request._metrics_start = time.monotonic()
+
+        # The queries are only logged by the debug cursor
+        request._metrics_use_debug_cursor = connection.use_debug_cursor
+        request._metrics_queries_start = len(connection.queries)
+        connection.use_debug_cursor = True
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, "_metrics", None)
+        if metrics is None:
+            return None
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None and resolver_match.url_name:
+            metrics.endpoint = resolver_match.url_name
+        else:
+            metrics.endpoint = request.path
+
+        view_cls = getattr(view_func, "cls", None)
+        view_name = view_cls.__name__ if view_cls else view_func.__name__
+        metrics.view = "{} {}".format(request.method, view_name)
+        return None
+
+    def process_response(self, request, response):
+        metrics = getattr(request, "_metrics", None)
+        if metrics is None:
+            return response
+
+        if response.streaming:
+            # The queries run, and the content is generated, while the response is sent
+            response.streaming_content = _StreamingContentMetrics(self, request,
+                                                                  response.streaming_content)
+            return response
+
+        metrics.payload_size = len(response.content)
+        self._finish(request)
+
+        if settings.DEBUG:
+            response["X-Queries-Count"] = metrics.queries
+            response["X-Queries-Time"] = "{:.3f}".format(metrics.queries_time)
+            response["X-Cache-Hits"] = metrics.cache_hits
+            response["X-Cache-Misses"] = metrics.cache_misses
+            response["X-Lock-Wait"] = "{:.3f}".format(metrics.lock_wait)
+            response["X-Payload-Size"] = metrics.payload_size
+            response["X-Response-Time"] = "{:.3f}".format(metrics.time)
+
+        return response
+
+    def _finish(self, request):
+        metrics = request._metrics
+        queries = connection.queries[request._metrics_queries_start:]
+        connection.use_debug_cursor = request._metrics_use_debug_cursor
+
+        metrics.queries = len(queries)
+        metrics.queries_time = sum(float(query["time"]) for query in queries)
+        metrics.time = time.monotonic() - request._metrics_start
+
+        instrumentation.finish_request_metrics(metrics)
+
+        if metrics.queries >= getattr(settings, "API_METRICS_QUERIES_WARNING", 100):
+            log_fn = log.warning
+        else:
+            log_fn = log.debug
+
+        log_fn("%s %s: %s queries (%.3fs), %s cache hits, %s cache misses, %.3fs waiting for locks, "
+               "%s bytes, %.3fs", request.method, request.path, metrics.queries, metrics.queries_time,
+               metrics.cache_hits, metrics.cache_misses, metrics.lock_wait, metrics.payload_size,
+               metrics.time)
+
+
+class _StreamingContentMetrics(object):
+    """
+    Count the size of the content of a streaming response and finish the
+    metrics of its request when it's consumed (or the response closed).
+    """
+
+    def __init__(self, middleware, request, content):
+        self.middleware = middleware
+        self.request = request
+        self.content = content
+        self.finished = False
+
+    def __iter__(self):
+        for chunk in self.content:
+            self.request._metrics.payload_size += len(chunk)
+            yield chunk
+
+        self.close()
+
+    def close(self):
+        if self.finished:
+            return
+
+        self.finished = True
+        self.middleware._finish(self.request)
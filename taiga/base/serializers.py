@@ -0,0 +1,155 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.query import QuerySet
+
+from taiga.base.api import serializers
+
+
+class ValuesListSerializer(object):
+    """
+    Read only serializer for list endpoints that builds its output from
+    `.values()` rows instead of model instances.
+
+    The output keys are the ones of `serializer_class`, the regular
+    serializer of the endpoint, and every key is resolved into an accessor
+    only once per class:
+
+    - `get_<key>(self, row)` methods of the subclass,
+    - `related_serializers` entries (`key: (fk_name, serializer_class)`),
+      serialized once for every distinct related object of the list,
+    - many to many fields, loaded for the whole list with one query,
+    - foreign keys and plain model fields, read from the row and converted
+      with the `to_native` of the `serializer_class` field.
+
+    `values_lookups` adds extra lookups (joins) to the rows and `prepare()`
+    can be extended to load any other data of the list in bulk.
+    """
+    serializer_class = None
+    values_lookups = ()
+    related_serializers = {}
+
+    def __init__(self, instance=None, data=None, files=None, many=False, partial=False, context=None):
+        assert data is None and files is None, "ValuesListSerializer is read only"
+        assert many, "ValuesListSerializer only serializes lists"
+        self.object = instance
+        self.context = context or {}
+        self._data = None
+
+    @classmethod
+    def get_accessors(cls):
+        if "_accessors" not in cls.__dict__:
+            cls._accessors = cls._build_accessors()
+        return cls._accessors
+
+    @classmethod
+    def _build_accessors(cls):
+        model = cls.serializer_class.Meta.model
+        accessors = []
+        values_fields = [model._meta.pk.name]
+        m2m_fields = []
+
+        for key, field in cls.serializer_class().get_fields().items():
+            method = getattr(cls, "get_{}".format(key), None)
+            if method is not None:
+                accessors.append((key, method))
+                continue
+
+            if key in cls.related_serializers:
+                fk_name, _ = cls.related_serializers[key]
+                values_fields.append(fk_name)
+                accessors.append((key, lambda self, row, key=key, fk_name=fk_name:
+                                            self._related[key].get(row[fk_name], None)))
+                continue
+
+            name = getattr(field, "source", None) or key
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured("{} needs a get_{} method".format(cls.__name__, key))
+
+            if isinstance(model_field, models.ManyToManyField):
+                m2m_fields.append(name)
+                accessors.append((key, lambda self, row, name=name: self._m2m[name].get(row["pk"], [])))
+            elif model_field.rel is not None:
+                values_fields.append(name)
+                accessors.append((key, lambda self, row, name=name: row[name]))
+            elif isinstance(field, serializers.ModelField):
+                raise ImproperlyConfigured("{} needs a get_{} method".format(cls.__name__, key))
+            else:
+                values_fields.append(name)
+                accessors.append((key, lambda self, row, name=name, to_native=field.to_native:
+                                            to_native(row[name])))
+
+        values_fields += [lookup for lookup in cls.values_lookups if lookup not in values_fields]
+        return accessors, values_fields, m2m_fields
+
+    def get_rows(self, values_fields):
+        model = self.serializer_class.Meta.model
+        queryset = self.object
+        if isinstance(queryset, QuerySet):
+            queryset = queryset.prefetch_related(None)
+        else:
+            ids = [obj.pk for obj in queryset]
+            queryset = model.objects.filter(pk__in=ids).order_by()
+
+        rows = list(queryset.values(*values_fields))
+        for row in rows:
+            row["pk"] = row[model._meta.pk.name]
+
+        if not isinstance(self.object, QuerySet):
+            rows_by_id = {row["pk"]: row for row in rows}
+            rows = [rows_by_id[id] for id in ids]
+        return rows
+
+    def prepare(self, rows):
+        """
+        Load the data of all the rows that is not in the rows themselves.
+        """
+        model = self.serializer_class.Meta.model
+        accessors, values_fields, m2m_fields = self.get_accessors()
+        ids = [row["pk"] for row in rows]
+
+        self._m2m = {}
+        for name in m2m_fields:
+            self._m2m[name] = defaultdict(list)
+            values = model.objects.filter(pk__in=ids).order_by().values_list("pk", name)
+            for id, related_id in values:
+                if related_id is not None:
+                    self._m2m[name][id].append(related_id)
+
+        self._related = {}
+        for key, (fk_name, serializer_class) in self.related_serializers.items():
+            related_model = model._meta.get_field(fk_name).rel.to
+            related_ids = {row[fk_name] for row in rows if row[fk_name] is not None}
+            related = related_model.objects.in_bulk(related_ids) if related_ids else {}
+            self._related[key] = {id: serializer_class(obj, context=self.context).data
+                                  for id, obj in related.items()}
+
+    @property
+    def data(self):
+        if self._data is None:
+            accessors, values_fields, m2m_fields = self.get_accessors()
+            rows = self.get_rows(values_fields)
+            self.prepare(rows)
+            self._data = [{key: accessor(self, row) for key, accessor in accessors} for row in rows]
+        return self._data
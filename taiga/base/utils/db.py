@@ -14,12 +14,75 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from types import MappingProxyType
+
+from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 
 from . import functions
 
 
+# Registry of the installed models by typename, built once when all the
+# apps are ready (see `build_models_registry`).
+_models_registry = MappingProxyType({})
+
+# ContentType ids by typename, loaded with a single query the first time
+# one of them is needed and discarded when the content types are updated.
+_content_type_ids = None
+
+
+def build_models_registry():
+    """
+    Build the immutable registry of the installed models by typename.
+    """
+    global _models_registry
+    registry = {}
+    for model in apps.get_models(include_auto_created=True):
+        registry[get_typename_for_model_class(model)] = model._meta.concrete_model
+    _models_registry = MappingProxyType(registry)
+
+
+def clear_content_type_ids_cache(**kwargs):
+    global _content_type_ids
+    _content_type_ids = None
+
+
+def get_model_from_typename(typename:str):
+    """
+    Get the model class for a typename (`app_label.model_name`).
+    """
+    model = _models_registry.get(typename, None)
+    if model is None:
+        app_label, model_name = typename.split(".", 1)
+        model = apps.get_model(app_label, model_name)
+    return model
+
+
+def get_content_type_id_for_typename(typename:str) -> int:
+    """
+    Get the ContentType id for a typename without querying the database
+    more than once per process.
+    """
+    global _content_type_ids
+    if _content_type_ids is None:
+        qs = ContentType.objects.values_list("app_label", "model", "id")
+        _content_type_ids = {"{0}.{1}".format(app_label, model): id for app_label, model, id in qs}
+
+    content_type_id = _content_type_ids.get(typename, None)
+    if content_type_id is None:
+        content_type_id = ContentType.objects.get_for_model(get_model_from_typename(typename)).id
+        _content_type_ids[typename] = content_type_id
+    return content_type_id
+
+
+def get_content_type_id_for_model(model:object) -> int:
+    """
+    Get the ContentType id for a model class or instance.
+    """
+    return get_content_type_id_for_typename(get_typename_for_model_class(model))
+
+
 def get_typename_for_model_class(model:object, for_concrete_model=True) -> str:
     """
     Get typename for model instance.
@@ -36,8 +99,7 @@ def get_typename_for_model_instance(model_instance):
     """
     Get content type tuple from model instance.
     """
-    ct = ContentType.objects.get_for_model(model_instance)
-    return ".".join([ct.app_label, ct.model])
+    return get_typename_for_model_class(model_instance.__class__)
 
 
 def reload_attribute(model_instance, attr_name):
@@ -0,0 +1,247 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Per request instrumentation of the API: the SQL queries, the cache
+lookups, the time waiting for locks, the time and the size of the
+response of every request, aggregated by endpoint. The time waiting
+for locks is aggregated by lock name too (requests and workers). The
+aggregated metrics of every process are logged every
+`API_METRICS_LOG_INTERVAL` seconds.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+log = logging.getLogger("taiga.instrumentation")
+
+_local = threading.local()
+
+_endpoint_metrics = {}
+_endpoint_metrics_lock = threading.Lock()
+
+_lock_wait_metrics = {}
+
+# Lists that receive the metrics of every finished request
+_recorders = []
+
+_metrics_logged_at = None
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.endpoint = None
+        self.view = None
+        self.queries = 0
+        self.queries_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.lock_wait = 0.0
+        self.lock_conflicts = 0
+        self.payload_size = 0
+        self.time = 0.0
+
+
+def start_request_metrics() -> RequestMetrics:
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def get_request_metrics() -> RequestMetrics:
+    """
+    Get the metrics of the request being processed in this thread,
+    or None if there is no one.
+    """
+    return getattr(_local, "metrics", None)
+
+
+def finish_request_metrics(metrics:RequestMetrics=None):
+    """
+    Aggregate the metrics of a finished request (by default, the one
+    being processed in this thread).
+    """
+    if metrics is None:
+        metrics = get_request_metrics()
+    if get_request_metrics() is metrics:
+        _local.metrics = None
+    if metrics is None or metrics.endpoint is None:
+        return
+
+    with _endpoint_metrics_lock:
+        stats = _endpoint_metrics.setdefault(metrics.endpoint, {
+            "view": metrics.view,
+            "requests": 0,
+            "queries": 0,
+            "max_queries": 0,
+            "queries_time": 0.0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "lock_wait": 0.0,
+            "max_lock_wait": 0.0,
+            "lock_conflicts": 0,
+            "payload_size": 0,
+            "max_payload_size": 0,
+            "time": 0.0,
+            "max_time": 0.0,
+        })
+        stats["requests"] += 1
+        stats["queries"] += metrics.queries
+        stats["max_queries"] = max(stats["max_queries"], metrics.queries)
+        stats["queries_time"] += metrics.queries_time
+        stats["cache_hits"] += metrics.cache_hits
+        stats["cache_misses"] += metrics.cache_misses
+        stats["lock_wait"] += metrics.lock_wait
+        stats["max_lock_wait"] = max(stats["max_lock_wait"], metrics.lock_wait)
+        stats["lock_conflicts"] += metrics.lock_conflicts
+        stats["payload_size"] += metrics.payload_size
+        stats["max_payload_size"] = max(stats["max_payload_size"], metrics.payload_size)
+        stats["time"] += metrics.time
+        stats["max_time"] = max(stats["max_time"], metrics.time)
+
+        for recorder in _recorders:
+            recorder.append(metrics)
+
+    _log_metrics_periodically()
+
+
+def record_cache_lookup(hit:bool):
+    """
+    Count a lookup in the cache in the metrics of the current request.
+    """
+    metrics = get_request_metrics()
+    if metrics is None:
+        return
+
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def record_lock_wait(name:str, wait:float=0, conflict:bool=False):
+    """
+    Count the time waited for a lock (or a conflict of an operation
+    that doesn't take it) in the metrics of the current request and of
+    the lock `name`.
+    """
+    metrics = get_request_metrics()
+    if metrics is not None:
+        if conflict:
+            metrics.lock_conflicts += 1
+        else:
+            metrics.lock_wait += wait
+
+    with _endpoint_metrics_lock:
+        stats = _lock_wait_metrics.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0,
+                                                     "conflicts": 0})
+        if conflict:
+            stats["conflicts"] += 1
+        else:
+            stats["count"] += 1
+            stats["total"] += wait
+            stats["max"] = max(stats["max"], wait)
+
+    _log_metrics_periodically()
+
+
+def get_lock_wait_metrics() -> dict:
+    """
+    Get the time waited for every lock, and the number of conflicts of
+    the operations that don't take it, in this process.
+    """
+    with _endpoint_metrics_lock:
+        return {name: dict(stats) for name, stats in _lock_wait_metrics.items()}
+
+
+def get_endpoint_metrics() -> dict:
+    """
+    Get the metrics of the requests processed by this process, by
+    endpoint (the name of the url).
+    """
+    with _endpoint_metrics_lock:
+        return {endpoint: dict(stats) for endpoint, stats in _endpoint_metrics.items()}
+
+
+def log_metrics():
+    """
+    Log the metrics of the endpoints and the locks aggregated by this
+    process since it started.
+    """
+    endpoint_metrics = sorted(get_endpoint_metrics().items(), key=lambda item: -item[1]["time"])
+    for endpoint, stats in endpoint_metrics:
+        requests = stats["requests"]
+        log.info("%s (%s): %s requests; per request %.1f queries (max %s), %.3fs (max %.3fs), "
+                 "%.3fs waiting for locks (max %.3fs), %.0f bytes (max %s); %s cache hits, "
+                 "%s cache misses, %s lock conflicts", endpoint, stats["view"], requests,
+                 stats["queries"] / requests, stats["max_queries"], stats["time"] / requests,
+                 stats["max_time"], stats["lock_wait"] / requests, stats["max_lock_wait"],
+                 stats["payload_size"] / requests, stats["max_payload_size"], stats["cache_hits"],
+                 stats["cache_misses"], stats["lock_conflicts"])
+
+    for name, stats in sorted(get_lock_wait_metrics().items()):
+        log.info("Lock %s: %s waits, %.3fs (max %.3fs), %s conflicts", name, stats["count"],
+                 stats["total"], stats["max"], stats["conflicts"])
+
+
+def _log_metrics_periodically():
+    global _metrics_logged_at
+
+    interval = getattr(settings, "API_METRICS_LOG_INTERVAL", 60 * 5)
+    if not interval:
+        return
+
+    now = time.monotonic()
+    with _endpoint_metrics_lock:
+        if _metrics_logged_at is None:
+            _metrics_logged_at = now
+        if now - _metrics_logged_at < interval:
+            return
+        _metrics_logged_at = now
+
+    log_metrics()
+
+
+def reset_endpoint_metrics():
+    with _endpoint_metrics_lock:
+        _endpoint_metrics.clear()
+        _lock_wait_metrics.clear()
+
+
+@contextmanager
+def record_requests():
+    """
+    Collect the metrics of the requests finished inside the block.
+
+        with record_requests() as requests:
+            client.get(url)
+
+        assert requests[0].queries < 10
+    """
+    recorder = []
+    with _endpoint_metrics_lock:
+        _recorders.append(recorder)
+
+    try:
+        yield recorder
+    finally:
+        with _endpoint_metrics_lock:
+            _recorders.remove(recorder)
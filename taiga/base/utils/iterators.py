@@ -56,3 +56,16 @@ def iter_queryset(queryset, itersize:int=20):
         page = paginator.page(page_num)
         for element in page.object_list:
             yield element
+
+
+def iter_queryset_chunks(queryset, chunk_size:int=500):
+    """
+    Iterate over a queryset in lists of `chunk_size` instances.
+
+    The primary keys are fetched once (keeping the queryset ordering) and
+    every chunk is loaded with its own query, so `select_related` and
+    `prefetch_related` cost a constant number of queries per chunk.
+    """
+    ids = list(queryset.values_list("pk", flat=True))
+    for chunk_ids in split_by_n(ids, chunk_size):
+        yield list(queryset.filter(pk__in=chunk_ids))
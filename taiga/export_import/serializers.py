@@ -234,7 +234,7 @@ class HistoryExportSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = history_models.HistoryEntry
-        exclude = ("id", "comment_html", "key")
+        exclude = ("id", "comment_html", "key", "key_version")
 
 
 class HistoryExportSerializerMixin(serializers.ModelSerializer):
@@ -486,7 +486,7 @@ class TaskExportSerializer(CustomAttributesValuesExportSerializerMixin, HistoryE
 
     class Meta:
         model = tasks_models.Task
-        exclude = ('id', 'project')
+        exclude = ('id', 'project', 'description_html', 'blocked_note_html')
 
     def custom_attributes_queryset(self, project):
         return project.taskcustomattributes.all()
@@ -505,7 +505,7 @@ class UserStoryExportSerializer(CustomAttributesValuesExportSerializerMixin, His
 
     class Meta:
         model = userstories_models.UserStory
-        exclude = ('id', 'project', 'points', 'tasks')
+        exclude = ('id', 'project', 'points', 'tasks', 'description_html', 'blocked_note_html')
 
     def custom_attributes_queryset(self, project):
         return project.userstorycustomattributes.all()
@@ -526,7 +526,7 @@ class IssueExportSerializer(CustomAttributesValuesExportSerializerMixin, History
 
     class Meta:
         model = issues_models.Issue
-        exclude = ('id', 'project')
+        exclude = ('id', 'project', 'description_html', 'blocked_note_html', 'total_voters')
 
     def get_votes(self, obj):
         return [x.email for x in votes_service.get_voters(obj)]
@@ -621,7 +621,7 @@ class ProjectExportSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = projects_models.Project
-        exclude = ('id', 'creation_template', 'members')
+        exclude = ('id', 'creation_template', 'members', 'total_voters')
 
     def get_timeline(self, obj):
         timeline_qs = timeline_service.get_project_timeline(obj)
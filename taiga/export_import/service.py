@@ -215,16 +215,17 @@ def store_task(project, data):
         serialized.object._importing = True
         serialized.object._not_notify = True
 
-        serialized.save()
-
         if serialized.object.ref:
+            serialized.save()
+
             sequence_name = refs.make_sequence_name(project)
             if not seq.exists(sequence_name):
                 seq.create(sequence_name)
             seq.set_max(sequence_name, serialized.object.ref)
         else:
-            serialized.object.ref, _ = refs.make_reference(serialized.object, project)
-            serialized.object.save()
+            refs.reserve_references_in_bulk([serialized.object], project)
+            serialized.save()
+            refs.store_references_in_bulk([serialized.object], project)
 
         for task_attachment in data.get("attachments", []):
             store_attachment(project, serialized.object, task_attachment)
@@ -372,16 +373,17 @@ def store_user_story(project, data):
         serialized.object._importing = True
         serialized.object._not_notify = True
 
-        serialized.save()
-
         if serialized.object.ref:
+            serialized.save()
+
             sequence_name = refs.make_sequence_name(project)
             if not seq.exists(sequence_name):
                 seq.create(sequence_name)
             seq.set_max(sequence_name, serialized.object.ref)
         else:
-            serialized.object.ref, _ = refs.make_reference(serialized.object, project)
-            serialized.object.save()
+            refs.reserve_references_in_bulk([serialized.object], project)
+            serialized.save()
+            refs.store_references_in_bulk([serialized.object], project)
 
         for us_attachment in data.get("attachments", []):
             store_attachment(project, serialized.object, us_attachment)
@@ -432,16 +434,17 @@ def store_issue(project, data):
         serialized.object._importing = True
         serialized.object._not_notify = True
 
-        serialized.save()
-
         if serialized.object.ref:
+            serialized.save()
+
             sequence_name = refs.make_sequence_name(project)
             if not seq.exists(sequence_name):
                 seq.create(sequence_name)
             seq.set_max(sequence_name, serialized.object.ref)
         else:
-            serialized.object.ref, _ = refs.make_reference(serialized.object, project)
-            serialized.object.save()
+            refs.reserve_references_in_bulk([serialized.object], project)
+            serialized.save()
+            refs.store_references_in_bulk([serialized.object], project)
 
         for attachment in data.get("attachments", []):
             store_attachment(project, serialized.object, attachment)
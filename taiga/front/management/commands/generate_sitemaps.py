@@ -0,0 +1,43 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from taiga.front.sitemaps import generator
+
+
+class Command(BaseCommand):
+    help = 'Write the gzip compressed front sitemap files'
+    option_list = BaseCommand.option_list + (
+        make_option('--incremental',
+                    action='store_true',
+                    dest='incremental',
+                    default=False,
+                    help='Only write the pages with items modified since the last generation'),
+        )
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        if not settings.FRONT_SITEMAP_ENABLED:
+            raise CommandError("FRONT_SITEMAP_ENABLED is False")
+
+        generator.generate_sitemaps(incremental=options["incremental"])
+        self.stdout.write("Sitemaps written in {0}".format(generator.get_sitemaps_path()))
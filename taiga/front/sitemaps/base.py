@@ -19,10 +19,13 @@ from django.contrib.sitemaps import Sitemap as DjangoSitemap
 
 class Sitemap(DjangoSitemap):
     def get_urls(self, page=1, site=None, protocol=None):
+        return self.get_urls_for_items(self.paginator.page(page).object_list)
+
+    def get_urls_for_items(self, items):
         urls = []
         latest_lastmod = None
         all_items_lastmod = True  # track if all items have a lastmod
-        for item in self.paginator.page(page).object_list:
+        for item in items:
             loc = self.__get('location', item)
             priority = self.__get('priority', item, None)
             lastmod = self.__get('lastmod', item, None)
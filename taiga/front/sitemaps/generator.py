@@ -0,0 +1,235 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from datetime import datetime
+from functools import reduce
+from operator import or_
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.db.models import Q
+from django.db.models.query import QuerySet
+from django.template import loader
+from django.utils import timezone
+
+from taiga.base.utils.urls import get_absolute_url
+
+from . import sitemaps
+from .base import Sitemap
+
+
+PAGE_SIZE = Sitemap.limit
+CHUNK_SIZE = 1000
+INDEX_FILE_NAME = "sitemap.xml"
+
+_section_file_name_re = re.compile(r"^sitemap-(?P<section>[\w-]+)-(?P<page>\d+)\.xml\.gz$")
+
+
+def get_sitemaps_path():
+    return settings.FRONT_SITEMAP_PATH
+
+
+def get_section_file_name(section:str, page:int) -> str:
+    return "sitemap-{0}-{1}.xml.gz".format(section, page)
+
+
+def _get_manifest_file_name(section:str) -> str:
+    return "sitemap-{0}.json".format(section)
+
+
+def _read_manifest(section:str) -> dict:
+    try:
+        with open(os.path.join(get_sitemaps_path(), _get_manifest_file_name(section))) as f:
+            return {int(page): digest for page, digest in json.load(f).items()}
+    except (IOError, ValueError):
+        return {}
+
+
+def _get_pages_digests(items) -> dict:
+    """
+    Get a digest of the primary keys of the items of every page, so the
+    pages that lost or gained items can be found.
+    """
+    digests = {}
+    for pk in items.order_by("pk").values_list("pk", flat=True).iterator():
+        digests.setdefault(pk // PAGE_SIZE + 1, hashlib.sha1()).update("{},".format(pk).encode("ascii"))
+    return {page: digest.hexdigest() for page, digest in digests.items()}
+
+
+def _write_file(file_name:str, content:str, compress:bool=False):
+    # Write in a temporal file and rename it so the served files are always complete
+    path = get_sitemaps_path()
+    fd, tmp_path = tempfile.mkstemp(dir=path)
+    with os.fdopen(fd, "wb") as f:
+        data = content.encode("utf-8")
+        f.write(gzip.compress(data) if compress else data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, os.path.join(path, file_name))
+
+
+def _remove_file(file_name:str):
+    path = os.path.join(get_sitemaps_path(), file_name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _iter_items(items):
+    """
+    Iterate over the items of a sitemap. Querysets are iterated by primary key
+    (keyset pagination) instead of using OFFSET.
+    """
+    if not isinstance(items, QuerySet):
+        yield from items
+        return
+
+    items = items.order_by("pk")
+    last_pk = None
+    while True:
+        chunk_qs = items if last_pk is None else items.filter(pk__gt=last_pk)
+        chunk = list(chunk_qs[:CHUNK_SIZE])
+        if not chunk:
+            break
+
+        yield from chunk
+        last_pk = chunk[-1].pk
+
+
+def _get_page(item) -> int:
+    # Every page is a fixed range of primary keys, so a change only affects its page
+    pk = getattr(item, "pk", None)
+    return 1 if pk is None else pk // PAGE_SIZE + 1
+
+
+def _has_modified_date(items) -> bool:
+    return (isinstance(items, QuerySet) and
+            "modified_date" in [field.name for field in items.model._meta.fields])
+
+
+def generate_section(section:str, sitemap:Sitemap, since:datetime=None) -> list:
+    """
+    Write the sitemap files of a section. If `since` is set and the items have
+    a `modified_date`, only the pages with items modified after it, or that
+    lost or gained items (deleted or hidden ones too), are written.
+
+    Return the written pages.
+    """
+    items = sitemap.items()
+
+    digests = _get_pages_digests(items) if isinstance(items, QuerySet) else None
+    incremental = since is not None and _has_modified_date(items)
+    if incremental:
+        previous_digests = _read_manifest(section)
+        modified_pks = items.filter(modified_date__gt=since).values_list("pk", flat=True)
+        pages = {pk // PAGE_SIZE + 1 for pk in modified_pks}
+        pages |= {page for page, digest in digests.items() if previous_digests.get(page) != digest}
+
+        for page in set(previous_digests) - set(digests):
+            _remove_file(get_section_file_name(section, page))
+
+        items = items.filter(reduce(or_, [Q(pk__gte=(page - 1) * PAGE_SIZE, pk__lt=page * PAGE_SIZE)
+                                          for page in pages] or [Q(pk__in=[])]))
+
+    written_pages = []
+
+    def write_page(page, page_items):
+        urls = sitemap.get_urls_for_items(page_items)
+        content = loader.render_to_string("sitemap.xml", {"urlset": urls})
+        _write_file(get_section_file_name(section, page), content, compress=True)
+        written_pages.append(page)
+
+    current_page = None
+    page_items = []
+    for item in _iter_items(items):
+        page = _get_page(item)
+        if page != current_page and page_items:
+            write_page(current_page, page_items)
+            page_items = []
+
+        current_page = page
+        page_items.append(item)
+
+    if page_items:
+        write_page(current_page, page_items)
+
+    if not incremental:
+        # Remove the pages without items
+        for file_name in os.listdir(get_sitemaps_path()):
+            match = _section_file_name_re.match(file_name)
+            if (match and match.group("section") == section and
+                    int(match.group("page")) not in written_pages):
+                _remove_file(file_name)
+
+    if digests is not None:
+        _write_file(_get_manifest_file_name(section), json.dumps(digests))
+
+    return written_pages
+
+
+def generate_index():
+    """
+    Write the sitemap index with all the section files.
+    """
+    locations = []
+    for section in sitemaps:
+        section_files = []
+        for file_name in os.listdir(get_sitemaps_path()):
+            match = _section_file_name_re.match(file_name)
+            if match and match.group("section") == section:
+                section_files.append((int(match.group("page")), file_name))
+
+        for page, file_name in sorted(section_files):
+            locations.append(get_absolute_url(reverse("front-sitemap", kwargs={"file_name": file_name})))
+
+    content = loader.render_to_string("sitemap_index.xml", {"sitemaps": locations})
+    _write_file(INDEX_FILE_NAME, content)
+
+
+def get_last_generation_date():
+    """
+    Get the date of the last generation of the sitemaps or None.
+    """
+    index_path = os.path.join(get_sitemaps_path(), INDEX_FILE_NAME)
+    if not os.path.exists(index_path):
+        return None
+    return datetime.fromtimestamp(os.path.getmtime(index_path), tz=timezone.utc)
+
+
+def generate_sitemaps(incremental:bool=False):
+    """
+    Write all the sitemap files. With `incremental` only the pages with items
+    modified since the last generation, or whose items changed, are written.
+    """
+    started = time.time()
+    os.makedirs(get_sitemaps_path(), exist_ok=True)
+
+    since = get_last_generation_date() if incremental else None
+    for section, sitemap_class in sitemaps.items():
+        generate_section(section, sitemap_class(), since=since)
+
+    generate_index()
+
+    # The index modification date is the start of the generation, so the
+    # items modified while it was running are included in the next one
+    os.utime(os.path.join(get_sitemaps_path(), INDEX_FILE_NAME), (started, started))
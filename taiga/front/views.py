@@ -0,0 +1,61 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import time
+
+from django import http
+from django.conf import settings
+from django.core.cache import cache
+from django.views.static import serve
+
+from .sitemaps import generator
+from . import tasks
+
+
+GENERATION_CACHE_KEY = "front-sitemaps-generation"
+GENERATION_RETRY_AFTER = 60 * 10  # 10 minutes
+
+
+def _queue_generation(incremental:bool):
+    # Only one generation is queued every GENERATION_RETRY_AFTER seconds
+    if cache.add(GENERATION_CACHE_KEY, True, GENERATION_RETRY_AFTER):
+        tasks.generate_sitemaps.delay(incremental=incremental)
+
+
+def sitemap_index(request):
+    last_generation_date = generator.get_last_generation_date()
+    if last_generation_date is None:
+        # The sitemaps are never fully generated in a request, that is
+        # done by the generate_sitemaps command or a background worker
+        if settings.CELERY_ENABLED:
+            _queue_generation(incremental=False)
+
+        response = http.HttpResponse(status=503)
+        response["Retry-After"] = GENERATION_RETRY_AFTER
+        return response
+
+    if time.time() - last_generation_date.timestamp() > settings.FRONT_SITEMAP_CACHE_TIMEOUT:
+        # Without a background worker the generate_sitemaps command must be run
+        # periodically, the current files are served meanwhile
+        if settings.CELERY_ENABLED:
+            _queue_generation(incremental=True)
+
+    return serve(request, generator.INDEX_FILE_NAME, document_root=generator.get_sitemaps_path())
+
+
+def sitemap(request, file_name):
+    return serve(request, file_name, document_root=generator.get_sitemaps_path())
@@ -15,3 +15,5 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .service import *
+
+default_app_config = "taiga.mdrender.apps.MdRenderAppConfig"
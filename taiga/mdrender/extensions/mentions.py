@@ -23,8 +23,11 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import re
+
 from markdown.extensions import Extension
 from markdown.inlinepatterns import Pattern
+from markdown.preprocessors import Preprocessor
 from markdown.util import etree, AtomicString
 
 from taiga.users.models import User
@@ -36,15 +39,51 @@ class MentionsExtension(Extension):
         mentionsPattern = MentionsPattern(MENTION_RE)
         mentionsPattern.md = md
         md.inlinePatterns.add('mentions', mentionsPattern, '_end')
+        md.preprocessors.add('mentions', MentionsPreprocessor(md, mentionsPattern), '_begin')
+
+
+# Mentions glued to a previous word are almost always emails (already
+# handled by the automail extension), so they are not prefetched.
+MENTION_CANDIDATE_RE = re.compile(r'(?<![\w.-])@([a-z0-9.-\.]+)')
+
+
+class MentionsPreprocessor(Preprocessor):
+    """
+    Collect every mentioned username in the text and fetch all the users
+    at once, so the pattern does not need to run a query for each match.
+    """
+    def __init__(self, md, pattern):
+        self.pattern = pattern
+        super().__init__(md)
+
+    def run(self, lines):
+        usernames = set(MENTION_CANDIDATE_RE.findall("\n".join(lines)))
+        users = User.objects.filter(username__in=usernames) if usernames else []
+        self.pattern.users = {user.username: user for user in users}
+        self.pattern.prefetched = usernames
+        return lines
 
 
 class MentionsPattern(Pattern):
-    def handleMatch(self, m):
-        username = m.group(3)
+    def __init__(self, pattern):
+        self.users = {}
+        self.prefetched = set()
+        super().__init__(pattern)
+
+    def _get_user(self, username):
+        if username in self.prefetched:
+            return self.users.get(username, None)
 
         try:
-            user = User.objects.get(username=username)
+            return User.objects.get(username=username)
         except User.DoesNotExist:
+            return None
+
+    def handleMatch(self, m):
+        username = m.group(3)
+
+        user = self._get_user(username)
+        if user is None:
             return "@{}".format(username)
 
         url = "/profile/{}".format(username)
@@ -23,35 +23,55 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import re
+
 from markdown.extensions import Extension
 from markdown.inlinepatterns import Pattern
+from markdown.preprocessors import Preprocessor
 from markdown.util import etree
 
-from taiga.projects.references.services import get_instance_by_ref
+from taiga.projects.references.services import get_instances_by_refs
 from taiga.front.templatetags.functions import resolve
 
 
 class TaigaReferencesExtension(Extension):
-    def __init__(self, project, *args, **kwargs):
-        self.project = project
-        return super().__init__(*args, **kwargs)
-
     def extendMarkdown(self, md, md_globals):
         TAIGA_REFERENCE_RE = r'(?<=^|(?<=[^a-zA-Z0-9-\[]))#(\d+)'
-        referencesPattern = TaigaReferencesPattern(TAIGA_REFERENCE_RE, self.project)
+        referencesPattern = TaigaReferencesPattern(TAIGA_REFERENCE_RE)
         referencesPattern.md = md
         md.inlinePatterns.add('taiga-references', referencesPattern, '_begin')
+        md.preprocessors.add('taiga-references',
+                             TaigaReferencesPreprocessor(md, referencesPattern),
+                             '_begin')
+
+
+REFERENCE_CANDIDATE_RE = re.compile(r'#(\d+)')
+
+
+class TaigaReferencesPreprocessor(Preprocessor):
+    """
+    Collect every ref in the text and resolve all of them at once, so the
+    pattern does not need to run a query for each match.
+    """
+    def __init__(self, md, pattern):
+        self.pattern = pattern
+        super().__init__(md)
+
+    def run(self, lines):
+        obj_refs = {int(ref) for ref in REFERENCE_CANDIDATE_RE.findall("\n".join(lines))}
+        self.pattern.instances = get_instances_by_refs(self.markdown.project.id, obj_refs)
+        return lines
 
 
 class TaigaReferencesPattern(Pattern):
-    def __init__(self, pattern, project):
-        self.project = project
+    def __init__(self, pattern):
+        self.instances = {}
         super().__init__(pattern)
 
     def handleMatch(self, m):
         obj_ref = m.group(2)
 
-        instance = get_instance_by_ref(self.project.id, obj_ref)
+        instance = self.instances.get(int(obj_ref), None)
         if instance is None or instance.content_object is None:
             return "#{}".format(obj_ref)
 
@@ -66,7 +86,7 @@ class TaigaReferencesPattern(Pattern):
         else:
             return "#{}".format(obj_ref)
 
-        url = resolve(instance.content_type.model, self.project.slug, obj_ref)
+        url = resolve(instance.content_type.model, self.md.project.slug, obj_ref)
 
         link_text = "&num;{}".format(obj_ref)
 
@@ -16,8 +16,12 @@
 
 import hashlib
 import functools
+import threading
+import uuid
 import bleach
 
+from contextlib import contextmanager
+
 # BEGIN PATCH
 import html5lib
 from html5lib.serializer.htmlserializer import HTMLSerializer
@@ -35,11 +39,14 @@ def _serialize(domtree):
 bleach._serialize = _serialize
 # END PATCH
 
+from django.conf import settings
 from django.core.cache import cache
 from django.utils.encoding import force_bytes
 
 from markdown import Markdown
 
+from taiga.base.utils.instrumentation import record_cache_lookup
+
 from .extensions.autolink import AutolinkExtension
 from .extensions.automail import AutomailExtension
 from .extensions.semi_sane_lists import SemiSaneListExtension
@@ -64,16 +71,16 @@ bleach.ALLOWED_ATTRIBUTES["img"] = ["alt", "src"]
 bleach.ALLOWED_ATTRIBUTES["*"] = ["class", "style", "id"]
 
 
-def _make_extensions_list(project=None):
+def _make_extensions_list():
     return [AutolinkExtension(),
             AutomailExtension(),
             SemiSaneListExtension(),
             SpacedLinkExtension(),
             StrikethroughExtension(),
-            WikiLinkExtension(project),
+            WikiLinkExtension(),
             EmojifyExtension(),
             MentionsExtension(),
-            TaigaReferencesExtension(project),
+            TaigaReferencesExtension(),
             TargetBlankLinkExtension(),
             "extra",
             "codehilite",
@@ -85,41 +92,98 @@ def _make_extensions_list(project=None):
 import diff_match_patch
 
 
+def _get_cache_timeout():
+    return getattr(settings, "MDRENDER_CACHE_TIMEOUT", 60 * 60 * 24 * 7)
+
+
+def _make_render_version_key(project_id):
+    return "mdrender-version-{}".format(project_id)
+
+
+def get_render_version(project):
+    """
+    Get the current render version of a project. It changes every time
+    something that can be referenced from a text of the project changes,
+    so it is used to invalidate the cached renders.
+    """
+    key = _make_render_version_key(project.id)
+    version = cache.get(key)
+    if version is None:
+        # A random value, so a evicted version never matches old renders
+        cache.add(key, uuid.uuid4().hex, timeout=_get_cache_timeout())
+        version = cache.get(key)
+    return version
+
+
+def invalidate_render_cache(project_id):
+    key = _make_render_version_key(project_id)
+    cache.set(key, uuid.uuid4().hex, timeout=_get_cache_timeout())
+
+
 def cache_by_sha(func):
     @functools.wraps(func)
     def _decorator(project, text):
         sha1_hash = hashlib.sha1(force_bytes(text)).hexdigest()
-        key = "{}-{}".format(sha1_hash, project.id)
+        key = "{}-{}-{}-{}".format(func.__name__, sha1_hash, project.id,
+                                   get_render_version(project))
 
         # Try to get it from the cache
         cached = cache.get(key)
+        record_cache_lookup(cached is not None)
         if cached is not None:
             return cached
 
         returned_value = func(project, text)
-        cache.set(key, returned_value, timeout=None)
+        cache.set(key, returned_value, timeout=_get_cache_timeout())
         return returned_value
 
     return _decorator
 
 
-def _get_markdown(project):
-    extensions = _make_extensions_list(project=project)
-    md = Markdown(extensions=extensions)
+# Building a Markdown instance (and its extensions) is expensive, so every
+# thread keeps a pool of configured instances that are reset between uses.
+_local = threading.local()
+
+
+def _reset_markdown(md, project):
+    md.reset()
+
+    # The abbreviations found in a text are registered as new inline
+    # patterns and md.reset() doesn't remove them.
+    for key in [key for key in md.inlinePatterns.keys() if key.startswith("abbr-")]:
+        del md.inlinePatterns[key]
+
+    md.project = project
     md.extracted_data = {"mentions": [], "references": []}
-    return md
+
+
+@contextmanager
+def _get_markdown(project):
+    pool = getattr(_local, "markdown_pool", None)
+    if pool is None:
+        pool = _local.markdown_pool = []
+
+    md = pool.pop() if pool else Markdown(extensions=_make_extensions_list())
+    _reset_markdown(md, project)
+
+    try:
+        yield md
+    finally:
+        md.project = None
+        pool.append(md)
 
 
 @cache_by_sha
 def render(project, text):
-    md = _get_markdown(project)
-    return bleach.clean(md.convert(text))
+    with _get_markdown(project) as md:
+        return bleach.clean(md.convert(text))
 
 
+@cache_by_sha
 def render_and_extract(project, text):
-    md = _get_markdown(project)
-    result = bleach.clean(md.convert(text))
-    return (result, md.extracted_data)
+    with _get_markdown(project) as md:
+        result = bleach.clean(md.convert(text))
+        return (result, md.extracted_data)
 
 
 class DiffMatchPatch(diff_match_patch.diff_match_patch):
@@ -143,4 +207,4 @@ def get_diff_of_htmls(html1, html2):
     diffutil.diff_cleanupSemantic(diffs)
     return diffutil.diff_pretty_html(diffs)
 
-__all__ = ["render", "get_diff_of_htmls", "render_and_extract"]
+__all__ = ["render", "get_diff_of_htmls", "render_and_extract", "invalidate_render_cache"]
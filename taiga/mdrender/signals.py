@@ -0,0 +1,38 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from .service import invalidate_render_cache
+
+
+# The rendered texts of the project show the ref and the subject of the
+# referenced items, and new items make new refs resolvable.
+
+def cache_prev_referenced_item_values(sender, instance, **kwargs):
+    instance._mdrender_prev_values = None
+    if instance.id:
+        instance._mdrender_prev_values = (sender.objects.filter(id=instance.id)
+                                                        .values_list("ref", "subject")
+                                                        .first())
+
+
+def invalidate_render_cache_when_change_referenced_item(sender, instance, created, **kwargs):
+    prev_values = getattr(instance, "_mdrender_prev_values", None)
+    if created or prev_values != (instance.ref, instance.subject):
+        invalidate_render_cache(instance.project_id)
+
+
+def invalidate_render_cache_when_delete_referenced_item(sender, instance, **kwargs):
+    invalidate_render_cache(instance.project_id)
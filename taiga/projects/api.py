@@ -46,7 +46,6 @@ from . import services
 
 from .votes import serializers as votes_serializers
 from .votes import services as votes_service
-from .votes.utils import attach_votescount_to_queryset
 
 ######################################################
 ## Project
@@ -75,8 +74,7 @@ class ProjectViewSet(HistoryResourceMixin, ModelCrudViewSet):
         return response.NoContent(data=None)
 
     def get_queryset(self):
-        qs = models.Project.objects.all()
-        return attach_votescount_to_queryset(qs, as_field="stars_count")
+        return models.Project.objects.all()
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -160,6 +158,13 @@ class ProjectViewSet(HistoryResourceMixin, ModelCrudViewSet):
         self.check_permissions(request, "issues_stats", project)
         return response.Ok(services.get_stats_for_project_issues(project))
 
+    @detail_route(methods=["GET"])
+    def tags(self, request, pk=None):
+        project = self.get_object()
+        self.check_permissions(request, "tags", project)
+        prefix = request.QUERY_PARAMS.get("q", None)
+        return response.Ok(services.get_tags_dictionary(project, prefix=prefix))
+
     @detail_route(methods=["GET"])
     def tags_colors(self, request, pk=None):
         project = self.get_object()
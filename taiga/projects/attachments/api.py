@@ -15,16 +15,21 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os.path as path
+import re
 import mimetypes
 mimetypes.init()
 
+from django.conf import settings
+
 from django.utils.translation import ugettext as _
-from django.contrib.contenttypes.models import ContentType
 
 from taiga.base import filters
 from taiga.base import exceptions as exc
+from taiga.base import response
 from taiga.base.api import ModelCrudViewSet
-from taiga.base.api.utils import get_object_or_404
+from taiga.base.api import viewsets
+from taiga.base.decorators import detail_route
+from taiga.base.utils.db import get_content_type_id_for_typename
 
 from taiga.projects.notifications.mixins import WatchedResourceMixin
 from taiga.projects.history.mixins import HistoryResourceMixin
@@ -32,6 +37,7 @@ from taiga.projects.history.mixins import HistoryResourceMixin
 from . import permissions
 from . import serializers
 from . import models
+from . import services
 
 
 class BaseAttachmentViewSet(HistoryResourceMixin, WatchedResourceMixin, ModelCrudViewSet):
@@ -41,19 +47,26 @@ class BaseAttachmentViewSet(HistoryResourceMixin, WatchedResourceMixin, ModelCru
 
     content_type = None
 
+    def get_serializer(self, instance=None, data=None, files=None, many=False, partial=False):
+        # The file of a chunked upload can be attached using its token
+        # instead of sending the file again.
+        self._upload = None
+        if instance is None and data is not None and data.get("upload", None):
+            self._upload = services.get_upload(data["upload"], self.request.user)
+            files = {"attached_file": services.get_upload_file(self._upload)}
+
+        return super().get_serializer(instance=instance, data=data, files=files,
+                                      many=many, partial=partial)
+
     def update(self, *args, **kwargs):
         partial = kwargs.get("partial", False)
         if not partial:
             raise exc.NotSupported(_("Non partial updates not supported"))
         return super().update(*args, **kwargs)
 
-    def get_content_type(self):
-        app_name, model = self.content_type.split(".", 1)
-        return get_object_or_404(ContentType, app_label=app_name, model=model)
-
     def pre_save(self, obj):
         if not obj.id:
-            obj.content_type = self.get_content_type()
+            obj.content_type_id = get_content_type_id_for_typename(self.content_type)
             obj.owner = self.request.user
             obj.size = obj.attached_file.size
             obj.name = path.basename(obj.attached_file.name)
@@ -63,6 +76,13 @@ class BaseAttachmentViewSet(HistoryResourceMixin, WatchedResourceMixin, ModelCru
 
         super().pre_save(obj)
 
+    def post_save(self, obj, created=False):
+        if created and getattr(self, "_upload", None):
+            obj.attached_file.close()
+            services.remove_upload(self._upload)
+
+        super().post_save(obj, created)
+
     def post_delete(self, obj):
         # NOTE: When destroy an attachment, the content_object change
         #       after and not before
@@ -72,6 +92,12 @@ class BaseAttachmentViewSet(HistoryResourceMixin, WatchedResourceMixin, ModelCru
     def get_object_for_snapshot(self, obj):
         return obj.content_object
 
+    @detail_route(methods=["GET"])
+    def download(self, request, pk=None):
+        attachment = self.get_object()
+        self.check_permissions(request, "download", attachment)
+        return services.get_download_response(attachment)
+
 
 class UserStoryAttachmentViewSet(BaseAttachmentViewSet):
     permission_classes = (permissions.UserStoryAttachmentPermission,)
@@ -95,3 +121,61 @@ class WikiAttachmentViewSet(BaseAttachmentViewSet):
     permission_classes = (permissions.WikiAttachmentPermission,)
     filter_backends = (filters.CanViewWikiAttachmentFilterBackend,)
     content_type = "wiki.wikipage"
+
+
+class AttachmentUploadViewSet(viewsets.ViewSet):
+    """
+    Resumable chunked uploads. A client starts an upload with its name and
+    size, sends the chunks in order with a `Content-Range` header and, when
+    complete, creates the attachment sending the upload token as `upload`.
+    """
+    permission_classes = (permissions.AttachmentUploadPermission,)
+    content_range_re = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+    def _serialize_upload(self, token, upload):
+        return {"id": token, "name": upload["name"], "size": upload["size"],
+                "offset": upload["offset"]}
+
+    def create(self, request, **kwargs):
+        self.check_permissions(request, "create", None)
+
+        name = request.DATA.get("name", None)
+        try:
+            size = int(request.DATA.get("size", None))
+        except (TypeError, ValueError):
+            size = None
+
+        if not name or not size or size < 0:
+            raise exc.WrongArguments(_("Invalid upload name or size"))
+
+        token = services.create_upload(request.user, path.basename(name), size)
+        upload = services.get_upload(token, request.user)
+        return response.Created(self._serialize_upload(token, upload))
+
+    def retrieve(self, request, pk=None):
+        self.check_permissions(request, "retrieve", None)
+        upload = services.get_upload(pk, request.user)
+        return response.Ok(self._serialize_upload(pk, upload))
+
+    def update(self, request, pk=None, **kwargs):
+        self.check_permissions(request, "update", None)
+        upload = services.get_upload(pk, request.user)
+
+        match = self.content_range_re.match(request.META.get("HTTP_CONTENT_RANGE", ""))
+        if not match:
+            raise exc.WrongArguments(_("Invalid Content-Range header"))
+
+        start, end, total = (int(value) for value in match.groups())
+        length = end - start + 1
+        if total != upload["size"] or length <= 0 or end >= total:
+            raise exc.WrongArguments(_("Invalid Content-Range header"))
+
+        if length > settings.ATTACHMENTS_UPLOADS_MAX_CHUNK_SIZE:
+            raise exc.WrongArguments(_("The chunk is too big"))
+
+        if start > upload["offset"]:
+            # The client must resume from the received offset
+            return response.Conflict(self._serialize_upload(pk, upload))
+
+        services.write_upload_chunk(upload, request.stream, start, length)
+        return response.Ok(self._serialize_upload(pk, upload))
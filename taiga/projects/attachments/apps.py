@@ -0,0 +1,40 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from django.apps import AppConfig
+from django.apps import apps
+from django.db.models import signals
+
+from . import signals as handlers
+
+
+def connect_attachments_signals():
+    signals.post_save.connect(handlers.generate_thumbnails_when_upload_attachment,
+                              sender=apps.get_model("attachments", "Attachment"),
+                              dispatch_uid="generate_thumbnails_when_upload_attachment")
+
+
+def disconnect_attachments_signals():
+    signals.post_save.disconnect(sender=apps.get_model("attachments", "Attachment"),
+                                 dispatch_uid="generate_thumbnails_when_upload_attachment")
+
+
+class AttachmentsAppConfig(AppConfig):
+    name = "taiga.projects.attachments"
+    verbose_name = "Attachments"
+
+    def ready(self):
+        connect_attachments_signals()
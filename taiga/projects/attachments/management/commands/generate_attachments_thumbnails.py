@@ -0,0 +1,48 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Generate the missing thumbnails of the attached files, for example the
+# ones uploaded before they were generated on upload.
+#
+# Examples:
+# python manage.py generate_attachments_thumbnails
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from taiga.projects.attachments.models import Attachment
+from taiga.projects.attachments.services import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generate the missing thumbnails of the attached files'
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        # The attachments with the same content share the stored file
+        file_names = list(Attachment.objects.exclude(attached_file="")
+                                            .order_by()
+                                            .values_list("attached_file", flat=True)
+                                            .distinct())
+
+        for i, file_name in enumerate(file_names, 1):
+            attached_file = Attachment(attached_file=file_name).attached_file
+            if attached_file.storage.exists(attached_file.name):
+                generate_thumbnails(attached_file)
+
+            if i % 100 == 0 or i == len(file_names):
+                self.stdout.write("{0}/{1} files processed".format(i, len(file_names)))
@@ -0,0 +1,34 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Remove the files of the abandoned chunked uploads (the ones older than
+# ATTACHMENTS_UPLOADS_MAX_AGE). Run it periodically (daily, for example).
+#
+# Examples:
+# python manage.py remove_expired_uploads
+
+from django.core.management.base import BaseCommand
+
+from taiga.projects.attachments.services import remove_expired_uploads
+
+
+class Command(BaseCommand):
+    help = 'Remove the files of the expired chunked uploads'
+
+    def handle(self, *args, **options):
+        removed = remove_expired_uploads()
+        self.stdout.write("{0} expired uploads removed".format(removed))
@@ -15,7 +15,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import hashlib
-import os
 import os.path as path
 
 from unidecode import unidecode
@@ -25,22 +24,33 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes import generic
 from django.utils import timezone
-from django.utils.encoding import force_bytes
 from django.utils.translation import ugettext_lazy as _
 from django.utils.text import get_valid_filename
 
 from taiga.base.utils.iterators import split_by_n
 
 
+def get_file_hash(file):
+    """
+    Get the sha256 hex digest of the content of `file`, leaving it
+    ready to be read again from the beginning.
+    """
+    hs = hashlib.sha256()
+    for chunk in file.chunks():
+        hs.update(chunk)
+    file.seek(0)
+    return hs.hexdigest()
+
+
 def get_attachment_file_path(instance, filename):
+    """
+    Attachments are stored by the hash of its content, so uploading the
+    same file twice (with the same name) ends in the same path.
+    """
     basename = path.basename(filename)
     basename = get_valid_filename(basename)
 
-    hs = hashlib.sha256()
-    hs.update(force_bytes(timezone.now().isoformat()))
-    hs.update(os.urandom(1024))
-
-    p1, p2, p3, p4, *p5 = split_by_n(hs.hexdigest(), 1)
+    p1, p2, p3, p4, *p5 = split_by_n(get_file_hash(instance.attached_file), 1)
     hash_part = path.join(p1, p2, p3, p4, "".join(p5))
 
     return path.join("attachments", hash_part, basename)
@@ -74,6 +84,7 @@ class Attachment(models.Model):
     order = models.IntegerField(default=0, null=False, blank=False, verbose_name=_("order"))
 
     _importing = None
+    _new_file = False
 
     class Meta:
         verbose_name = "attachment"
@@ -87,7 +98,20 @@ class Attachment(models.Model):
         if not self._importing or not self.modified_date:
             self.modified_date = timezone.now()
 
+        # Used by the signals to generate the thumbnails of the new files
+        self._new_file = bool(self.attached_file) and not self.attached_file._committed
+        if self._new_file:
+            self._reuse_stored_file()
+
         return super().save(*args, **kwargs)
 
+    def _reuse_stored_file(self):
+        # If a file with the same content and name is already stored we
+        # point to it instead of uploading (and storing) it again.
+        name = get_attachment_file_path(self, self.attached_file.name)
+        if self.attached_file.storage.exists(name):
+            self.attached_file.name = name
+            self.attached_file._committed = True
+
     def __str__(self):
         return "Attachment: {}".format(self.id)
@@ -16,7 +16,7 @@
 
 
 from taiga.base.api.permissions import (TaigaResourcePermission, HasProjectPerm,
-                                        AllowAny, PermissionComponent)
+                                        AllowAny, IsAuthenticated, PermissionComponent)
 
 
 class IsAttachmentOwnerPerm(PermissionComponent):
@@ -28,6 +28,7 @@ class IsAttachmentOwnerPerm(PermissionComponent):
 
 class UserStoryAttachmentPermission(TaigaResourcePermission):
     retrieve_perms = HasProjectPerm('view_us') | IsAttachmentOwnerPerm()
+    download_perms = HasProjectPerm('view_us') | IsAttachmentOwnerPerm()
     create_perms = HasProjectPerm('modify_us')
     update_perms = HasProjectPerm('modify_us') | IsAttachmentOwnerPerm()
     destroy_perms = HasProjectPerm('modify_us') | IsAttachmentOwnerPerm()
@@ -36,6 +37,7 @@ class UserStoryAttachmentPermission(TaigaResourcePermission):
 
 class TaskAttachmentPermission(TaigaResourcePermission):
     retrieve_perms = HasProjectPerm('view_tasks') | IsAttachmentOwnerPerm()
+    download_perms = HasProjectPerm('view_tasks') | IsAttachmentOwnerPerm()
     create_perms = HasProjectPerm('modify_task')
     update_perms = HasProjectPerm('modify_task') | IsAttachmentOwnerPerm()
     destroy_perms = HasProjectPerm('modify_task') | IsAttachmentOwnerPerm()
@@ -44,6 +46,7 @@ class TaskAttachmentPermission(TaigaResourcePermission):
 
 class IssueAttachmentPermission(TaigaResourcePermission):
     retrieve_perms = HasProjectPerm('view_issues') | IsAttachmentOwnerPerm()
+    download_perms = HasProjectPerm('view_issues') | IsAttachmentOwnerPerm()
     create_perms = HasProjectPerm('modify_issue')
     update_perms = HasProjectPerm('modify_issue') | IsAttachmentOwnerPerm()
     destroy_perms = HasProjectPerm('modify_issue') | IsAttachmentOwnerPerm()
@@ -52,12 +55,19 @@ class IssueAttachmentPermission(TaigaResourcePermission):
 
 class WikiAttachmentPermission(TaigaResourcePermission):
     retrieve_perms = HasProjectPerm('view_wiki_pages') | IsAttachmentOwnerPerm()
+    download_perms = HasProjectPerm('view_wiki_pages') | IsAttachmentOwnerPerm()
     create_perms = HasProjectPerm('modify_wiki_page')
     update_perms = HasProjectPerm('modify_wiki_page') | IsAttachmentOwnerPerm()
     destroy_perms = HasProjectPerm('modify_wiki_page') | IsAttachmentOwnerPerm()
     list_perms = AllowAny()
 
 
+class AttachmentUploadPermission(TaigaResourcePermission):
+    create_perms = IsAuthenticated()
+    retrieve_perms = IsAuthenticated()
+    update_perms = IsAuthenticated()
+
+
 class RawAttachmentPerm(PermissionComponent):
     def check_permissions(self, request, view, obj=None):
         is_owner = IsAttachmentOwnerPerm().check_permissions(request, view, obj)
@@ -0,0 +1,268 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import hashlib
+import mimetypes
+import os
+import time
+import uuid
+
+from django import http
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.files import File
+from django.db.models import Count
+from django.utils.encoding import force_bytes
+from django.utils.http import urlquote
+from django.utils.translation import ugettext as _
+
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.exceptions import InvalidImageFormatError
+from easy_thumbnails.files import get_thumbnailer
+
+from taiga.base import exceptions as exc
+from taiga.base import response
+from taiga.base.utils.db import get_content_type_id_for_model
+
+from . import models
+
+
+# Thumbnails of the attached files that are generated on upload.
+THUMBNAIL_ALIASES = ("timeline-image",)
+
+THUMBNAILS_GENERATION_TIMEOUT = 60 * 10  # 10 minutes
+THUMBNAILS_FAILURE_TIMEOUT = 60 * 60 * 24  # 1 day
+
+
+def get_attachments_count(model, object_ids):
+    """
+    Get a dict with the number of attachments of every object of
+    `model` in `object_ids`, using a single grouped query.
+    """
+    content_type_id = get_content_type_id_for_model(model)
+    qs = models.Attachment.objects.filter(content_type_id=content_type_id, object_id__in=object_ids)
+    qs = qs.values("object_id").annotate(count=Count("id")).order_by()
+    return {row["object_id"]: row["count"] for row in qs}
+
+
+def _make_thumbnails_cache_key(prefix, attached_file):
+    name_hash = hashlib.sha1(force_bytes(attached_file.name)).hexdigest()
+    return "attachments-thumbnails-{}-{}".format(prefix, name_hash)
+
+
+def generate_thumbnails(attached_file):
+    """
+    Generate the thumbnails in `THUMBNAIL_ALIASES` of an attached file.
+    Files that are not images (or are corrupt) are remembered as failed
+    for `THUMBNAILS_FAILURE_TIMEOUT` seconds.
+    """
+    thumbnailer = get_thumbnailer(attached_file)
+    for alias in THUMBNAIL_ALIASES:
+        try:
+            thumbnailer[alias]
+        except InvalidImageFormatError:
+            cache.set(_make_thumbnails_cache_key("failure", attached_file), True,
+                      THUMBNAILS_FAILURE_TIMEOUT)
+            return
+
+
+def queue_thumbnails_generation(attached_file):
+    """
+    Generate the thumbnails of an attached file in a background worker
+    (if celery is enabled). The generation of a file is queued once every
+    `THUMBNAILS_GENERATION_TIMEOUT` seconds at most.
+    """
+    from .tasks import generate_thumbnails as generate_thumbnails_task
+
+    if not cache.add(_make_thumbnails_cache_key("generation", attached_file), True,
+                     THUMBNAILS_GENERATION_TIMEOUT):
+        return
+
+    if settings.CELERY_ENABLED:
+        generate_thumbnails_task.delay(attached_file.name)
+    else:
+        generate_thumbnails_task(attached_file.name)
+
+
+def get_thumbnail_url(attached_file, alias):
+    """
+    Get the url of the `alias` thumbnail of an attached file without
+    generating it. If the thumbnail is not generated yet, its generation
+    is queued in the background worker (in case the one queued on upload
+    failed or the file was uploaded before) and the url where it will be
+    stored is returned. Without a worker, the missing thumbnails are
+    generated by the generate_attachments_thumbnails command. Return
+    None if the file is not an image or its thumbnails can't be generated.
+    """
+    mimetype, encoding = mimetypes.guess_type(attached_file.name)
+    if mimetype is None or not mimetype.startswith("image/"):
+        return None
+
+    if cache.get(_make_thumbnails_cache_key("failure", attached_file)):
+        return None
+
+    thumbnailer = get_thumbnailer(attached_file)
+    options = aliases.get(alias)
+
+    thumbnail = thumbnailer.get_existing_thumbnail(options)
+    if thumbnail is not None:
+        return thumbnail.url
+
+    if settings.CELERY_ENABLED:
+        queue_thumbnails_generation(attached_file)
+
+    name = thumbnailer.get_thumbnail_name(options)
+    return thumbnailer.thumbnail_storage.url(name)
+
+
+####################################
+# Chunked uploads
+####################################
+
+UPLOAD_TOKEN_SALT = "attachments-upload"
+UPLOAD_BLOCK_SIZE = 64 * 1024
+
+
+def _get_upload_path(upload_id):
+    return os.path.join(settings.ATTACHMENTS_UPLOADS_PATH, upload_id)
+
+
+def create_upload(user, name, size):
+    """
+    Start a chunked upload of a file of `size` bytes and return the
+    token that identifies it.
+    """
+    if size > settings.ATTACHMENTS_UPLOADS_MAX_SIZE:
+        raise exc.WrongArguments(_("The file is too big, the maximum size is {} bytes")
+                                 .format(settings.ATTACHMENTS_UPLOADS_MAX_SIZE))
+
+    upload_id = uuid.uuid4().hex
+    os.makedirs(settings.ATTACHMENTS_UPLOADS_PATH, exist_ok=True)
+    open(_get_upload_path(upload_id), "wb").close()
+
+    data = {"id": upload_id, "user": user.id, "name": name, "size": size}
+    return signing.dumps(data, salt=UPLOAD_TOKEN_SALT)
+
+
+def get_upload(token, user):
+    """
+    Get the state of the chunked upload identified by `token`. The
+    `offset` is the number of bytes already received.
+    """
+    try:
+        upload = signing.loads(token, salt=UPLOAD_TOKEN_SALT,
+                               max_age=settings.ATTACHMENTS_UPLOADS_MAX_AGE)
+    except signing.BadSignature:
+        raise exc.NotFound(_("Upload not found"))
+
+    upload["path"] = _get_upload_path(upload["id"])
+    if upload["user"] != user.id or not os.path.exists(upload["path"]):
+        raise exc.NotFound(_("Upload not found"))
+
+    upload["offset"] = os.path.getsize(upload["path"])
+    return upload
+
+
+def write_upload_chunk(upload, stream, start, length):
+    """
+    Write `length` bytes from `stream` at the position `start` of the
+    upload, reading them in small blocks so the chunk is never fully held
+    in memory. Writing the same chunk again (a retry, or a concurrent
+    request) writes the same bytes, so it can't corrupt the upload.
+    """
+    if start > upload["offset"]:
+        raise exc.WrongArguments(_("The chunk doesn't start at the received offset"))
+
+    if start + length > upload["size"]:
+        raise exc.WrongArguments(_("The chunk exceeds the size of the upload"))
+
+    with open(upload["path"], "r+b") as upload_file:
+        upload_file.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = stream.read(min(UPLOAD_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            upload_file.write(block)
+            remaining -= len(block)
+
+    upload["offset"] = os.path.getsize(upload["path"])
+    return upload["offset"]
+
+
+def get_upload_file(upload):
+    if upload["offset"] != upload["size"]:
+        raise exc.WrongArguments(_("The upload is not complete"))
+    return File(open(upload["path"], "rb"), name=upload["name"])
+
+
+def remove_upload(upload):
+    if os.path.exists(upload["path"]):
+        os.remove(upload["path"])
+
+
+def remove_expired_uploads() -> int:
+    """
+    Remove the files of the uploads that were abandoned, the ones not
+    written for longer than their tokens are valid. Return the number of
+    removed files.
+    """
+    if not os.path.isdir(settings.ATTACHMENTS_UPLOADS_PATH):
+        return 0
+
+    limit = time.time() - settings.ATTACHMENTS_UPLOADS_MAX_AGE
+    removed = 0
+    for name in os.listdir(settings.ATTACHMENTS_UPLOADS_PATH):
+        upload_path = _get_upload_path(name)
+        try:
+            if os.path.getmtime(upload_path) < limit:
+                os.remove(upload_path)
+                removed += 1
+        except FileNotFoundError:
+            # Completed or removed meanwhile
+            pass
+
+    return removed
+
+
+####################################
+# Downloads
+####################################
+
+def get_download_response(attachment):
+    """
+    Build a response that lets the web server send the attached file
+    (see `ATTACHMENTS_SENDFILE_HEADER`) so it never goes through Django.
+    """
+    header = getattr(settings, "ATTACHMENTS_SENDFILE_HEADER", None)
+    if header is None:
+        return response.TemporaryRedirect(headers={"Location": attachment.attached_file.url})
+
+    file_name = attachment.attached_file.name
+    content_type, encoding = mimetypes.guess_type(file_name)
+
+    resp = http.HttpResponse(content_type=content_type or "application/octet-stream")
+    resp["Content-Disposition"] = "attachment; filename*=UTF-8''{}".format(
+        urlquote(os.path.basename(file_name)))
+
+    if header == "X-Accel-Redirect":
+        resp[header] = "{}{}".format(settings.ATTACHMENTS_SENDFILE_URL, urlquote(file_name))
+    else:
+        resp[header] = attachment.attached_file.path
+
+    return resp
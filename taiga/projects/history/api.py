@@ -14,14 +14,13 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from django.contrib.contenttypes.models import ContentType
 from django.utils.translation import ugettext as _
 from django.utils import timezone
 
 from taiga.base import response
 from taiga.base.decorators import detail_route
 from taiga.base.api import ReadOnlyListViewSet
-from taiga.base.api.utils import get_object_or_404
+from taiga.base.utils.db import get_model_from_typename
 
 from . import permissions
 from . import serializers
@@ -33,13 +32,8 @@ class HistoryViewSet(ReadOnlyListViewSet):
 
     content_type = None
 
-    def get_content_type(self):
-        app_name, model = self.content_type.split(".", 1)
-        return get_object_or_404(ContentType, app_label=app_name, model=model)
-
     def get_queryset(self):
-        ct = self.get_content_type()
-        model_cls = ct.model_class()
+        model_cls = get_model_from_typename(self.content_type)
 
         qs = model_cls.objects.all()
         filtered_qs = self.filter_queryset(qs)
@@ -18,12 +18,11 @@ from contextlib import suppress
 
 from functools import partial
 from django.apps import apps
-from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 
-from easy_thumbnails.files import get_thumbnailer
-from easy_thumbnails.exceptions import InvalidImageFormatError
 
+from taiga.base.utils.db import get_model_from_typename
+from taiga.projects.attachments.services import get_thumbnail_url
 from taiga.base.utils.urls import get_absolute_url
 from taiga.base.utils.iterators import as_tuple
 from taiga.base.utils.iterators import as_dict
@@ -37,9 +36,7 @@ import os
 
 @as_dict
 def _get_generic_values(ids:tuple, *, typename=None, attr:str="name") -> tuple:
-    app_label, model_name = typename.split(".", 1)
-    content_type = ContentType.objects.get(app_label=app_label, model=model_name)
-    model_cls = content_type.model_class()
+    model_cls = get_model_from_typename(typename)
 
     ids = filter(lambda x: x is not None, ids)
     qs = model_cls.objects.filter(pk__in=ids)
@@ -183,11 +180,10 @@ def _generic_extract(obj:object, fields:list, default=None) -> dict:
 @as_tuple
 def extract_attachments(obj) -> list:
     for attach in obj.attachments.all():
-        try:
-            thumb_url = get_thumbnailer(attach.attached_file)['timeline-image'].url
+        # Thumbnails are generated on upload by a background task
+        thumb_url = get_thumbnail_url(attach.attached_file, "timeline-image")
+        if thumb_url:
             thumb_url = get_absolute_url(thumb_url)
-        except InvalidImageFormatError as e:
-            thumb_url = None
 
         yield {"id": attach.id,
                "filename": os.path.basename(attach.attached_file.name),
@@ -264,6 +260,15 @@ def milestone_freezer(milestone) -> dict:
     return snapshot
 
 
+def _get_html_field(obj, field_name):
+    # Rows saved before the html fields were stored may not have it yet
+    html = getattr(obj, "{}_html".format(field_name))
+    text = getattr(obj, field_name)
+    if not html and text:
+        html = mdrender(obj.project, text)
+    return html
+
+
 def userstory_freezer(us) -> dict:
     rp_cls = apps.get_model("userstories", "RolePoints")
     rpqsd = rp_cls.objects.filter(user_story=us)
@@ -283,7 +288,7 @@ def userstory_freezer(us) -> dict:
         "kanban_order": us.kanban_order,
         "subject": us.subject,
         "description": us.description,
-        "description_html": mdrender(us.project, us.description),
+        "description_html": _get_html_field(us, "description"),
         "assigned_to": us.assigned_to_id,
         "milestone": us.milestone_id,
         "client_requirement": us.client_requirement,
@@ -295,7 +300,7 @@ def userstory_freezer(us) -> dict:
         "from_issue": us.generated_from_issue_id,
         "is_blocked": us.is_blocked,
         "blocked_note": us.blocked_note,
-        "blocked_note_html": mdrender(us.project, us.blocked_note),
+        "blocked_note_html": _get_html_field(us, "blocked_note"),
         "custom_attributes": extract_user_story_custom_attributes(us),
     }
 
@@ -313,14 +318,14 @@ def issue_freezer(issue) -> dict:
         "milestone": issue.milestone_id,
         "subject": issue.subject,
         "description": issue.description,
-        "description_html": mdrender(issue.project, issue.description),
+        "description_html": _get_html_field(issue, "description"),
         "assigned_to": issue.assigned_to_id,
         "watchers": [x.pk for x in issue.watchers.all()],
         "attachments": extract_attachments(issue),
         "tags": issue.tags,
         "is_blocked": issue.is_blocked,
         "blocked_note": issue.blocked_note,
-        "blocked_note_html": mdrender(issue.project, issue.blocked_note),
+        "blocked_note_html": _get_html_field(issue, "blocked_note"),
         "custom_attributes": extract_issue_custom_attributes(issue),
     }
 
@@ -335,7 +340,7 @@ def task_freezer(task) -> dict:
         "milestone": task.milestone_id,
         "subject": task.subject,
         "description": task.description,
-        "description_html": mdrender(task.project, task.description),
+        "description_html": _get_html_field(task, "description"),
         "assigned_to": task.assigned_to_id,
         "watchers": [x.pk for x in task.watchers.all()],
         "attachments": extract_attachments(task),
@@ -346,7 +351,7 @@ def task_freezer(task) -> dict:
         "is_iocaine": task.is_iocaine,
         "is_blocked": task.is_blocked,
         "blocked_note": task.blocked_note,
-        "blocked_note_html": mdrender(task.project, task.blocked_note),
+        "blocked_note_html": _get_html_field(task, "blocked_note"),
         "custom_attributes": extract_task_custom_attributes(task),
     }
 
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.utils.timezone
+import django_pgjson.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('history', '0008_auto_20150508_1028'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedSnapshot',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='ID', auto_created=True)),
+                ('key', models.CharField(max_length=255, db_index=True)),
+                ('snapshot', django_pgjson.fields.JsonField()),
+                ('user', django_pgjson.fields.JsonField(default=None, null=True, blank=True)),
+                ('comment', models.TextField(blank=True)),
+                ('notify', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+            bases=(models.Model,),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('history', '0009_queuedsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historyentry',
+            name='key_version',
+            field=models.IntegerField(default=None, null=True, blank=True),
+            preserve_default=True,
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE "history_historyentry"
+               SET "key_version" = "versions"."version"
+              FROM (SELECT "id", row_number() OVER (PARTITION BY "key"
+                                                     ORDER BY "created_at", "id") AS "version"
+                      FROM "history_historyentry"
+                     WHERE "key" IS NOT NULL) AS "versions"
+             WHERE "history_historyentry"."id" = "versions"."id";
+            """
+        ),
+        migrations.AlterUniqueTogether(
+            name='historyentry',
+            unique_together=set([('key', 'key_version')]),
+        ),
+    ]
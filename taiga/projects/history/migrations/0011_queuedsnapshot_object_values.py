@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django_pgjson.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('history', '0010_historyentry_key_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedsnapshot',
+            name='object_values',
+            field=django_pgjson.fields.JsonField(default=None, null=True, blank=True),
+            preserve_default=True,
+        ),
+    ]
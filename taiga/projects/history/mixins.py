@@ -16,7 +16,10 @@
 
 import warnings
 
+from django.conf import settings
+
 from .services import take_snapshot
+from .services import queue_snapshot
 
 
 class HistoryResourceMixin(object):
@@ -63,7 +66,14 @@ class HistoryResourceMixin(object):
         if sobj != obj and delete:
             delete = False
 
-        self.__last_history = take_snapshot(sobj, comment=comment, user=user, delete=delete)
+        if getattr(settings, "HISTORY_ASYNC_ENABLED", False) and not delete:
+            # The history entry, and its notifications, are created by
+            # a worker, so there is no last history for this request.
+            notify = not getattr(self, "_not_notify", False)
+            queue_snapshot(sobj, comment=comment, user=user, notify=notify)
+            self.__last_history = None
+        else:
+            self.__last_history = take_snapshot(sobj, comment=comment, user=user, delete=delete)
         self.__object_saved = True
 
     def post_save(self, obj, created=False):
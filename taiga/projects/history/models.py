@@ -50,6 +50,10 @@ class HistoryEntry(models.Model):
     type = models.SmallIntegerField(choices=HISTORY_TYPE_CHOICES)
     key = models.CharField(max_length=255, null=True, default=None, blank=True, db_index=True)
 
+    # Sequence number of the entry for its key. Two writers storing a
+    # snapshot of the same object at the same time conflict on it.
+    key_version = models.IntegerField(null=True, blank=True, default=None)
+
     # Stores the last diff
     diff = JsonField(null=True, blank=True, default=None)
 
@@ -243,3 +247,23 @@ class HistoryEntry(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        unique_together = ("key", "key_version")
+
+
+class QueuedSnapshot(models.Model):
+    """
+    Frozen object taken in a request and waiting to be stored as a
+    history entry by a worker (see `HISTORY_ASYNC_ENABLED`). They are
+    processed in order of id for every key.
+    """
+    key = models.CharField(max_length=255, null=False, blank=False, db_index=True)
+    snapshot = JsonField(null=False, blank=False)
+    user = JsonField(null=True, blank=True, default=None)
+    comment = models.TextField(blank=True)
+    notify = models.BooleanField(default=True)
+    # Field values of the object when the snapshot was queued
+    object_values = JsonField(null=True, blank=True, default=None)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
@@ -25,8 +25,11 @@ This is possible example:
           # Do something...
           history.persist_history(object, user=request.user)
 """
+import json
 import logging
+import time
 from collections import namedtuple
+from contextlib import contextmanager
 from copy import deepcopy
 from functools import partial
 from functools import wraps
@@ -35,12 +38,17 @@ from functools import lru_cache
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.paginator import Paginator, InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
 from django.apps import apps
+from django.db import connection
 from django.db import transaction as tx
-from django_pglocks import advisory_lock
+from django.db import IntegrityError
+from django.db.models import Max
 
+from taiga.celery import app
 from taiga.mdrender.service import render as mdrender
 from taiga.base.utils.db import get_typename_for_model_class
+from taiga.base.utils.instrumentation import record_lock_wait
 from taiga.base.utils.diff import make_diff as make_diff_from_dicts
 
 from .models import HistoryType
@@ -223,9 +231,13 @@ def _rebuild_snapshot_from_diffs(keysnapshot, partials):
     return result
 
 
-def get_last_snapshot_for_key(key:str) -> FrozenObj:
+def _get_last_snapshot_for_key(key:str):
     entry_model = apps.get_model("history", "HistoryEntry")
 
+    last_version = (entry_model.objects
+                    .filter(key=key)
+                    .aggregate(version=Max("key_version"))["version"]) or 0
+
     # Search last snapshot
     qs = (entry_model.objects
           .filter(key=key, is_snapshot=True)
@@ -233,7 +245,7 @@ def get_last_snapshot_for_key(key:str) -> FrozenObj:
 
     keysnapshot = qs.first()
     if keysnapshot is None:
-        return None, True
+        return None, True, last_version
 
     # Get all partial snapshots
     entries = tuple(entry_model.objects
@@ -245,9 +257,37 @@ def get_last_snapshot_for_key(key:str) -> FrozenObj:
     max_partial_diffs = getattr(settings, "MAX_PARTIAL_DIFFS", 60)
 
     if len(entries) >= max_partial_diffs:
-        return FrozenObj(keysnapshot.key, snapshot), True
+        return FrozenObj(keysnapshot.key, snapshot), True, last_version
+
+    return FrozenObj(keysnapshot.key, snapshot), False, last_version
+
+
+def get_last_snapshot_for_key(key:str) -> FrozenObj:
+    fobj, need_real_snapshot, last_version = _get_last_snapshot_for_key(key)
+    return fobj, need_real_snapshot
+
+
+# Lock instrumentation
 
-    return FrozenObj(keysnapshot.key, snapshot), False
+@contextmanager
+def _snapshot_lock(key:str, typename:str):
+    """
+    Lock the history of the object with `key` until the end of the current
+    transaction, so the entries stored with it are committed before other
+    writer can read the last snapshot.
+    """
+    start = time.monotonic()
+    with tx.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [key])
+        wait = time.monotonic() - start
+        record_lock_wait("history:{}".format(typename), wait)
+
+        if wait >= getattr(settings, "HISTORY_LOCK_WAIT_WARNING", 1):
+            log.warning("Waited {:.3f}s for the history lock of {}".format(wait, key))
+        else:
+            log.debug("Waited {:.3f}s for the history lock of {}".format(wait, key))
+
+        yield True
 
 
 # Public api
@@ -257,6 +297,12 @@ def get_modified_fields(obj:object, last_modifications):
     Get the modified fields for an object through his last modifications
     """
     key = make_key_from_model_object(obj)
+
+    # The queued snapshots are part of the history of the object too
+    if getattr(settings, "HISTORY_ASYNC_ENABLED", False):
+        with _snapshot_lock(key, get_typename_for_model_class(obj.__class__)):
+            _store_queued_snapshots(key)
+
     entry_model = apps.get_model("history", "HistoryEntry")
     history_entries = (entry_model.objects
                                     .filter(key=key)
@@ -271,6 +317,78 @@ def get_modified_fields(obj:object, last_modifications):
     return modified_fields
 
 
+def _create_history_entry(obj:object, new_fobj:FrozenObj, *, comment:str, user:dict,
+                          delete:bool, created_at=None):
+    """
+    Create the history entry of a frozen version of `obj`, diffing it
+    with the last one stored. It must be called with the lock of the
+    object key acquired or be retried when it raises IntegrityError
+    because other entry of the object was stored meanwhile.
+    """
+    key = make_key_from_model_object(obj)
+    typename = get_typename_for_model_class(obj.__class__)
+    old_fobj, need_real_snapshot, last_version = _get_last_snapshot_for_key(key)
+
+    entry_model = apps.get_model("history", "HistoryEntry")
+
+    # Determine history type
+    if delete:
+        entry_type = HistoryType.delete
+    elif new_fobj and not old_fobj:
+        entry_type = HistoryType.create
+    elif new_fobj and old_fobj:
+        entry_type = HistoryType.change
+    else:
+        raise RuntimeError("Unexpected condition")
+
+    fdiff = make_diff(old_fobj, new_fobj)
+
+    # If diff and comment are empty, do
+    # not create empty history entry
+    if (not fdiff.diff and not comment
+        and old_fobj is not None
+        and entry_type != HistoryType.delete):
+
+        return None
+
+    fvals = make_diff_values(typename, fdiff)
+
+    if len(comment) > 0:
+        is_hidden = False
+    else:
+        is_hidden = is_hidden_snapshot(fdiff)
+
+    kwargs = {
+        "user": user,
+        "key": key,
+        "key_version": last_version + 1,
+        "type": entry_type,
+        "snapshot": fdiff.snapshot if need_real_snapshot else None,
+        "diff": fdiff.diff,
+        "values": fvals,
+        "comment": comment,
+        "comment_html": mdrender(obj.project, comment) if comment else "",
+        "is_hidden": is_hidden,
+        "is_snapshot": need_real_snapshot,
+    }
+
+    if created_at is not None:
+        kwargs["created_at"] = created_at
+
+    entry = entry_model(**kwargs)
+    # Save the snapshot object for the post_save handlers
+    entry._snapshot_object = obj
+    with tx.atomic():
+        entry.save(force_insert=True)
+    return entry
+
+
+def _make_user_data(user) -> dict:
+    user_id = None if user is None else user.id
+    user_name = "" if user is None else user.get_full_name()
+    return {"pk": user_id, "name": user_name}
+
+
 @tx.atomic
 def take_snapshot(obj:object, *, comment:str="", user=None, delete:bool=False):
     """
@@ -282,57 +400,123 @@ def take_snapshot(obj:object, *, comment:str="", user=None, delete:bool=False):
     """
 
     key = make_key_from_model_object(obj)
-    with advisory_lock(key) as acquired_key_lock:
-        typename = get_typename_for_model_class(obj.__class__)
+    typename = get_typename_for_model_class(obj.__class__)
+    user_data = _make_user_data(user)
+    async_enabled = getattr(settings, "HISTORY_ASYNC_ENABLED", False)
+
+    # Without the lock, the concurrent writers of the object conflict
+    # on the entry version and retry with the new last snapshot.
+    if getattr(settings, "HISTORY_OPTIMISTIC_SNAPSHOTS", False) and not async_enabled:
+        try:
+            return _take_snapshot_retrying(obj, typename, comment=comment, user=user_data,
+                                           delete=delete)
+        except IntegrityError:
+            log.debug("Too many conflicts storing the snapshot of {}, locking it".format(key))
+
+    with _snapshot_lock(key, typename):
+        # The snapshots queued before must be stored before this one
+        if async_enabled:
+            _store_queued_snapshots(key)
 
+        return _take_snapshot_retrying(obj, typename, comment=comment, user=user_data,
+                                       delete=delete)
+
+
+def _take_snapshot_retrying(obj:object, typename:str, **kwargs):
+    retries = max(getattr(settings, "HISTORY_OPTIMISTIC_RETRIES", 5), 1)
+
+    for attempt in range(retries):
         new_fobj = freeze_model_instance(obj)
-        old_fobj, need_real_snapshot = get_last_snapshot_for_key(key)
-
-        entry_model = apps.get_model("history", "HistoryEntry")
-        user_id = None if user is None else user.id
-        user_name = "" if user is None else user.get_full_name()
-
-        # Determine history type
-        if delete:
-            entry_type = HistoryType.delete
-        elif new_fobj and not old_fobj:
-            entry_type = HistoryType.create
-        elif new_fobj and old_fobj:
-            entry_type = HistoryType.change
-        else:
-            raise RuntimeError("Unexpected condition")
+        try:
+            return _create_history_entry(obj, new_fobj, **kwargs)
+        except IntegrityError:
+            record_lock_wait("history:{}".format(typename), conflict=True)
+            if attempt + 1 >= retries:
+                raise
 
-        fdiff = make_diff(old_fobj, new_fobj)
 
-        # If diff and comment are empty, do
-        # not create empty history entry
-        if (not fdiff.diff and not comment
-            and old_fobj is not None
-            and entry_type != HistoryType.delete):
+# Async history persistence
 
-            return None
+def queue_snapshot(obj:object, *, comment:str="", user=None, notify:bool=True):
+    """
+    Freeze the object and queue the snapshot, so the history entry (and
+    the timeline entries, webhooks and notifications that follow it) is
+    created by a worker out of the request.
 
-        fvals = make_diff_values(typename, fdiff)
+    Deletions are not queued, because the object is needed to create
+    their history entry; use `take_snapshot` for them.
+    """
+    key = make_key_from_model_object(obj)
+    new_fobj = freeze_model_instance(obj)
 
-        if len(comment) > 0:
-            is_hidden = False
-        else:
-            is_hidden = is_hidden_snapshot(fdiff)
-
-        kwargs = {
-            "user": {"pk": user_id, "name": user_name},
-            "key": key,
-            "type": entry_type,
-            "snapshot": fdiff.snapshot if need_real_snapshot else None,
-            "diff": fdiff.diff,
-            "values": fvals,
-            "comment": comment,
-            "comment_html": mdrender(obj.project, comment),
-            "is_hidden": is_hidden,
-            "is_snapshot": need_real_snapshot,
-        }
-
-        return entry_model.objects.create(**kwargs)
+    queue_model = apps.get_model("history", "QueuedSnapshot")
+    queue_model.objects.create(key=key, snapshot=new_fobj.snapshot, user=_make_user_data(user),
+                               comment=comment, notify=notify,
+                               object_values=_get_object_values(obj))
+
+    if settings.CELERY_ENABLED:
+        # The worker must find the queued snapshot
+        connection.on_commit(lambda: store_queued_snapshots.delay(key))
+    else:
+        store_queued_snapshots(key)
+
+
+def _get_object_values(obj:object) -> dict:
+    values = {field.attname: getattr(obj, field.attname) for field in obj._meta.concrete_fields}
+    return json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+
+
+def _get_object_from_values(model, values:dict) -> object:
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    return model(**{name: fields[name].to_python(value)
+                    for name, value in values.items() if name in fields})
+
+
+def _store_queued_snapshots(key:str):
+    from taiga.projects.notifications import services as notifications_services
+
+    queue_model = apps.get_model("history", "QueuedSnapshot")
+    queued_snapshots = list(queue_model.objects.filter(key=key).order_by("id"))
+    if not queued_snapshots:
+        return
+
+    model = get_model_from_key(key)
+    current_obj = model.objects.filter(pk=get_pk_from_key(key)).first()
+    if current_obj is None:
+        log.warning("Discarding the queued snapshots of {}, the object doesn't exist".format(key))
+
+    for queued_snapshot in queued_snapshots:
+        if current_obj is None:
+            break
+
+        # The timeline, webhooks and notifications of the entry are built
+        # from the object as it was when the snapshot was queued
+        obj = current_obj
+        if queued_snapshot.object_values is not None:
+            obj = _get_object_from_values(model, queued_snapshot.object_values)
+
+        entry = _create_history_entry(obj, FrozenObj(key, queued_snapshot.snapshot),
+                                      comment=queued_snapshot.comment, user=queued_snapshot.user,
+                                      delete=False, created_at=queued_snapshot.created_at)
+
+        if entry and queued_snapshot.notify:
+            notifications_services.analize_object_for_watchers(obj, entry)
+            notifications_services.send_notifications(obj, history=entry)
+
+    queue_model.objects.filter(id__in=[qs.id for qs in queued_snapshots]).delete()
+
+
+@app.task
+@tx.atomic
+def store_queued_snapshots(key:str):
+    """
+    Store the queued snapshots of the object with `key`. Whatever the
+    worker that runs it, the snapshots of an object are stored in the
+    order they were queued.
+    """
+    typename, pk = key.split(":", 1)
+    with _snapshot_lock(key, typename):
+        _store_queued_snapshots(key)
 
 
 # High level query api
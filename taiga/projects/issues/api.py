@@ -16,7 +16,7 @@
 
 from django.utils.translation import ugettext as _
 from django.db.models import Q
-from django.http import Http404, HttpResponse
+from django.http import Http404, StreamingHttpResponse
 
 from taiga.base import filters
 from taiga.base import exceptions as exc
@@ -33,7 +33,6 @@ from taiga.projects.history.mixins import HistoryResourceMixin
 
 from taiga.projects.models import Project, IssueStatus, Severity, Priority, IssueType
 from taiga.projects.milestones.models import Milestone
-from taiga.projects.votes.utils import attach_votescount_to_queryset
 from taiga.projects.votes import services as votes_service
 from taiga.projects.votes import serializers as votes_serializers
 from . import models
@@ -84,6 +83,20 @@ class IssueViewSet(OCCResourceMixin, HistoryResourceMixin, WatchedResourceMixin,
 
         return serializers.IssueSerializer
 
+    def list(self, request, *args, **kwargs):
+        list_response = super().list(request, *args, **kwargs)
+
+        # The issues of the page voted by the user, with a single query
+        voted_ids = set()
+        if request.user.is_authenticated():
+            issue_ids = [issue["id"] for issue in list_response.data]
+            voted_ids = votes_service.get_voted_ids(request.user, models.Issue, issue_ids)
+
+        for issue in list_response.data:
+            issue["is_voter"] = issue["id"] in voted_ids
+
+        return list_response
+
     def update(self, request, *args, **kwargs):
         self.object = self.get_object_or_none()
         project_id = request.DATA.get('project', None)
@@ -141,7 +154,6 @@ class IssueViewSet(OCCResourceMixin, HistoryResourceMixin, WatchedResourceMixin,
     def get_queryset(self):
         qs = models.Issue.objects.all()
         qs = qs.prefetch_related("attachments")
-        qs = attach_votescount_to_queryset(qs, as_field="votes_count")
         return qs
 
     def pre_save(self, obj):
@@ -214,8 +226,8 @@ class IssueViewSet(OCCResourceMixin, HistoryResourceMixin, WatchedResourceMixin,
 
         project = get_object_or_404(Project, issues_csv_uuid=uuid)
         queryset = project.issues.all().order_by('ref')
-        data = services.issues_to_csv(project, queryset)
-        csv_response = HttpResponse(data.getvalue(), content_type='application/csv; charset=utf-8')
+        data = services.iter_issues_csv(project, queryset)
+        csv_response = StreamingHttpResponse(data, content_type='application/csv; charset=utf-8')
         csv_response['Content-Disposition'] = 'attachment; filename="issues.csv"'
         return csv_response
 
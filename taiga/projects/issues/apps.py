@@ -29,10 +29,24 @@ def connect_issues_signals():
                              sender=apps.get_model("issues", "Issue"),
                              dispatch_uid="set_finished_date_when_edit_issue")
 
+    # Html fields
+    signals.pre_save.connect(generic_handlers.render_html_fields,
+                             sender=apps.get_model("issues", "Issue"),
+                             dispatch_uid="render_html_fields_issue")
+
     # Tags
     signals.pre_save.connect(generic_handlers.tags_normalization,
                              sender=apps.get_model("issues", "Issue"),
                              dispatch_uid="tags_normalization_issue")
+    signals.pre_save.connect(generic_handlers.store_previous_tags,
+                             sender=apps.get_model("issues", "Issue"),
+                             dispatch_uid="store_previous_tags_issue")
+    signals.post_save.connect(generic_handlers.update_tags_dictionary_when_create_or_edit_taggable_item,
+                              sender=apps.get_model("issues", "Issue"),
+                              dispatch_uid="update_tags_dictionary_when_create_or_edit_taggable_item_issue")
+    signals.post_delete.connect(generic_handlers.update_tags_dictionary_when_delete_taggable_item,
+                                sender=apps.get_model("issues", "Issue"),
+                                dispatch_uid="update_tags_dictionary_when_delete_taggable_item_issue")
     signals.post_save.connect(generic_handlers.update_project_tags_when_create_or_edit_taggable_item,
                               sender=apps.get_model("issues", "Issue"),
                               dispatch_uid="update_project_tags_when_create_or_edit_taggable_item_issue")
@@ -54,7 +68,11 @@ def connect_all_issues_signals():
 
 def disconnect_issues_signals():
     signals.pre_save.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="set_finished_date_when_edit_issue")
+    signals.pre_save.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="render_html_fields_issue")
     signals.pre_save.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="tags_normalization_issue")
+    signals.pre_save.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="store_previous_tags_issue")
+    signals.post_save.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="update_tags_dictionary_when_create_or_edit_taggable_item_issue")
+    signals.post_delete.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="update_tags_dictionary_when_delete_taggable_item_issue")
     signals.post_save.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="update_project_tags_when_create_or_edit_taggable_item_issue")
     signals.post_delete.disconnect(sender=apps.get_model("issues", "Issue"), dispatch_uid="update_project_tags_when_delete_taggable_item_issue")
 
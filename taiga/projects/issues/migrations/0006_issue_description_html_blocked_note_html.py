@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0005_auto_20150623_1923'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='description_html',
+            field=models.TextField(default='', blank=True, verbose_name='description html'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='blocked_note_html',
+            field=models.TextField(default='', blank=True, verbose_name='blocked note html'),
+            preserve_default=True,
+        ),
+    ]
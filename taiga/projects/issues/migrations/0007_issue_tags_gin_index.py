@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0006_issue_description_html_blocked_note_html'),
+    ]
+
+    operations = [
+        # Index used by the tags filters (tags @> ARRAY[...])
+        migrations.RunSQL(
+            """
+            CREATE INDEX "issues_issue_tags_gin" ON "issues_issue" USING gin ("tags");
+            """,
+            reverse_sql="""DROP INDEX IF EXISTS "issues_issue_tags_gin";"""
+        ),
+    ]
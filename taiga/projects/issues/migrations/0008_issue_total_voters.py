@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0007_issue_tags_gin_index'),
+        ('votes', '0001_initial'),
+        ('contenttypes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='total_voters',
+            field=models.PositiveIntegerField(default=0, verbose_name='total voters'),
+            preserve_default=True,
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE "issues_issue"
+               SET "total_voters" = "votes"."count"
+              FROM (SELECT "object_id", count(*) AS "count"
+                      FROM "votes_vote"
+                     WHERE "content_type_id" = (SELECT "id"
+                                                  FROM "django_content_type"
+                                                 WHERE "app_label" = 'issues'
+                                                   AND "model" = 'issue')
+                  GROUP BY "object_id") AS "votes"
+             WHERE "issues_issue"."id" = "votes"."object_id";
+            """
+        ),
+    ]
@@ -20,7 +20,6 @@ from taiga.base.fields import PgArrayField
 from taiga.base.neighbors import NeighborsSerializerMixin
 
 
-from taiga.mdrender.service import render as mdrender
 from taiga.projects.validators import ProjectExistsValidator
 from taiga.projects.notifications.validators import WatchersValidator
 from taiga.projects.serializers import BasicIssueStatusSerializer
@@ -35,8 +34,6 @@ class IssueSerializer(WatchersValidator, serializers.ModelSerializer):
     is_closed = serializers.Field(source="is_closed")
     comment = serializers.SerializerMethodField("get_comment")
     generated_user_stories = serializers.SerializerMethodField("get_generated_user_stories")
-    blocked_note_html = serializers.SerializerMethodField("get_blocked_note_html")
-    description_html = serializers.SerializerMethodField("get_description_html")
     votes = serializers.SerializerMethodField("get_votes_number")
     status_extra_info = BasicIssueStatusSerializer(source="status", required=False, read_only=True)
     assigned_to_extra_info = UserBasicInfoSerializer(source="assigned_to", required=False, read_only=True)
@@ -44,7 +41,9 @@ class IssueSerializer(WatchersValidator, serializers.ModelSerializer):
 
     class Meta:
         model = models.Issue
-        read_only_fields = ('id', 'ref', 'created_date', 'modified_date')
+        read_only_fields = ('id', 'ref', 'created_date', 'modified_date', 'description_html',
+                            'blocked_note_html')
+        exclude = ('total_voters',)
 
     def get_comment(self, obj):
         # NOTE: This method and field is necessary to historical comments work
@@ -53,22 +52,16 @@ class IssueSerializer(WatchersValidator, serializers.ModelSerializer):
     def get_generated_user_stories(self, obj):
         return obj.generated_user_stories.values("id", "ref", "subject")
 
-    def get_blocked_note_html(self, obj):
-        return mdrender(obj.project, obj.blocked_note)
-
-    def get_description_html(self, obj):
-        return mdrender(obj.project, obj.description)
-
     def get_votes_number(self, obj):
-        # The "votes_count" attribute is attached in the get_queryset of the viewset.
-        return getattr(obj, "votes_count", 0)
+        return obj.total_voters
 
 
 class IssueListSerializer(IssueSerializer):
     class Meta:
         model = models.Issue
-        read_only_fields = ('id', 'ref', 'created_date', 'modified_date')
-        exclude=("description", "description_html")
+        read_only_fields = ('id', 'ref', 'created_date', 'modified_date', 'description_html',
+                            'blocked_note_html')
+        exclude=("description", "description_html", "total_voters")
 
 
 class IssueNeighborsSerializer(NeighborsSerializerMixin, IssueSerializer):
@@ -0,0 +1,92 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Examples:
+# python manage.py render_html_fields
+# python manage.py render_html_fields --workers 8 --batch-size 500 --only-empty
+
+from multiprocessing import Pool
+from optparse import make_option
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Q
+from django.test.utils import override_settings
+
+from taiga.base.utils.iterators import split_by_n
+from taiga.projects.signals import render_html_fields
+
+
+MODELS = ("userstories.UserStory", "tasks.Task", "issues.Issue")
+
+
+def _render_batch(args):
+    model_name, ids = args
+    model = apps.get_model(model_name)
+
+    with transaction.atomic():
+        for obj in model.objects.filter(id__in=ids).select_related("project"):
+            render_html_fields(model, obj)
+            model.objects.filter(id=obj.id).update(description_html=obj.description_html,
+                                                   blocked_note_html=obj.blocked_note_html)
+    return len(ids)
+
+
+class Command(BaseCommand):
+    help = 'Render and store the html of the markdown fields of user stories, tasks and issues'
+    option_list = BaseCommand.option_list + (
+        make_option('--workers',
+                    action='store',
+                    dest='workers',
+                    type='int',
+                    default=4,
+                    help='Number of worker processes'),
+        ) + (
+        make_option('--batch-size',
+                    action='store',
+                    dest='batch_size',
+                    type='int',
+                    default=200,
+                    help='Number of objects rendered per batch'),
+        ) + (
+        make_option('--only-empty',
+                    action='store_true',
+                    dest='only_empty',
+                    default=False,
+                    help='Render only the objects without a stored html'),
+        )
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        batches = []
+        for model_name in MODELS:
+            qs = apps.get_model(model_name).objects.order_by("id")
+            if options["only_empty"]:
+                qs = qs.filter((Q(description_html="") & ~Q(description="")) |
+                               (Q(blocked_note_html="") & ~Q(blocked_note="")))
+            ids = list(qs.values_list("id", flat=True))
+            batches += [(model_name, batch) for batch in split_by_n(ids, options["batch_size"])]
+
+        # The workers are forked, so they can't share the database connection
+        for connection in connections.all():
+            connection.close()
+
+        total = 0
+        with Pool(processes=options["workers"]) as pool:
+            for rendered in pool.imap_unordered(_render_batch, batches):
+                total += rendered
+                self.stdout.write("Rendered: {}".format(total))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0023_auto_20150721_1511'),
+        ('userstories', '0010_userstory_description_html_blocked_note_html'),
+        ('tasks', '0008_task_description_html_blocked_note_html'),
+        ('issues', '0006_issue_description_html_blocked_note_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTag',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='ID', auto_created=True)),
+                ('name', models.TextField(verbose_name='name')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='count')),
+                ('project', models.ForeignKey(related_name='tags_dictionary', verbose_name='project', to='projects.Project')),
+            ],
+            options={
+                'verbose_name_plural': 'project tags',
+                'verbose_name': 'project tag',
+                'ordering': ['project', 'name'],
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='projecttag',
+            unique_together=set([('project', 'name')]),
+        ),
+
+        # Index used by the tags autocompletion (prefix searches)
+        migrations.RunSQL(
+            """
+            CREATE INDEX "projects_projecttag_project_id_name_like"
+                      ON "projects_projecttag" ("project_id", "name" text_pattern_ops);
+            """,
+            reverse_sql="""DROP INDEX IF EXISTS "projects_projecttag_project_id_name_like";"""
+        ),
+
+        # Index used by the tags filters (tags @> ARRAY[...])
+        migrations.RunSQL(
+            """
+            CREATE INDEX "projects_project_tags_gin" ON "projects_project" USING gin ("tags");
+            """,
+            reverse_sql="""DROP INDEX IF EXISTS "projects_project_tags_gin";"""
+        ),
+
+        # Fill the tags dictionary with the tags in use
+        migrations.RunSQL(
+            """
+            INSERT INTO "projects_projecttag" ("project_id", "name", "count")
+                 SELECT "project_id", "tag", count(*)
+                   FROM (SELECT DISTINCT "id", "project_id", unnest("tags") AS "tag"
+                           FROM "userstories_userstory"
+                      UNION ALL
+                         SELECT DISTINCT "id", "project_id", unnest("tags") AS "tag"
+                           FROM "tasks_task"
+                      UNION ALL
+                         SELECT DISTINCT "id", "project_id", unnest("tags") AS "tag"
+                           FROM "issues_issue") AS "items_tags"
+               GROUP BY "project_id", "tag";
+            """,
+            reverse_sql="""DELETE FROM "projects_projecttag";"""
+        ),
+    ]
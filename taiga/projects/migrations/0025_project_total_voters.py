@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0024_projecttag'),
+        ('votes', '0001_initial'),
+        ('contenttypes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='total_voters',
+            field=models.PositiveIntegerField(default=0, verbose_name='total voters'),
+            preserve_default=True,
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE "projects_project"
+               SET "total_voters" = "votes"."count"
+              FROM (SELECT "object_id", count(*) AS "count"
+                      FROM "votes_vote"
+                     WHERE "content_type_id" = (SELECT "id"
+                                                  FROM "django_content_type"
+                                                 WHERE "app_label" = 'projects'
+                                                   AND "model" = 'project')
+                  GROUP BY "object_id") AS "votes"
+             WHERE "projects_project"."id" = "votes"."object_id";
+            """
+        ),
+    ]
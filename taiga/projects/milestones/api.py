@@ -25,11 +25,10 @@ from taiga.projects.history.mixins import HistoryResourceMixin
 
 
 from . import serializers
+from . import services
 from . import models
 from . import permissions
 
-import datetime
-
 
 class MilestoneViewSet(HistoryResourceMixin, WatchedResourceMixin, ModelCrudViewSet):
     serializer_class = serializers.MilestoneSerializer
@@ -63,33 +62,5 @@ class MilestoneViewSet(HistoryResourceMixin, WatchedResourceMixin, ModelCrudView
 
         self.check_permissions(request, "stats", milestone)
 
-        total_points = milestone.total_points
-        milestone_stats = {
-            'name': milestone.name,
-            'estimated_start': milestone.estimated_start,
-            'estimated_finish': milestone.estimated_finish,
-            'total_points': total_points,
-            'completed_points': milestone.closed_points.values(),
-            'total_userstories': milestone.user_stories.count(),
-            'completed_userstories': len([us for us in milestone.user_stories.all() if us.is_closed]),
-            'total_tasks': milestone.tasks.all().count(),
-            'completed_tasks': milestone.tasks.all().filter(status__is_closed=True).count(),
-            'iocaine_doses': milestone.tasks.filter(is_iocaine=True).count(),
-            'days': []
-        }
-        current_date = milestone.estimated_start
-        sumTotalPoints = sum(total_points.values())
-        optimal_points = sumTotalPoints
-        milestone_days = (milestone.estimated_finish - milestone.estimated_start).days
-        optimal_points_per_day = sumTotalPoints / milestone_days if milestone_days else 0
-        while current_date <= milestone.estimated_finish:
-            milestone_stats['days'].append({
-                'day': current_date,
-                'name': current_date.day,
-                'open_points':  sumTotalPoints - sum(milestone.closed_points_by_date(current_date).values()),
-                'optimal_points': optimal_points,
-            })
-            current_date = current_date + datetime.timedelta(days=1)
-            optimal_points -= optimal_points_per_day
-
+        milestone_stats = services.get_milestone_stats(milestone)
         return response.Ok(milestone_stats)
@@ -0,0 +1,81 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from django.apps import AppConfig
+from django.apps import apps
+from django.db.models import signals
+
+from . import signals as handlers
+
+
+def connect_milestones_signals():
+    # Stats
+    signals.post_save.connect(handlers.invalidate_milestone_stats_when_change_milestone,
+                              sender=apps.get_model("milestones", "Milestone"),
+                              dispatch_uid="invalidate_milestone_stats_when_change_milestone")
+    signals.post_save.connect(handlers.invalidate_milestone_stats_when_change_us,
+                              sender=apps.get_model("userstories", "UserStory"),
+                              dispatch_uid="invalidate_milestone_stats_when_change_us")
+    signals.post_delete.connect(handlers.invalidate_milestone_stats_when_change_us,
+                                sender=apps.get_model("userstories", "UserStory"),
+                                dispatch_uid="invalidate_milestone_stats_when_delete_us")
+    signals.post_save.connect(handlers.invalidate_milestone_stats_when_change_role_points,
+                              sender=apps.get_model("userstories", "RolePoints"),
+                              dispatch_uid="invalidate_milestone_stats_when_change_role_points")
+    signals.post_delete.connect(handlers.invalidate_milestone_stats_when_change_role_points,
+                                sender=apps.get_model("userstories", "RolePoints"),
+                                dispatch_uid="invalidate_milestone_stats_when_delete_role_points")
+    signals.post_save.connect(handlers.invalidate_milestone_stats_when_change_project_attribute,
+                              sender=apps.get_model("projects", "Points"),
+                              dispatch_uid="invalidate_milestone_stats_when_change_points")
+    signals.post_delete.connect(handlers.invalidate_milestone_stats_when_change_project_attribute,
+                                sender=apps.get_model("projects", "Points"),
+                                dispatch_uid="invalidate_milestone_stats_when_delete_points")
+    signals.post_save.connect(handlers.invalidate_milestone_stats_when_change_project_attribute,
+                              sender=apps.get_model("projects", "UserStoryStatus"),
+                              dispatch_uid="invalidate_milestone_stats_when_change_us_status")
+    signals.post_save.connect(handlers.invalidate_milestone_stats_when_change_project_attribute,
+                              sender=apps.get_model("projects", "TaskStatus"),
+                              dispatch_uid="invalidate_milestone_stats_when_change_task_status")
+    signals.post_save.connect(handlers.invalidate_milestone_stats_when_change_task,
+                              sender=apps.get_model("tasks", "Task"),
+                              dispatch_uid="invalidate_milestone_stats_when_change_task")
+    signals.post_delete.connect(handlers.invalidate_milestone_stats_when_change_task,
+                                sender=apps.get_model("tasks", "Task"),
+                                dispatch_uid="invalidate_milestone_stats_when_delete_task")
+
+
+def disconnect_milestones_signals():
+    signals.post_save.disconnect(sender=apps.get_model("milestones", "Milestone"), dispatch_uid="invalidate_milestone_stats_when_change_milestone")
+    signals.post_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="invalidate_milestone_stats_when_change_us")
+    signals.post_delete.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="invalidate_milestone_stats_when_delete_us")
+    signals.post_save.disconnect(sender=apps.get_model("userstories", "RolePoints"), dispatch_uid="invalidate_milestone_stats_when_change_role_points")
+    signals.post_delete.disconnect(sender=apps.get_model("userstories", "RolePoints"), dispatch_uid="invalidate_milestone_stats_when_delete_role_points")
+    signals.post_save.disconnect(sender=apps.get_model("projects", "Points"), dispatch_uid="invalidate_milestone_stats_when_change_points")
+    signals.post_delete.disconnect(sender=apps.get_model("projects", "Points"), dispatch_uid="invalidate_milestone_stats_when_delete_points")
+    signals.post_save.disconnect(sender=apps.get_model("projects", "UserStoryStatus"), dispatch_uid="invalidate_milestone_stats_when_change_us_status")
+    signals.post_save.disconnect(sender=apps.get_model("projects", "TaskStatus"), dispatch_uid="invalidate_milestone_stats_when_change_task_status")
+    signals.post_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="invalidate_milestone_stats_when_change_task")
+    signals.post_delete.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="invalidate_milestone_stats_when_delete_task")
+
+
+class MilestonesAppConfig(AppConfig):
+    name = "taiga.projects.milestones"
+    verbose_name = "Milestones"
+
+    def ready(self):
+        connect_milestones_signals()
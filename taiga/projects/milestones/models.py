@@ -26,7 +26,6 @@ from taiga.projects.notifications.mixins import WatchedModelMixin
 from taiga.projects.userstories.models import UserStory
 
 import itertools
-import datetime
 
 
 class Milestone(WatchedModelMixin, models.Model):
@@ -147,10 +146,3 @@ class Milestone(WatchedModelMixin, models.Model):
     @property
     def shared_increment_points(self):
         return self._get_increment_points()["shared_increment"]
-
-    def closed_points_by_date(self, date):
-        return self._get_user_stories_points([
-            us for us in self.user_stories.filter(
-                finish_date__lt=date + datetime.timedelta(days=1)
-            ).prefetch_related('role_points', 'role_points__points') if us.is_closed
-        ])
@@ -14,8 +14,15 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from contextlib import closing
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.utils import timezone
 
+from taiga.base.utils.instrumentation import record_cache_lookup
+
 from . import models
 
 
@@ -36,3 +43,167 @@ def open_milestone(milestone):
     if milestone.closed:
         milestone.closed = False
         milestone.save(update_fields=["closed",])
+
+
+def get_increment_points_by_milestone(project):
+    """
+    Get the client, team and shared increment points by role of every
+    milestone of a project, the points of the user stories created between
+    the milestone dates, with a single grouped query.
+    """
+    sql = """
+        SELECT ml.id, rp.role_id, us.client_requirement, us.team_requirement,
+               SUM(COALESCE(p.value, 0))
+          FROM milestones_milestone ml
+    INNER JOIN userstories_userstory us
+            ON us.project_id = ml.project_id
+           AND (us.created_date AT TIME ZONE 'UTC')::date >= ml.estimated_start
+           AND (us.created_date AT TIME ZONE 'UTC')::date < ml.estimated_finish
+    INNER JOIN userstories_rolepoints rp ON rp.user_story_id = us.id
+     LEFT JOIN projects_points p ON p.id = rp.points_id
+         WHERE ml.project_id = %s
+           AND (us.client_requirement OR us.team_requirement)
+      GROUP BY ml.id, rp.role_id, us.client_requirement, us.team_requirement
+    """
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(sql, [project.id])
+        rows = cursor.fetchall()
+
+    increments = {}
+    for milestone_id, role_id, client_requirement, team_requirement, points in rows:
+        if client_requirement and team_requirement:
+            increment_type = "shared_increment"
+        elif client_requirement:
+            increment_type = "client_increment"
+        else:
+            increment_type = "team_increment"
+
+        milestone_increments = increments.setdefault(milestone_id, {
+            "client_increment": {},
+            "team_increment": {},
+            "shared_increment": {},
+        })
+        milestone_increments[increment_type][role_id] = points
+
+    return increments
+
+
+def attach_increment_points(project, milestones):
+    """
+    Attach the increment points to the milestones of a project, so their
+    *_increment_points properties don't query the user stories.
+    """
+    increments = get_increment_points_by_milestone(project)
+    for milestone in milestones:
+        milestone._increments = increments.get(milestone.id, {
+            "client_increment": {},
+            "team_increment": {},
+            "shared_increment": {},
+        })
+    return milestones
+
+
+def _make_milestone_stats_cache_key(milestone_id):
+    return "milestones-stats-{}".format(milestone_id)
+
+
+def invalidate_milestone_stats(milestone_id):
+    cache.delete(_make_milestone_stats_cache_key(milestone_id))
+
+
+def invalidate_project_milestones_stats(project_id):
+    milestone_ids = models.Milestone.objects.filter(project_id=project_id).values_list("id", flat=True)
+    cache.delete_many([_make_milestone_stats_cache_key(milestone_id) for milestone_id in milestone_ids])
+
+
+def get_points_by_role(milestone):
+    """
+    Get the total and the closed points by role of the user stories
+    of a milestone with a single query.
+    """
+    sql = """
+        SELECT rp.role_id,
+               SUM(COALESCE(p.value, 0)),
+               SUM(CASE WHEN us.is_closed THEN COALESCE(p.value, 0) ELSE 0 END),
+               bool_or(us.is_closed)
+          FROM userstories_rolepoints rp
+    INNER JOIN userstories_userstory us ON us.id = rp.user_story_id
+     LEFT JOIN projects_points p ON p.id = rp.points_id
+         WHERE us.milestone_id = %s
+      GROUP BY rp.role_id
+      ORDER BY rp.role_id
+    """
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(sql, [milestone.id])
+        rows = cursor.fetchall()
+
+    total_points = {role_id: total for role_id, total, closed, has_closed in rows}
+    closed_points = {role_id: closed for role_id, total, closed, has_closed in rows if has_closed}
+    return total_points, closed_points
+
+
+def get_closed_points_by_day(milestone):
+    """
+    Get a list of (day, closed points) for every day of a milestone, with
+    the points of the user stories closed until the end of that day, in a
+    single query.
+    """
+    sql = """
+        SELECT days.day::date, COALESCE(SUM(closed_us.value), 0)
+          FROM generate_series(%s::timestamp, %s::timestamp, interval '1 day') AS days(day)
+     LEFT JOIN (SELECT us.finish_date, COALESCE(p.value, 0) AS value
+                  FROM userstories_rolepoints rp
+            INNER JOIN userstories_userstory us ON us.id = rp.user_story_id
+             LEFT JOIN projects_points p ON p.id = rp.points_id
+                 WHERE us.milestone_id = %s AND us.is_closed) AS closed_us
+                ON closed_us.finish_date < (days.day + interval '1 day') AT TIME ZONE %s
+      GROUP BY days.day
+      ORDER BY days.day
+    """
+    params = [milestone.estimated_start, milestone.estimated_finish, milestone.id,
+              timezone.get_default_timezone_name()]
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def get_milestone_stats(milestone):
+    """
+    Get the stats and the burndown data of a milestone. The result is cached
+    until the milestone, its user stories or its tasks change.
+    """
+    key = _make_milestone_stats_cache_key(milestone.id)
+    milestone_stats = cache.get(key)
+    record_cache_lookup(milestone_stats is not None)
+    if milestone_stats is not None:
+        return milestone_stats
+
+    total_points, closed_points = get_points_by_role(milestone)
+    milestone_stats = {
+        'name': milestone.name,
+        'estimated_start': milestone.estimated_start,
+        'estimated_finish': milestone.estimated_finish,
+        'total_points': total_points,
+        'completed_points': list(closed_points.values()),
+        'total_userstories': milestone.user_stories.count(),
+        'completed_userstories': milestone.user_stories.filter(is_closed=True).count(),
+        'total_tasks': milestone.tasks.all().count(),
+        'completed_tasks': milestone.tasks.all().filter(status__is_closed=True).count(),
+        'iocaine_doses': milestone.tasks.filter(is_iocaine=True).count(),
+        'days': []
+    }
+    sumTotalPoints = sum(total_points.values())
+    optimal_points = sumTotalPoints
+    milestone_days = (milestone.estimated_finish - milestone.estimated_start).days
+    optimal_points_per_day = sumTotalPoints / milestone_days if milestone_days else 0
+    for day, day_closed_points in get_closed_points_by_day(milestone):
+        milestone_stats['days'].append({
+            'day': day,
+            'name': day.day,
+            'open_points':  sumTotalPoints - day_closed_points,
+            'optimal_points': optimal_points,
+        })
+        optimal_points -= optimal_points_per_day
+
+    cache.set(key, milestone_stats, getattr(settings, "MILESTONES_STATS_CACHE_TIMEOUT", 60 * 60 * 24))
+    return milestone_stats
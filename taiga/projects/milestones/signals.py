@@ -0,0 +1,57 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from django.apps import apps
+
+from . import services
+
+
+####################################
+# Signals for invalidate the stats
+####################################
+
+def invalidate_milestone_stats_when_change_milestone(sender, instance, **kwargs):
+    services.invalidate_milestone_stats(instance.id)
+
+
+def invalidate_milestone_stats_when_change_us(sender, instance, **kwargs):
+    if instance.milestone_id:
+        services.invalidate_milestone_stats(instance.milestone_id)
+
+    prev = getattr(instance, "prev", None)
+    if prev and prev.milestone_id and prev.milestone_id != instance.milestone_id:
+        services.invalidate_milestone_stats(prev.milestone_id)
+
+
+def invalidate_milestone_stats_when_change_role_points(sender, instance, **kwargs):
+    # The user story may be already deleted
+    user_story_model = apps.get_model("userstories", "UserStory")
+    milestone_id = (user_story_model.objects.filter(id=instance.user_story_id)
+                                            .values_list("milestone_id", flat=True)
+                                            .first())
+    if milestone_id:
+        services.invalidate_milestone_stats(milestone_id)
+
+
+def invalidate_milestone_stats_when_change_project_attribute(sender, instance, **kwargs):
+    # Points values and statuses affect the stats of all the milestones
+    services.invalidate_project_milestones_stats(instance.project_id)
+
+
+def invalidate_milestone_stats_when_change_task(sender, instance, **kwargs):
+    if instance.milestone_id:
+        services.invalidate_milestone_stats(instance.milestone_id)
@@ -37,6 +37,7 @@ from taiga.base.utils.slug import slugify_uniquely
 from taiga.base.utils.dicts import dict_sum
 from taiga.base.utils.sequence import arithmetic_progression
 from taiga.base.utils.slug import slugify_uniquely_for_queryset
+from taiga.projects.votes.mixins import VotedModelMixin
 
 from . import choices
 
@@ -118,7 +119,7 @@ class ProjectDefaults(models.Model):
         abstract = True
 
 
-class Project(ProjectDefaults, TaggedMixin, models.Model):
+class Project(ProjectDefaults, TaggedMixin, VotedModelMixin, models.Model):
     name = models.CharField(max_length=250, null=False, blank=False,
                             verbose_name=_("name"))
     slug = models.SlugField(max_length=250, unique=True, null=False, blank=True,
@@ -344,6 +345,24 @@ class ProjectModulesConfig(models.Model):
         ordering = ["project"]
 
 
+class ProjectTag(models.Model):
+    project = models.ForeignKey("Project", null=False, blank=False,
+                                related_name="tags_dictionary", verbose_name=_("project"))
+    # The tags of the items are unbounded
+    name = models.TextField(null=False, blank=False, verbose_name=_("name"))
+    count = models.PositiveIntegerField(default=0, null=False, blank=False,
+                                        verbose_name=_("count"))
+
+    class Meta:
+        verbose_name = "project tag"
+        verbose_name_plural = "project tags"
+        ordering = ["project", "name"]
+        unique_together = ("project", "name")
+
+    def __str__(self):
+        return self.name
+
+
 # User Stories common Models
 class UserStoryStatus(models.Model):
     name = models.CharField(max_length=255, null=False, blank=False,
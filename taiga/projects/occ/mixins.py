@@ -18,7 +18,6 @@ from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
 from taiga.base import exceptions as exc
-from taiga.base.utils import db
 from taiga.projects.history.services import get_modified_fields
 
 
@@ -47,43 +46,53 @@ class OCCResourceMixin(object):
 
         return True
 
+    def _increase_version(self, obj, param_version, modifying_fields):
+        """
+        Increase the version of the object with a conditional UPDATE, if the
+        stored one is the version the changes were made from. Otherwise the
+        changes are only accepted if none of the modified fields were
+        changed by the newer versions. The row stays locked until the
+        request ends, so the object can't be changed meanwhile.
+        """
+        queryset = type(obj).objects.filter(pk=obj.pk)
+        if queryset.filter(version=param_version).update(version=models.F("version") + 1) > 0:
+            return param_version + 1
+
+        current_version = queryset.values_list("version", flat=True).first()
+        if current_version is None:
+            raise exc.NotFound()
+        if param_version > current_version:
+            raise exc.WrongArguments({"version": _("The version parameter is not valid")})
+
+        modified_fields = set(get_modified_fields(obj, current_version - param_version))
+        modified_fields.discard("version")
+        if modifying_fields & modified_fields:
+            raise exc.WrongArguments({"version": _("The version doesn't match with the current one")})
+
+        # Other request could have changed the object meanwhile
+        if queryset.filter(version=current_version).update(version=models.F("version") + 1) == 0:
+            raise exc.WrongArguments({"version": _("The version doesn't match with the current one")})
+
+        return current_version + 1
+
     def _validate_and_update_version(self, obj):
-        current_version = None
         if obj.id:
-            current_version = type(obj).objects.model.objects.get(id=obj.id).version
-
             # Extract param version
             param_version = self._extract_param_version()
-            if not self._validate_param_version(param_version, current_version):
+            if not self._validate_param_version(param_version, None):
                 raise exc.WrongArguments({"version": _("The version parameter is not valid")})
 
-            if current_version != param_version:
-                diff_versions = current_version - param_version
-
-                modifying_fields = set(self.request.DATA.keys())
-                if "version" in modifying_fields:
-                    modifying_fields.remove("version")
-
-                modified_fields = set(get_modified_fields(obj, diff_versions))
-                if "version" in modifying_fields:
-                    modified_fields.remove("version")
+            modifying_fields = set(self.request.DATA.keys())
+            modifying_fields.discard("version")
 
-                both_modified = modifying_fields & modified_fields
-
-                if both_modified:
-                    raise exc.WrongArguments({"version": _("The version doesn't match with the current one")})
-
-            obj.version = models.F('version') + 1
+            # If the request fails after this, the transaction is rolled back
+            # with the increased version.
+            obj.version = self._increase_version(obj, param_version, modifying_fields)
 
     def pre_save(self, obj):
         self._validate_and_update_version(obj)
         super().pre_save(obj)
 
-    def post_save(self, obj, created=False):
-        super().post_save(obj, created)
-        if not created:
-            obj.version = db.reload_attribute(obj, 'version')
-
 
 class OCCModelMixin(models.Model):
     """
@@ -55,6 +55,13 @@ def make_unique_reference_id(project, *, create=False):
     return seq.next_value(seqname)
 
 
+def make_unique_reference_ids(project, count, *, create=False):
+    seqname = make_sequence_name(project)
+    if create and not seq.exists(seqname):
+        seq.create(seqname)
+    return seq.next_values(seqname, count)
+
+
 def make_reference(instance, project, create=False):
     refval = make_unique_reference_id(project, create=create)
     ct = ContentType.objects.get_for_model(instance.__class__)
@@ -65,6 +72,43 @@ def make_reference(instance, project, create=False):
     return refval, refinstance
 
 
+def reserve_references_in_bulk(instances, project, create=False):
+    """Attach a ref to each one of the (unsaved) instances.
+
+    All the values are reserved with a single query, and the instances are
+    marked so the reference signal handlers ignore them. The Reference rows
+    must be created later, once the instances have a pk, with
+    `store_references_in_bulk`.
+    """
+    if not instances:
+        return
+
+    refvals = make_unique_reference_ids(project, len(instances), create=create)
+    for instance, refval in zip(instances, refvals):
+        instance.ref = refval
+        instance._ref_reserved = True
+
+
+def store_references_in_bulk(instances, project):
+    """Create, with a single insert, the Reference rows of instances that
+    have been saved after `reserve_references_in_bulk`.
+    """
+    references = []
+    for instance in instances:
+        if not getattr(instance, "_ref_reserved", False):
+            continue
+
+        ct = ContentType.objects.get_for_model(instance.__class__)
+        references.append(Reference(content_type=ct,
+                                    object_id=instance.pk,
+                                    ref=instance.ref,
+                                    project=project))
+        instance._ref_reserved = False
+
+    Reference.objects.bulk_create(references)
+    return references
+
+
 def create_sequence(sender, instance, created, **kwargs):
     if not created:
         return
@@ -81,30 +125,51 @@ def delete_sequence(sender, instance, **kwargs):
 
 
 def store_previous_project(sender, instance, **kwargs):
-    try:
-        prev_instance = sender.objects.get(pk=instance.pk)
-        instance.prev_project = prev_instance.project
-    except sender.DoesNotExist:
-        instance.prev_project = None
+    if instance.pk is None or getattr(instance, "_ref_reserved", False):
+        instance.prev_project_id = None
+        return
+
+    qs = sender.objects.filter(pk=instance.pk)
+    instance.prev_project_id = qs.values_list("project_id", flat=True).first()
+
+
+def reserve_reference(sender, instance, **kwargs):
+    if instance._importing or getattr(instance, "_ref_reserved", False):
+        return
+
+    if instance.prev_project_id != instance.project_id:
+        # Attach the sequence number to the instance before it is
+        # inserted, so it doesn't need to be saved twice.
+        instance.ref = make_unique_reference_id(instance.project)
+        instance._ref_pending = True
 
 
 def attach_sequence(sender, instance, created, **kwargs):
-    if not instance._importing:
-        if created or instance.prev_project != instance.project:
-            # Create a reference object. This operation should be
-            # used in transaction context, otherwise it can
-            # create a lot of phantom reference objects.
-            refval, _ = make_reference(instance, instance.project)
+    if not getattr(instance, "_ref_pending", False):
+        return
+
+    # Create a reference object. This operation should be
+    # used in transaction context, otherwise it can
+    # create a lot of phantom reference objects.
+    ct = ContentType.objects.get_for_model(instance.__class__)
+    Reference.objects.create(content_type=ct,
+                             object_id=instance.pk,
+                             ref=instance.ref,
+                             project_id=instance.project_id)
+    instance._ref_pending = False
 
-            # Additionally, attach sequence number to instance as ref
-            instance.ref = refval
-            instance.save(update_fields=['ref'])
+    update_fields = kwargs.get("update_fields", None)
+    if update_fields is not None and "ref" not in update_fields:
+        sender.objects.filter(pk=instance.pk).update(ref=instance.ref)
 
 
 models.signals.post_save.connect(create_sequence, sender=Project, dispatch_uid="refproj")
 models.signals.pre_save.connect(store_previous_project, sender=UserStory, dispatch_uid="refus")
 models.signals.pre_save.connect(store_previous_project, sender=Issue, dispatch_uid="refissue")
 models.signals.pre_save.connect(store_previous_project, sender=Task, dispatch_uid="reftask")
+models.signals.pre_save.connect(reserve_reference, sender=UserStory, dispatch_uid="refresus")
+models.signals.pre_save.connect(reserve_reference, sender=Issue, dispatch_uid="refresissue")
+models.signals.pre_save.connect(reserve_reference, sender=Task, dispatch_uid="refrestask")
 models.signals.post_save.connect(attach_sequence, sender=UserStory, dispatch_uid="refus")
 models.signals.post_save.connect(attach_sequence, sender=Issue, dispatch_uid="refissue")
 models.signals.post_save.connect(attach_sequence, sender=Task, dispatch_uid="reftask")
@@ -25,3 +25,16 @@ def get_instance_by_ref(project_id, obj_ref):
         instance = None
 
     return instance
+
+
+def get_instances_by_refs(project_id, obj_refs):
+    """Get a dict with the references of a project, by ref, prefetching
+    their content objects (one query per content type).
+    """
+    if not obj_refs:
+        return {}
+
+    model_cls = apps.get_model("references", "Reference")
+    qs = model_cls.objects.filter(project_id=project_id, ref__in=obj_refs)
+    qs = qs.select_related("content_type").prefetch_related("content_object")
+    return {instance.ref: instance for instance in qs}
@@ -319,11 +319,10 @@ class ProjectSerializer(serializers.ModelSerializer):
         model = models.Project
         read_only_fields = ("created_date", "modified_date", "owner", "slug")
         exclude = ("last_us_ref", "last_task_ref", "last_issue_ref",
-                   "issues_csv_uuid", "tasks_csv_uuid", "userstories_csv_uuid")
+                   "issues_csv_uuid", "tasks_csv_uuid", "userstories_csv_uuid", "total_voters")
 
     def get_stars_number(self, obj):
-        # The "stars_count" attribute is attached in the get_queryset of the viewset.
-        return getattr(obj, "stars_count", 0)
+        return obj.total_voters
 
     def get_my_permissions(self, obj):
         if "request" in self.context:
@@ -383,7 +382,7 @@ class ProjectDetailAdminSerializer(ProjectDetailSerializer):
     class Meta:
         model = models.Project
         read_only_fields = ("created_date", "modified_date", "owner", "slug")
-        exclude = ("last_us_ref", "last_task_ref", "last_issue_ref")
+        exclude = ("last_us_ref", "last_task_ref", "last_issue_ref", "total_voters")
 
 
 ######################################################
@@ -39,6 +39,8 @@ from .members import remove_user_from_project, project_has_valid_owners, can_use
 from .invitations import send_invitation
 from .invitations import find_invited_user
 
+from .tags import get_tags_dictionary
+
 from .tags_colors import update_project_tags_colors_handler
 
 from .modules_config import get_modules_config
@@ -15,7 +15,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from contextlib import closing
+from operator import itemgetter
+
+from django.contrib.auth import get_user_model
 from django.db import connection
+from django.db.models import Q
+from django.utils.translation import ugettext as _
 
 
 def _get_project_tags(project):
@@ -26,28 +31,8 @@ def _get_project_tags(project):
     return result
 
 
-def _get_stories_tags(project):
-    result = set()
-    for tags in project.user_stories.values_list("tags", flat=True):
-        if tags:
-            result.update(tags)
-    return result
-
-
-def _get_tasks_tags(project):
-    result = set()
-    for tags in project.tasks.values_list("tags", flat=True):
-        if tags:
-            result.update(tags)
-    return result
-
-
-def _get_issues_tags(project):
-    result = set()
-    for tags in project.issues.values_list("tags", flat=True):
-        if tags:
-            result.update(tags)
-    return result
+def _get_items_tags(project):
+    return set(project.tags_dictionary.values_list("name", flat=True))
 
 
 # Public api
@@ -59,7 +44,139 @@ def get_all_tags(project):
     """
     result = set()
     result.update(_get_project_tags(project))
-    result.update(_get_issues_tags(project))
-    result.update(_get_stories_tags(project))
-    result.update(_get_tasks_tags(project))
+    result.update(_get_items_tags(project))
     return sorted(result)
+
+
+def _get_where(queryset):
+    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
+    where, where_params = queryset.query.where.as_sql(compiler, connection)
+    return (where or "TRUE"), list(where_params)
+
+
+def get_facets_counts(model, project, facets):
+    """
+    Given a model, a project and a list of `(field_name, queryset)` facets,
+    count the objects of every facet queryset grouped by the facet field.
+
+    All the facets are computed with a single scan of the model table: every
+    queryset WHERE becomes a boolean column and is applied with a `FILTER`
+    clause to its own `GROUP BY`. Array fields (like tags) are unnested, so
+    every element is counted.
+
+    Return a list with a `{value: count}` dict for every facet.
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+
+    columns = []
+    flags = []
+    params = []
+    groups = []
+    array_facets = set()
+    for index, (field_name, queryset) in enumerate(facets):
+        field = model._meta.get_field(field_name)
+        column = qn(field.column)
+        if column not in columns:
+            columns.append(column)
+
+        where, where_params = _get_where(queryset)
+        flags.append("({where}) AS facet_{index}".format(where=where, index=index))
+        params += where_params
+
+        if field.db_type(connection).endswith("[]"):
+            array_facets.add(index)
+            groups.append("""
+                SELECT {index}, NULL::integer, facet_value, count(*) FILTER (WHERE facet_{index})
+                  FROM facet_rows, unnest(facet_rows.{column}) AS facet_value
+              GROUP BY facet_value
+            """.format(index=index, column=column))
+        else:
+            groups.append("""
+                SELECT {index}, facet_rows.{column}, NULL::text, count(*) FILTER (WHERE facet_{index})
+                  FROM facet_rows
+              GROUP BY facet_rows.{column}
+            """.format(index=index, column=column))
+
+    extra_sql = """
+      WITH facet_rows AS (
+               SELECT {columns}, {flags}
+                 FROM {table}
+                      INNER JOIN "projects_project" ON
+                                 ({table}."project_id" = "projects_project"."id")
+                WHERE {table}."project_id" = %s
+           )
+      {groups};
+    """.format(columns=", ".join("{}.{}".format(table, c) for c in columns),
+               flags=", ".join(flags),
+               table=table,
+               groups=" UNION ALL ".join(groups))
+
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(extra_sql, params + [project.id])
+        rows = cursor.fetchall()
+
+    result = [{} for facet in facets]
+    for index, value_id, value_text, count in rows:
+        if count > 0:
+            value = value_text if index in array_facets else value_id
+            result[index][value] = count
+    return result
+
+
+def get_choices_facet(queryset, counts):
+    """
+    Format the counts of a facet over a choices model (statuses, types,
+    priorities, severities) of a project.
+    """
+    result = []
+    for id, name, color, order in queryset.values_list("id", "name", "color", "order"):
+        result.append({
+            "id": id,
+            "name": _(name),
+            "color": color,
+            "order": order,
+            "count": counts.get(id, 0),
+        })
+    return sorted(result, key=itemgetter("order"))
+
+
+def get_assigned_to_facet(project, counts):
+    """
+    Format the counts of the assigned to facet: one entry for the
+    unassigned objects and another for every project member.
+    """
+    result = [{"id": None, "full_name": "", "count": counts.get(None, 0)}]
+    members = get_user_model().objects.filter(memberships__project_id=project.id).distinct()
+    for id, full_name in members.values_list("id", "full_name"):
+        result.append({
+            "id": id,
+            "full_name": full_name or "",
+            "count": counts.get(id, 0),
+        })
+    return sorted(result, key=itemgetter("full_name"))
+
+
+def get_owners_facet(project, counts):
+    """
+    Format the counts of the owners facet: the project members and the
+    system users that own at least one object.
+    """
+    owners = get_user_model().objects.filter(Q(memberships__project_id=project.id) | Q(is_system=True),
+                                             id__in=[id for id, count in counts.items() if count > 0])
+    result = []
+    for id, full_name in owners.distinct().values_list("id", "full_name"):
+        result.append({
+            "id": id,
+            "full_name": full_name,
+            "count": counts[id],
+        })
+    return sorted(result, key=itemgetter("full_name"))
+
+
+def get_tags_facet(counts):
+    """
+    Format the counts of the tags facet.
+    """
+    tags = [{"name": name, "count": count} for name, count in counts.items()]
+    return sorted(tags, key=itemgetter("name"))
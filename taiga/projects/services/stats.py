@@ -21,6 +21,7 @@ import datetime
 import copy
 
 from taiga.projects.history.models import HistoryEntry
+from taiga.projects.milestones import services as milestones_services
 
 
 def _get_milestones_stats_for_backlog(project):
@@ -44,7 +45,7 @@ def _get_milestones_stats_for_backlog(project):
                              "user_stories__role_points",
                              "user_stories__role_points__points")
 
-    milestones = list(milestones)
+    milestones = milestones_services.attach_increment_points(project, list(milestones))
     milestones_count = len(milestones)
     optimal_points = 0
     team_increment = 0
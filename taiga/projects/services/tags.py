@@ -0,0 +1,82 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import F
+
+from taiga.projects.models import ProjectTag
+
+
+def _increment_tags(project_id, tags):
+    qs = ProjectTag.objects.filter(project_id=project_id, name__in=tags)
+    qs.update(count=F("count") + 1)
+
+    existing = set(qs.values_list("name", flat=True))
+    missing = [ProjectTag(project_id=project_id, name=tag, count=1)
+               for tag in tags if tag not in existing]
+    if not missing:
+        return
+
+    try:
+        with transaction.atomic():
+            ProjectTag.objects.bulk_create(missing)
+    except IntegrityError:
+        # Another item created some of these tags at the same time.
+        for tag in missing:
+            tag_obj, created = ProjectTag.objects.get_or_create(project_id=project_id, name=tag.name)
+            ProjectTag.objects.filter(id=tag_obj.id).update(count=F("count") + 1)
+
+
+def _decrement_tags(project_id, tags):
+    qs = ProjectTag.objects.filter(project_id=project_id, name__in=tags)
+    qs.filter(count__lte=1).delete()
+    qs.update(count=F("count") - 1)
+
+
+def update_tags_dictionary(project_id, tags, prev_project_id=None, prev_tags=None):
+    """
+    Update the tags dictionary of the projects with the changes of the tags
+    of an item: `prev_*` describe the item before the change (empty for new
+    items) and the others after it (empty for deleted items).
+    """
+    tags = set(tags or [])
+    prev_tags = set(prev_tags or [])
+
+    if prev_project_id != project_id:
+        if prev_project_id is not None and prev_tags:
+            _decrement_tags(prev_project_id, prev_tags)
+        if project_id is not None and tags:
+            _increment_tags(project_id, tags)
+        return
+
+    if prev_tags - tags:
+        _decrement_tags(project_id, prev_tags - tags)
+    if tags - prev_tags:
+        _increment_tags(project_id, tags - prev_tags)
+
+
+def get_tags_dictionary(project, prefix=None):
+    """
+    Given a project, return the list of tags used by its items with the
+    number of items that use each one, optionally only the tags that
+    start with `prefix`.
+    """
+    qs = ProjectTag.objects.filter(project_id=project.id)
+    if prefix:
+        qs = qs.filter(name__startswith=prefix.lower())
+    return [{"name": name, "count": count} for name, count in qs.values_list("name", "count")]
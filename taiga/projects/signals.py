@@ -17,7 +17,9 @@
 from django.apps import apps
 from django.conf import settings
 
+from taiga.mdrender.service import render as mdrender
 from taiga.projects.services.tags_colors import update_project_tags_colors_handler, remove_unused_tags
+from taiga.projects.services.tags import update_tags_dictionary
 from taiga.projects.notifications.services import create_notify_policy_if_not_exists
 from taiga.base.utils.db import get_typename_for_model_class
 
@@ -33,6 +35,25 @@ def tags_normalization(sender, instance, **kwargs):
         instance.tags = list(map(str.lower, instance.tags))
 
 
+def store_previous_tags(sender, instance, **kwargs):
+    instance._prev_tags = None
+    instance._prev_tags_project_id = None
+    if instance.pk:
+        prev = sender.objects.filter(pk=instance.pk).values_list("project_id", "tags").first()
+        if prev:
+            instance._prev_tags_project_id, instance._prev_tags = prev
+
+
+def update_tags_dictionary_when_create_or_edit_taggable_item(sender, instance, **kwargs):
+    update_tags_dictionary(instance.project_id, instance.tags,
+                           prev_project_id=getattr(instance, "_prev_tags_project_id", None),
+                           prev_tags=getattr(instance, "_prev_tags", None))
+
+
+def update_tags_dictionary_when_delete_taggable_item(sender, instance, **kwargs):
+    update_tags_dictionary(None, None, prev_project_id=instance.project_id, prev_tags=instance.tags)
+
+
 def update_project_tags_when_create_or_edit_taggable_item(sender, instance, **kwargs):
     update_project_tags_colors_handler(instance)
 
@@ -41,6 +62,21 @@ def update_project_tags_when_delete_taggable_item(sender, instance, **kwargs):
     remove_unused_tags(instance.project)
     instance.project.save()
 
+
+## HTML FIELDS
+
+def _render_html_field(instance, field_name):
+    text = getattr(instance, field_name)
+    html = mdrender(instance.project, text) if text else ""
+    setattr(instance, "{}_html".format(field_name), html)
+
+
+def render_html_fields(sender, instance, **kwargs):
+    # The html of the markdown fields is stored so the
+    # api never needs to render it when reading.
+    _render_html_field(instance, "description")
+    _render_html_field(instance, "blocked_note")
+
 def membership_post_delete(sender, instance, using, **kwargs):
     instance.project.update_role_points()
 
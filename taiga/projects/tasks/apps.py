@@ -36,10 +36,24 @@ def connect_tasks_signals():
                                 sender=apps.get_model("tasks", "Task"),
                                 dispatch_uid="try_to_close_or_open_us_and_milestone_when_delete_task")
 
+    # Html fields
+    signals.pre_save.connect(generic_handlers.render_html_fields,
+                             sender=apps.get_model("tasks", "Task"),
+                             dispatch_uid="render_html_fields_task")
+
     # Tags
     signals.pre_save.connect(generic_handlers.tags_normalization,
                              sender=apps.get_model("tasks", "Task"),
                              dispatch_uid="tags_normalization_task")
+    signals.pre_save.connect(generic_handlers.store_previous_tags,
+                             sender=apps.get_model("tasks", "Task"),
+                             dispatch_uid="store_previous_tags_task")
+    signals.post_save.connect(generic_handlers.update_tags_dictionary_when_create_or_edit_taggable_item,
+                              sender=apps.get_model("tasks", "Task"),
+                              dispatch_uid="update_tags_dictionary_when_create_or_edit_taggable_item_task")
+    signals.post_delete.connect(generic_handlers.update_tags_dictionary_when_delete_taggable_item,
+                                sender=apps.get_model("tasks", "Task"),
+                                dispatch_uid="update_tags_dictionary_when_delete_taggable_item_task")
     signals.post_save.connect(generic_handlers.update_project_tags_when_create_or_edit_taggable_item,
                               sender=apps.get_model("tasks", "Task"),
                               dispatch_uid="update_project_tags_when_create_or_edit_tagglabe_item_task")
@@ -63,7 +77,11 @@ def disconnect_tasks_signals():
     signals.pre_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="cached_prev_task")
     signals.post_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="try_to_close_or_open_us_and_milestone_when_create_or_edit_task")
     signals.post_delete.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="try_to_close_or_open_us_and_milestone_when_delete_task")
+    signals.pre_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="render_html_fields_task")
     signals.pre_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="tags_normalization")
+    signals.pre_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="store_previous_tags_task")
+    signals.post_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="update_tags_dictionary_when_create_or_edit_taggable_item_task")
+    signals.post_delete.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="update_tags_dictionary_when_delete_taggable_item_task")
     signals.post_save.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="update_project_tags_when_create_or_edit_tagglabe_item")
     signals.post_delete.disconnect(sender=apps.get_model("tasks", "Task"), dispatch_uid="update_project_tags_when_delete_tagglabe_item")
 
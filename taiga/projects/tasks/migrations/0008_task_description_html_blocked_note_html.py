@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_auto_20150629_1556'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='description_html',
+            field=models.TextField(default='', blank=True, verbose_name='description html'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='blocked_note_html',
+            field=models.TextField(default='', blank=True, verbose_name='blocked note html'),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_description_html_blocked_note_html'),
+    ]
+
+    operations = [
+        # Index used by the tags filters (tags @> ARRAY[...])
+        migrations.RunSQL(
+            """
+            CREATE INDEX "tasks_task_tags_gin" ON "tasks_task" USING gin ("tags");
+            """,
+            reverse_sql="""DROP INDEX IF EXISTS "tasks_task_tags_gin";"""
+        ),
+    ]
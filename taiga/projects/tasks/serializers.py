@@ -15,13 +15,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from taiga.base.api import serializers
+from taiga.base.serializers import ValuesListSerializer
 
 from taiga.base.fields import TagsField
 from taiga.base.fields import PgArrayField
 
 from taiga.base.neighbors import NeighborsSerializerMixin
 
-from taiga.mdrender.service import render as mdrender
 from taiga.projects.validators import ProjectExistsValidator
 from taiga.projects.milestones.validators import SprintExistsValidator
 from taiga.projects.tasks.validators import TaskExistsValidator
@@ -37,8 +37,6 @@ class TaskSerializer(WatchersValidator, serializers.ModelSerializer):
     external_reference = PgArrayField(required=False)
     comment = serializers.SerializerMethodField("get_comment")
     milestone_slug = serializers.SerializerMethodField("get_milestone_slug")
-    blocked_note_html = serializers.SerializerMethodField("get_blocked_note_html")
-    description_html = serializers.SerializerMethodField("get_description_html")
     is_closed =  serializers.SerializerMethodField("get_is_closed")
     status_extra_info = BasicTaskStatusSerializerSerializer(source="status", required=False, read_only=True)
     assigned_to_extra_info = UserBasicInfoSerializer(source="assigned_to", required=False, read_only=True)
@@ -46,7 +44,8 @@ class TaskSerializer(WatchersValidator, serializers.ModelSerializer):
 
     class Meta:
         model = models.Task
-        read_only_fields = ('id', 'ref', 'created_date', 'modified_date')
+        read_only_fields = ('id', 'ref', 'created_date', 'modified_date', 'description_html',
+                            'blocked_note_html')
 
     def get_comment(self, obj):
         return ""
@@ -57,12 +56,6 @@ class TaskSerializer(WatchersValidator, serializers.ModelSerializer):
         else:
             return None
 
-    def get_blocked_note_html(self, obj):
-        return mdrender(obj.project, obj.blocked_note)
-
-    def get_description_html(self, obj):
-        return mdrender(obj.project, obj.description)
-
     def get_is_closed(self, obj):
         return obj.status.is_closed
 
@@ -70,10 +63,34 @@ class TaskSerializer(WatchersValidator, serializers.ModelSerializer):
 class TaskListSerializer(TaskSerializer):
     class Meta:
         model = models.Task
-        read_only_fields = ('id', 'ref', 'created_date', 'modified_date')
+        read_only_fields = ('id', 'ref', 'created_date', 'modified_date', 'description_html',
+                            'blocked_note_html')
         exclude=("description", "description_html")
 
 
+class TaskListValuesSerializer(ValuesListSerializer):
+    """
+    Fast version of TaskListSerializer for the taskboard payload, built
+    from `.values()` rows.
+    """
+    serializer_class = TaskListSerializer
+    values_lookups = ("milestone__slug", "status__is_closed")
+    related_serializers = {
+        "status_extra_info": ("status", BasicTaskStatusSerializerSerializer),
+        "assigned_to_extra_info": ("assigned_to", UserBasicInfoSerializer),
+        "owner_extra_info": ("owner", UserBasicInfoSerializer),
+    }
+
+    def get_comment(self, row):
+        return ""
+
+    def get_milestone_slug(self, row):
+        return row["milestone__slug"]
+
+    def get_is_closed(self, row):
+        return row["status__is_closed"]
+
+
 class TaskNeighborsSerializer(NeighborsSerializerMixin, TaskSerializer):
     def serialize_neighbor(self, neighbor):
         return NeighborTaskSerializer(neighbor).data
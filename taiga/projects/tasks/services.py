@@ -15,10 +15,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import io
-import csv
+
+from django.conf import settings
 
 from taiga.base.utils import db, text
+from taiga.base.utils.iterators import iter_queryset_chunks
+from taiga.base.utils.streaming import iter_csv
+from taiga.projects.attachments.services import get_attachments_count
 from taiga.projects.history.services import take_snapshot
+from taiga.projects.references import models as refs
 from taiga.projects.tasks.apps import (
     connect_tasks_signals,
     disconnect_tasks_signals)
@@ -52,8 +57,14 @@ def create_tasks_in_bulk(bulk_data, callback=None, precall=None, **additional_fi
 
     disconnect_tasks_signals()
 
+    project = additional_fields.get("project", None)
+    if project is not None:
+        refs.reserve_references_in_bulk(tasks, project)
+
     try:
         db.save_in_bulk(tasks, callback, precall)
+        if project is not None:
+            refs.store_references_in_bulk(tasks, project)
     finally:
         connect_tasks_signals()
 
@@ -92,39 +103,60 @@ def snapshot_tasks_in_bulk(bulk_data, user):
 
 def tasks_to_csv(project, queryset):
     csv_data = io.StringIO()
+    csv_data.writelines(iter_tasks_csv(project, queryset))
+    return csv_data
+
+
+def iter_tasks_csv(project, queryset):
+    """
+    Generate the csv lines of the tasks in `queryset`.
+
+    The tasks are loaded in chunks of `settings.CSV_EXPORT_CHUNK_SIZE` with
+    their related data, so the number of queries doesn't depend on the
+    number of exported rows.
+    """
+    custom_attrs = list(project.taskcustomattributes.all())
+
     fieldnames = ["ref", "subject", "description", "user_story", "milestone", "owner",
                   "owner_full_name", "assigned_to", "assigned_to_full_name",
                   "status", "is_iocaine", "is_closed", "us_order",
                   "taskboard_order", "attachments", "external_reference", "tags"]
-    for custom_attr in project.taskcustomattributes.all():
+    for custom_attr in custom_attrs:
         fieldnames.append(custom_attr.name)
 
-    writer = csv.DictWriter(csv_data, fieldnames=fieldnames)
-    writer.writeheader()
-    for task in queryset:
-        task_data = {
-            "ref": task.ref,
-            "subject": task.subject,
-            "description": task.description,
-            "user_story": task.user_story.ref if task.user_story else None,
-            "milestone": task.milestone.name if task.milestone else None,
-            "owner": task.owner.username,
-            "owner_full_name": task.owner.get_full_name(),
-            "assigned_to": task.assigned_to.username if task.assigned_to else None,
-            "assigned_to_full_name": task.assigned_to.get_full_name() if task.assigned_to else None,
-            "status": task.status.name,
-            "is_iocaine": task.is_iocaine,
-            "is_closed": task.status.is_closed,
-            "us_order": task.us_order,
-            "taskboard_order": task.taskboard_order,
-            "attachments": task.attachments.count(),
-            "external_reference": task.external_reference,
-            "tags": ",".join(task.tags or []),
-        }
-        for custom_attr in project.taskcustomattributes.all():
-            value = task.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
-            task_data[custom_attr.name] = value
-
-        writer.writerow(task_data)
-
-    return csv_data
+    queryset = queryset.select_related("user_story", "milestone", "owner", "assigned_to",
+                                       "status", "custom_attributes_values")
+
+    return iter_csv(fieldnames, _iter_tasks_rows(queryset, custom_attrs))
+
+
+def _iter_tasks_rows(queryset, custom_attrs):
+    chunk_size = getattr(settings, "CSV_EXPORT_CHUNK_SIZE", 500)
+    for chunk in iter_queryset_chunks(queryset, chunk_size):
+        attachments = get_attachments_count(models.Task, [task.id for task in chunk])
+
+        for task in chunk:
+            task_data = {
+                "ref": task.ref,
+                "subject": task.subject,
+                "description": task.description,
+                "user_story": task.user_story.ref if task.user_story else None,
+                "milestone": task.milestone.name if task.milestone else None,
+                "owner": task.owner.username,
+                "owner_full_name": task.owner.get_full_name(),
+                "assigned_to": task.assigned_to.username if task.assigned_to else None,
+                "assigned_to_full_name": task.assigned_to.get_full_name() if task.assigned_to else None,
+                "status": task.status.name,
+                "is_iocaine": task.is_iocaine,
+                "is_closed": task.status.is_closed,
+                "us_order": task.us_order,
+                "taskboard_order": task.taskboard_order,
+                "attachments": attachments.get(task.id, 0),
+                "external_reference": task.external_reference,
+                "tags": ",".join(task.tags or []),
+            }
+            for custom_attr in custom_attrs:
+                value = task.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
+                task_data[custom_attr.name] = value
+
+            yield task_data
@@ -21,7 +21,7 @@ from django.apps import apps
 from django.db import transaction
 from django.utils.translation import ugettext as _
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
 from taiga.base import filters
 from taiga.base import exceptions as exc
@@ -77,7 +77,7 @@ class UserStoryViewSet(OCCResourceMixin, HistoryResourceMixin, WatchedResourceMi
             return serializers.UserStoryNeighborsSerializer
 
         if self.action == "list":
-            return serializers.UserStoryListSerializer
+            return serializers.UserStoryListValuesSerializer
 
         return serializers.UserStorySerializer
 
@@ -192,8 +192,8 @@ class UserStoryViewSet(OCCResourceMixin, HistoryResourceMixin, WatchedResourceMi
 
         project = get_object_or_404(Project, userstories_csv_uuid=uuid)
         queryset = project.user_stories.all().order_by('ref')
-        data = services.userstories_to_csv(project, queryset)
-        csv_response = HttpResponse(data.getvalue(), content_type='application/csv; charset=utf-8')
+        data = services.iter_userstories_csv(project, queryset)
+        csv_response = StreamingHttpResponse(data, content_type='application/csv; charset=utf-8')
         csv_response['Content-Disposition'] = 'attachment; filename="userstories.csv"'
         return csv_response
 
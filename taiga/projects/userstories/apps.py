@@ -47,10 +47,24 @@ def connect_userstories_signals():
                                     sender=apps.get_model("userstories", "UserStory"),
                                     dispatch_uid="try_to_close_milestone_when_delete_us")
 
+        # Html fields
+        signals.pre_save.connect(generic_handlers.render_html_fields,
+                                 sender=apps.get_model("userstories", "UserStory"),
+                                 dispatch_uid="render_html_fields_user_story")
+
         # Tags
         signals.pre_save.connect(generic_handlers.tags_normalization,
                                  sender=apps.get_model("userstories", "UserStory"),
                                  dispatch_uid="tags_normalization_user_story")
+        signals.pre_save.connect(generic_handlers.store_previous_tags,
+                                 sender=apps.get_model("userstories", "UserStory"),
+                                 dispatch_uid="store_previous_tags_user_story")
+        signals.post_save.connect(generic_handlers.update_tags_dictionary_when_create_or_edit_taggable_item,
+                                  sender=apps.get_model("userstories", "UserStory"),
+                                  dispatch_uid="update_tags_dictionary_when_create_or_edit_taggable_item_user_story")
+        signals.post_delete.connect(generic_handlers.update_tags_dictionary_when_delete_taggable_item,
+                                    sender=apps.get_model("userstories", "UserStory"),
+                                    dispatch_uid="update_tags_dictionary_when_delete_taggable_item_user_story")
         signals.post_save.connect(generic_handlers.update_project_tags_when_create_or_edit_taggable_item,
                                   sender=apps.get_model("userstories", "UserStory"),
                                   dispatch_uid="update_project_tags_when_create_or_edit_taggable_item_user_story")
@@ -76,7 +90,11 @@ def disconnect_userstories_signals():
         signals.post_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="update_milestone_of_tasks_when_edit_us")
         signals.post_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="try_to_close_or_open_us_and_milestone_when_create_or_edit_us")
         signals.post_delete.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="try_to_close_milestone_when_delete_us")
+        signals.pre_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="render_html_fields_user_story")
         signals.pre_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="tags_normalization_user_story")
+        signals.pre_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="store_previous_tags_user_story")
+        signals.post_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="update_tags_dictionary_when_create_or_edit_taggable_item_user_story")
+        signals.post_delete.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="update_tags_dictionary_when_delete_taggable_item_user_story")
         signals.post_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="update_project_tags_when_create_or_edit_taggable_item_user_story")
         signals.post_delete.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="update_project_tags_when_delete_taggable_item_user_story")
 
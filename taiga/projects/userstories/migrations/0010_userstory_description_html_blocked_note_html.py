@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userstories', '0009_remove_userstory_is_archived'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstory',
+            name='description_html',
+            field=models.TextField(default='', blank=True, verbose_name='description html'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='userstory',
+            name='blocked_note_html',
+            field=models.TextField(default='', blank=True, verbose_name='blocked note html'),
+            preserve_default=True,
+        ),
+    ]
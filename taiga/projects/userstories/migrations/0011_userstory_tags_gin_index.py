@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userstories', '0010_userstory_description_html_blocked_note_html'),
+    ]
+
+    operations = [
+        # Index used by the tags filters (tags @> ARRAY[...])
+        migrations.RunSQL(
+            """
+            CREATE INDEX "userstories_userstory_tags_gin" ON "userstories_userstory" USING gin ("tags");
+            """,
+            reverse_sql="""DROP INDEX IF EXISTS "userstories_userstory_tags_gin";"""
+        ),
+    ]
@@ -14,14 +14,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import defaultdict
+
 from django.apps import apps
 from taiga.base.api import serializers
+from taiga.base.serializers import ValuesListSerializer
 from taiga.base.fields import TagsField
 from taiga.base.fields import PgArrayField
 from taiga.base.neighbors import NeighborsSerializerMixin
 from taiga.base.utils import json
 
-from taiga.mdrender.service import render as mdrender
 from taiga.projects.validators import ProjectExistsValidator
 from taiga.projects.validators import UserStoryStatusExistsValidator
 from taiga.projects.userstories.validators import UserStoryExistsValidator
@@ -51,8 +53,6 @@ class UserStorySerializer(WatchersValidator, serializers.ModelSerializer):
     milestone_slug = serializers.SerializerMethodField("get_milestone_slug")
     milestone_name = serializers.SerializerMethodField("get_milestone_name")
     origin_issue = serializers.SerializerMethodField("get_origin_issue")
-    blocked_note_html = serializers.SerializerMethodField("get_blocked_note_html")
-    description_html = serializers.SerializerMethodField("get_description_html")
     status_extra_info = BasicUserStoryStatusSerializer(source="status", required=False, read_only=True)
     assigned_to_extra_info = UserBasicInfoSerializer(source="assigned_to", required=False, read_only=True)
     owner_extra_info = UserBasicInfoSerializer(source="owner", required=False, read_only=True)
@@ -60,7 +60,7 @@ class UserStorySerializer(WatchersValidator, serializers.ModelSerializer):
     class Meta:
         model = models.UserStory
         depth = 0
-        read_only_fields = ('created_date', 'modified_date')
+        read_only_fields = ('created_date', 'modified_date', 'description_html', 'blocked_note_html')
 
     def get_total_points(self, obj):
         return obj.get_total_points()
@@ -90,21 +90,66 @@ class UserStorySerializer(WatchersValidator, serializers.ModelSerializer):
             }
         return None
 
-    def get_blocked_note_html(self, obj):
-        return mdrender(obj.project, obj.blocked_note)
-
-    def get_description_html(self, obj):
-        return mdrender(obj.project, obj.description)
-
 
 class UserStoryListSerializer(UserStorySerializer):
     class Meta:
         model = models.UserStory
         depth = 0
-        read_only_fields = ('created_date', 'modified_date')
+        read_only_fields = ('created_date', 'modified_date', 'description_html', 'blocked_note_html')
         exclude=("description", "description_html")
 
 
+class UserStoryListValuesSerializer(ValuesListSerializer):
+    """
+    Fast version of UserStoryListSerializer for the kanban and backlog
+    payloads, built from `.values()` rows.
+    """
+    serializer_class = UserStoryListSerializer
+    values_lookups = ("milestone__slug", "milestone__name", "generated_from_issue",
+                      "generated_from_issue__ref", "generated_from_issue__subject")
+    related_serializers = {
+        "status_extra_info": ("status", BasicUserStoryStatusSerializer),
+        "assigned_to_extra_info": ("assigned_to", UserBasicInfoSerializer),
+        "owner_extra_info": ("owner", UserBasicInfoSerializer),
+    }
+
+    def prepare(self, rows):
+        super().prepare(rows)
+
+        self._points = defaultdict(dict)
+        self._total_points = {}
+        role_points = models.RolePoints.objects.filter(user_story_id__in=[row["pk"] for row in rows])
+        for us_id, role_id, points_id, value in role_points.values_list("user_story_id", "role_id",
+                                                                         "points_id", "points__value"):
+            self._points[us_id][str(role_id)] = points_id
+            if value is not None:
+                self._total_points[us_id] = self._total_points.get(us_id, 0.0) + value
+
+    def get_points(self, row):
+        return self._points.get(row["pk"], {})
+
+    def get_total_points(self, row):
+        return self._total_points.get(row["pk"], None)
+
+    def get_comment(self, row):
+        return ""
+
+    def get_milestone_slug(self, row):
+        return row["milestone__slug"]
+
+    def get_milestone_name(self, row):
+        return row["milestone__name"]
+
+    def get_origin_issue(self, row):
+        if row["generated_from_issue"]:
+            return {
+                "id": row["generated_from_issue"],
+                "ref": row["generated_from_issue__ref"],
+                "subject": row["generated_from_issue__subject"],
+            }
+        return None
+
+
 class UserStoryNeighborsSerializer(NeighborsSerializerMixin, UserStorySerializer):
     def serialize_neighbor(self, neighbor):
         return NeighborUserStorySerializer(neighbor).data
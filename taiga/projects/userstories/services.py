@@ -14,18 +14,21 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import csv
 import io
 from collections import OrderedDict
-from operator import itemgetter
-from contextlib import closing
 
-from django.db import connection
+from django.conf import settings
+from django.db.models import Prefetch
 from django.utils import timezone
-from django.utils.translation import ugettext as _
 
 from taiga.base.utils import db, text
+from taiga.base.utils.iterators import iter_queryset_chunks
+from taiga.base.utils.streaming import iter_csv
+from taiga.projects.attachments.services import get_attachments_count
 from taiga.projects.history.services import take_snapshot
+from taiga.projects.references import models as refs
+from taiga.projects.services import filters as filters_services
+from taiga.projects.tasks.models import Task
 from taiga.projects.userstories.apps import (
     connect_userstories_signals,
     disconnect_userstories_signals)
@@ -60,8 +63,14 @@ def create_userstories_in_bulk(bulk_data, callback=None, precall=None, **additio
 
     disconnect_userstories_signals()
 
+    project = additional_fields.get("project", None)
+    if project is not None:
+        refs.reserve_references_in_bulk(userstories, project)
+
     try:
         db.save_in_bulk(userstories, callback, precall)
+        if project is not None:
+            refs.store_references_in_bulk(userstories, project)
     finally:
         connect_userstories_signals()
 
@@ -125,12 +134,27 @@ def open_userstory(us):
         us.save(update_fields=["is_closed", "finish_date"])
 
 
-def userstories_to_csv(project,queryset):
+def userstories_to_csv(project, queryset):
     csv_data = io.StringIO()
+    csv_data.writelines(iter_userstories_csv(project, queryset))
+    return csv_data
+
+
+def iter_userstories_csv(project, queryset):
+    """
+    Generate the csv lines of the user stories in `queryset`.
+
+    The user stories are loaded in chunks of `settings.CSV_EXPORT_CHUNK_SIZE`
+    with their related data, so the number of queries doesn't depend on the
+    number of exported rows.
+    """
+    roles = list(project.roles.filter(computable=True).order_by('name'))
+    custom_attrs = list(project.userstorycustomattributes.all())
+
     fieldnames = ["ref", "subject", "description", "milestone", "owner",
                   "owner_full_name", "assigned_to", "assigned_to_full_name",
                   "status", "is_closed"]
-    for role in project.roles.filter(computable=True).order_by('name'):
+    for role in roles:
         fieldnames.append("{}-points".format(role.slug))
     fieldnames.append("total-points")
 
@@ -140,178 +164,64 @@ def userstories_to_csv(project,queryset):
                    "generated_from_issue", "external_reference", "tasks",
                    "tags"]
 
-    for custom_attr in project.userstorycustomattributes.all():
+    for custom_attr in custom_attrs:
         fieldnames.append(custom_attr.name)
 
-    writer = csv.DictWriter(csv_data, fieldnames=fieldnames)
-    writer.writeheader()
-    for us in queryset:
-        row = {
-            "ref": us.ref,
-            "subject": us.subject,
-            "description": us.description,
-            "milestone": us.milestone.name if us.milestone else None,
-            "owner": us.owner.username,
-            "owner_full_name": us.owner.get_full_name(),
-            "assigned_to": us.assigned_to.username if us.assigned_to else None,
-            "assigned_to_full_name": us.assigned_to.get_full_name() if us.assigned_to else None,
-            "status": us.status.name,
-            "is_closed": us.is_closed,
-            "backlog_order": us.backlog_order,
-            "sprint_order": us.sprint_order,
-            "kanban_order": us.kanban_order,
-            "created_date": us.created_date,
-            "modified_date": us.modified_date,
-            "finish_date": us.finish_date,
-            "client_requirement": us.client_requirement,
-            "team_requirement": us.team_requirement,
-            "attachments": us.attachments.count(),
-            "generated_from_issue": us.generated_from_issue.ref if us.generated_from_issue else None,
-            "external_reference": us.external_reference,
-            "tasks": ",".join([str(task.ref) for task in us.tasks.all()]),
-            "tags": ",".join(us.tags or []),
-        }
-
-        for role in us.project.roles.filter(computable=True).order_by('name'):
-            if us.role_points.filter(role_id=role.id).count() == 1:
-                row["{}-points".format(role.slug)] = us.role_points.get(role_id=role.id).points.value
-            else:
-                row["{}-points".format(role.slug)] = 0
-        row['total-points'] = us.get_total_points()
-
-        for custom_attr in project.userstorycustomattributes.all():
-            value = us.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
-            row[custom_attr.name] = value
-
-        writer.writerow(row)
-
-    return csv_data
-
-
-def _get_userstories_statuses(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-      SELECT "projects_userstorystatus"."id",
-             "projects_userstorystatus"."name",
-             "projects_userstorystatus"."color",
-             "projects_userstorystatus"."order",
-             (SELECT count(*)
-                FROM "userstories_userstory"
-                     INNER JOIN "projects_project" ON
-                                ("userstories_userstory"."project_id" = "projects_project"."id")
-               WHERE {where} AND "userstories_userstory"."status_id" = "projects_userstorystatus"."id")
-        FROM "projects_userstorystatus"
-       WHERE "projects_userstorystatus"."project_id" = %s
-    ORDER BY "projects_userstorystatus"."order";
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, name, color, order, count in rows:
-        result.append({
-            "id": id,
-            "name": _(name),
-            "color": color,
-            "order": order,
-            "count": count,
-        })
-    return sorted(result, key=itemgetter("order"))
-
-
-def _get_userstories_assigned_to(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-          SELECT NULL,
-                 NULL,
-                 (SELECT count(*)
-                    FROM "userstories_userstory"
-                         INNER JOIN "projects_project" ON
-                                    ("userstories_userstory"."project_id" = "projects_project"."id" )
-                   WHERE {where} AND "userstories_userstory"."assigned_to_id" IS NULL)
-    UNION SELECT "users_user"."id",
-                 "users_user"."full_name",
-                 (SELECT count(*)
-                    FROM "userstories_userstory"
-                         INNER JOIN "projects_project" ON
-                                    ("userstories_userstory"."project_id" = "projects_project"."id" )
-                   WHERE {where} AND "userstories_userstory"."assigned_to_id" = "projects_membership"."user_id")
-            FROM "projects_membership"
-                 INNER JOIN "users_user" ON
-                            ("projects_membership"."user_id" = "users_user"."id")
-           WHERE "projects_membership"."project_id" = %s AND "projects_membership"."user_id" IS NOT NULL;
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, full_name, count in rows:
-        result.append({
-            "id": id,
-            "full_name": full_name or "",
-            "count": count,
-        })
-    return sorted(result, key=itemgetter("full_name"))
-
-
-def _get_userstories_owners(project, queryset):
-    compiler = connection.ops.compiler(queryset.query.compiler)(queryset.query, connection, None)
-    queryset_where_tuple = queryset.query.where.as_sql(compiler, connection)
-    where = queryset_where_tuple[0]
-    where_params = queryset_where_tuple[1]
-
-    extra_sql = """
-       SELECT "users_user"."id",
-              "users_user"."full_name",
-              (SELECT count(*)
-                 FROM "userstories_userstory"
-                      INNER JOIN "projects_project" ON
-                                 ("userstories_userstory"."project_id" = "projects_project"."id")
-                WHERE {where} AND "userstories_userstory"."owner_id" = "projects_membership"."user_id")
-        FROM "projects_membership"
-             RIGHT OUTER JOIN "users_user" ON
-                              ("projects_membership"."user_id" = "users_user"."id")
-       WHERE (("projects_membership"."project_id" = %s AND "projects_membership"."user_id" IS NOT NULL)
-              OR ("users_user"."is_system" IS TRUE));
-    """.format(where=where)
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, where_params + [project.id])
-        rows = cursor.fetchall()
-
-    result = []
-    for id, full_name, count in rows:
-        if count > 0:
-            result.append({
-                "id": id,
-                "full_name": full_name,
-                "count": count,
-            })
-    return sorted(result, key=itemgetter("full_name"))
-
-
-def _get_userstories_tags(queryset):
-    tags = []
-    for t_list in queryset.values_list("tags", flat=True):
-        if t_list is None:
-            continue
-        tags += list(t_list)
-
-    tags = [{"name":e, "count":tags.count(e)} for e in set(tags)]
-
-    return sorted(tags, key=itemgetter("name"))
+    queryset = queryset.select_related("milestone", "owner", "assigned_to", "status",
+                                       "generated_from_issue", "custom_attributes_values")
+    queryset = queryset.prefetch_related(
+        Prefetch("role_points", queryset=models.RolePoints.objects.select_related("points")),
+        Prefetch("tasks", queryset=Task.objects.only("id", "ref", "user_story")))
+
+    return iter_csv(fieldnames, _iter_userstories_rows(queryset, roles, custom_attrs))
+
+
+def _iter_userstories_rows(queryset, roles, custom_attrs):
+    chunk_size = getattr(settings, "CSV_EXPORT_CHUNK_SIZE", 500)
+    for chunk in iter_queryset_chunks(queryset, chunk_size):
+        attachments = get_attachments_count(models.UserStory, [us.id for us in chunk])
+
+        for us in chunk:
+            row = {
+                "ref": us.ref,
+                "subject": us.subject,
+                "description": us.description,
+                "milestone": us.milestone.name if us.milestone else None,
+                "owner": us.owner.username,
+                "owner_full_name": us.owner.get_full_name(),
+                "assigned_to": us.assigned_to.username if us.assigned_to else None,
+                "assigned_to_full_name": us.assigned_to.get_full_name() if us.assigned_to else None,
+                "status": us.status.name,
+                "is_closed": us.is_closed,
+                "backlog_order": us.backlog_order,
+                "sprint_order": us.sprint_order,
+                "kanban_order": us.kanban_order,
+                "created_date": us.created_date,
+                "modified_date": us.modified_date,
+                "finish_date": us.finish_date,
+                "client_requirement": us.client_requirement,
+                "team_requirement": us.team_requirement,
+                "attachments": attachments.get(us.id, 0),
+                "generated_from_issue": us.generated_from_issue.ref if us.generated_from_issue else None,
+                "external_reference": us.external_reference,
+                "tasks": ",".join([str(task.ref) for task in us.tasks.all()]),
+                "tags": ",".join(us.tags or []),
+            }
+
+            points = {rp.role_id: rp.points for rp in us.role_points.all()}
+            for role in roles:
+                role_points = points.get(role.id, None)
+                if role_points is not None:
+                    row["{}-points".format(role.slug)] = role_points.value
+                else:
+                    row["{}-points".format(role.slug)] = 0
+            row['total-points'] = us.get_total_points()
+
+            for custom_attr in custom_attrs:
+                value = us.custom_attributes_values.attributes_values.get(str(custom_attr.id), None)
+                row[custom_attr.name] = value
+
+            yield row
 
 
 def get_userstories_filters_data(project, querysets):
@@ -319,11 +229,18 @@ def get_userstories_filters_data(project, querysets):
     Given a project and an userstories queryset, return a simple data structure
     of all possible filters for the userstories in the queryset.
     """
+    statuses, assigned_to, owners, tags = filters_services.get_facets_counts(models.UserStory, project, [
+        ("status", querysets["statuses"]),
+        ("assigned_to", querysets["assigned_to"]),
+        ("owner", querysets["owners"]),
+        ("tags", querysets["tags"]),
+    ])
+
     data = OrderedDict([
-        ("statuses", _get_userstories_statuses(project, querysets["statuses"])),
-        ("assigned_to", _get_userstories_assigned_to(project, querysets["assigned_to"])),
-        ("owners", _get_userstories_owners(project, querysets["owners"])),
-        ("tags", _get_userstories_tags(querysets["tags"])),
+        ("statuses", filters_services.get_choices_facet(project.us_statuses.all(), statuses)),
+        ("assigned_to", filters_services.get_assigned_to_facet(project, assigned_to)),
+        ("owners", filters_services.get_owners_facet(project, owners)),
+        ("tags", filters_services.get_tags_facet(tags)),
     ])
 
     return data
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votes', '0001_initial'),
+        ('projects', '0025_project_total_voters'),
+        ('issues', '0008_issue_total_voters'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='votes',
+            unique_together=None,
+        ),
+        migrations.RemoveField(
+            model_name='votes',
+            name='content_type',
+        ),
+        migrations.DeleteModel(
+            name='Votes',
+        ),
+    ]
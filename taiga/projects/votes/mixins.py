@@ -0,0 +1,37 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class VotedModelMixin(models.Model):
+    """
+    Model mixin that stores the number of voters of the object. The
+    counter is only changed by the votes services, using atomic updates.
+    """
+    total_voters = models.PositiveIntegerField(null=False, blank=False, default=0,
+                                               verbose_name=_("total voters"))
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # Never write back a (maybe stale) counter when the object is updated
+        if not self._state.adding and not args and kwargs.get("update_fields", None) is None:
+            kwargs["update_fields"] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name != "total_voters"]
+        super().save(*args, **kwargs)
@@ -21,27 +21,6 @@ from django.utils.translation import ugettext_lazy as _
 from django.contrib.contenttypes import generic
 
 
-class Votes(models.Model):
-    content_type = models.ForeignKey("contenttypes.ContentType")
-    object_id = models.PositiveIntegerField()
-    content_object = generic.GenericForeignKey("content_type", "object_id")
-    count = models.PositiveIntegerField(default=0)
-
-    class Meta:
-        verbose_name = _("Votes")
-        verbose_name_plural = _("Votes")
-        unique_together = ("content_type", "object_id")
-
-    @property
-    def project(self):
-        if hasattr(self.content_object, 'project'):
-            return self.content_object.project
-        return None
-
-    def __str__(self):
-        return self.count
-
-
 class Vote(models.Model):
     content_type = models.ForeignKey("contenttypes.ContentType")
     object_id = models.PositiveIntegerField(null=False)
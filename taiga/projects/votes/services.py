@@ -15,12 +15,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from contextlib import closing
+
+from django.db import connection
 from django.db.models import F
 from django.db.transaction import atomic
-from django.apps import apps
 from django.contrib.auth import get_user_model
 
-from .models import Votes, Vote
+from taiga.base.utils.db import get_content_type_id_for_model
+
+from .models import Vote
 
 
 def add_vote(obj, user):
@@ -29,19 +33,18 @@ def add_vote(obj, user):
     If the user has already voted the object nothing happends, so this function can be considered
     idempotent.
 
-    :param obj: Any Django model instance.
+    :param obj: Any Django model instance with a `total_voters` field.
     :param user: User adding the vote. :class:`~taiga.users.models.User` instance.
     """
-    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
+    obj_type_id = get_content_type_id_for_model(obj.__class__)
     with atomic():
-        vote, created = Vote.objects.get_or_create(content_type=obj_type, object_id=obj.id, user=user)
+        vote, created = Vote.objects.get_or_create(content_type_id=obj_type_id, object_id=obj.id, user=user)
 
         if not created:
             return
 
-        votes, _ = Votes.objects.get_or_create(content_type=obj_type, object_id=obj.id)
-        votes.count = F('count') + 1
-        votes.save()
+        obj.__class__.objects.filter(id=obj.id).update(total_voters=F("total_voters") + 1)
+        obj.total_voters += 1
     return vote
 
 
@@ -51,20 +54,23 @@ def remove_vote(obj, user):
     If the user has not voted the object nothing happens so this function can be considered
     idempotent.
 
-    :param obj: Any Django model instance.
+    :param obj: Any Django model instance with a `total_voters` field.
     :param user: User removing her vote. :class:`~taiga.users.models.User` instance.
     """
-    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
+    obj_type_id = get_content_type_id_for_model(obj.__class__)
+    sql = ("DELETE FROM votes_vote "
+           "WHERE content_type_id = %s AND object_id = %s AND user_id = %s")
+
     with atomic():
-        qs = Vote.objects.filter(content_type=obj_type, object_id=obj.id, user=user)
-        if not qs.exists():
-            return
+        with closing(connection.cursor()) as cursor:
+            cursor.execute(sql, [obj_type_id, obj.id, user.id])
+            deleted = cursor.rowcount
 
-        qs.delete()
+        if not deleted:
+            return
 
-        votes, _ = Votes.objects.get_or_create(content_type=obj_type, object_id=obj.id)
-        votes.count = F('count') - 1
-        votes.save()
+        obj.__class__.objects.filter(id=obj.id).update(total_voters=F("total_voters") - 1)
+        obj.total_voters -= 1
 
 
 def get_voters(obj):
@@ -74,23 +80,18 @@ def get_voters(obj):
 
     :return: User queryset object representing the users that voted the object.
     """
-    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
-    return get_user_model().objects.filter(votes__content_type=obj_type, votes__object_id=obj.id)
+    obj_type_id = get_content_type_id_for_model(obj.__class__)
+    return get_user_model().objects.filter(votes__content_type_id=obj_type_id, votes__object_id=obj.id)
 
 
 def get_votes(obj):
     """Get the number of votes an object has.
 
-    :param obj: Any Django model instance.
+    :param obj: Any Django model instance with a `total_voters` field.
 
     :return: Number of votes or `0` if the object has no votes at all.
     """
-    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(obj)
-
-    try:
-        return Votes.objects.get(content_type=obj_type, object_id=obj.id).count
-    except Votes.DoesNotExist:
-        return 0
+    return obj.total_voters
 
 
 def get_voted(user_or_id, model):
@@ -101,7 +102,7 @@ def get_voted(user_or_id, model):
 
     :return: Queryset of objects representing the votes of the user.
     """
-    obj_type = apps.get_model("contenttypes", "ContentType").objects.get_for_model(model)
+    obj_type_id = get_content_type_id_for_model(model)
     conditions = ('votes_vote.content_type_id = %s',
                   '%s.id = votes_vote.object_id' % model._meta.db_table,
                   'votes_vote.user_id = %s')
@@ -112,4 +113,23 @@ def get_voted(user_or_id, model):
         user_id = user_or_id
 
     return model.objects.extra(where=conditions, tables=('votes_vote',),
-                               params=(obj_type.id, user_id))
+                               params=(obj_type_id, user_id))
+
+
+def get_voted_ids(user_or_id, model, object_ids):
+    """Get which of some objects have been voted by an user, with a single query.
+
+    :param user_or_id: :class:`~taiga.users.models.User` instance or id.
+    :param model: Any Django model class.
+    :param object_ids: Ids of the objects of `model` to check (a page of them, for example).
+
+    :return: Set with the ids of the objects voted by the user.
+    """
+    if isinstance(user_or_id, get_user_model()):
+        user_id = user_or_id.id
+    else:
+        user_id = user_or_id
+
+    qs = Vote.objects.filter(content_type_id=get_content_type_id_for_model(model),
+                             object_id__in=object_ids, user_id=user_id)
+    return set(qs.values_list("object_id", flat=True))
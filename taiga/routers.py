@@ -113,12 +113,14 @@ from taiga.projects.attachments.api import UserStoryAttachmentViewSet
 from taiga.projects.attachments.api import IssueAttachmentViewSet
 from taiga.projects.attachments.api import TaskAttachmentViewSet
 from taiga.projects.attachments.api import WikiAttachmentViewSet
+from taiga.projects.attachments.api import AttachmentUploadViewSet
 
 router.register(r"userstories/attachments", UserStoryAttachmentViewSet,
                 base_name="userstory-attachments")
 router.register(r"tasks/attachments", TaskAttachmentViewSet, base_name="task-attachments")
 router.register(r"issues/attachments", IssueAttachmentViewSet, base_name="issue-attachments")
 router.register(r"wiki/attachments", WikiAttachmentViewSet, base_name="wiki-attachments")
+router.register(r"attachments/uploads", AttachmentUploadViewSet, base_name="attachment-uploads")
 
 
 # Project components
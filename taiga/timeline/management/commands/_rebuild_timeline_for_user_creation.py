@@ -18,15 +18,12 @@
 # python manage.py rebuild_timeline_for_user_creation --settings=settings.local_timeline
 
 from django.conf import settings
-from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.management.base import BaseCommand
-from django.db.models import Model
 from django.db import reset_queries
 from django.test.utils import override_settings
 
-from taiga.timeline.service import (_get_impl_key_from_model,
-    _timeline_impl_map, extract_user_info)
+from taiga.timeline.service import build_timelines_entries, extract_user_info
 from taiga.timeline.models import Timeline
 from taiga.timeline.signals import _push_to_timelines
 from taiga.users.models import User
@@ -54,25 +51,13 @@ class BulkCreator(object):
 bulk_creator = BulkCreator()
 
 
-def custom_add_to_object_timeline(obj:object, instance:object, event_type:str, created_datetime:object, namespace:str="default", extra_data:dict={}):
-    assert isinstance(obj, Model), "obj must be a instance of Model"
-    assert isinstance(instance, Model), "instance must be a instance of Model"
-    event_type_key = _get_impl_key_from_model(instance.__class__, event_type)
-    impl = _timeline_impl_map.get(event_type_key, None)
-
-    bulk_creator.create_element(Timeline(
-        content_object=obj,
-        namespace=namespace,
-        event_type=event_type_key,
-        project=None,
-        data=impl(instance, extra_data=extra_data),
-        data_content_type = ContentType.objects.get_for_model(instance.__class__),
-        created=created_datetime,
-    ))
+def custom_push_entry_to_timelines(entry:dict, timelines:list):
+    for timeline in build_timelines_entries(entry, timelines):
+        bulk_creator.create_element(timeline)
 
 
 def generate_timeline():
-    with patch('taiga.timeline.service._add_to_object_timeline', new=custom_add_to_object_timeline):
+    with patch('taiga.timeline.signals._push_entry_to_timelines', new=custom_push_entry_to_timelines):
         # Users api wasn't a HistoryResourceMixin so we can't interate on the HistoryEntries in this case
         users = User.objects.order_by("date_joined")
         for user in users.iterator():
@@ -18,125 +18,118 @@
 # python manage.py rebuild_timeline --settings=settings.local_timeline --initial_date 2014-10-02 --final_date 2014-10-03
 # python manage.py rebuild_timeline --settings=settings.local_timeline --purge
 # python manage.py rebuild_timeline --settings=settings.local_timeline --initial_date 2014-10-02
+# python manage.py rebuild_timeline --settings=settings.local_timeline --processes 8 --resume
 
-from django.conf import settings
-from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.management.base import BaseCommand
-from django.db.models import Model
-from django.db import reset_queries
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db import transaction
 from django.test.utils import override_settings
 
-
 from taiga.projects.models import Project
-from taiga.projects.history import services as history_services
-from taiga.projects.history.choices import HistoryType
 from taiga.projects.history.models import HistoryEntry
-from taiga.timeline.models import Timeline
-from taiga.timeline.service import (_add_to_object_timeline, _get_impl_key_from_model,
-    _timeline_impl_map, extract_user_info)
+from taiga.projects.history.services import make_key_from_model_object
+from taiga.timeline.models import Timeline, TimelineRebuildCheckpoint
+from taiga.timeline.service import build_timelines_entries, extract_user_info
 from taiga.timeline.signals import on_new_history_entry, _push_to_timelines
-from taiga.users.models import User
 
 from unittest.mock import patch
 from optparse import make_option
+from multiprocessing import Pool
 
-import gc
+import time
 
 
 class BulkCreator(object):
     def __init__(self):
         self.timeline_objects = []
-        self.created = None
+        self.created = 0
 
     def create_element(self, element):
         self.timeline_objects.append(element)
-        if len(self.timeline_objects) > 1000:
+        if len(self.timeline_objects) >= 1000:
             self.flush()
 
     def flush(self):
         Timeline.objects.bulk_create(self.timeline_objects, batch_size=1000)
-        del self.timeline_objects
+        self.created += len(self.timeline_objects)
         self.timeline_objects = []
-        gc.collect()
-
-bulk_creator = BulkCreator()
-
-
-def custom_add_to_object_timeline(obj:object, instance:object, event_type:str, created_datetime:object, namespace:str="default", extra_data:dict={}):
-    assert isinstance(obj, Model), "obj must be a instance of Model"
-    assert isinstance(instance, Model), "instance must be a instance of Model"
-    event_type_key = _get_impl_key_from_model(instance.__class__, event_type)
-    impl = _timeline_impl_map.get(event_type_key, None)
 
-    bulk_creator.create_element(Timeline(
-        content_object=obj,
-        namespace=namespace,
-        event_type=event_type_key,
-        project=instance.project,
-        data=impl(instance, extra_data=extra_data),
-        data_content_type=ContentType.objects.get_for_model(instance.__class__),
-        created=created_datetime,
-    ))
 
-
-def generate_timeline(initial_date, final_date, project_id):
-    if initial_date or final_date or project_id:
-        timelines = Timeline.objects.all()
-        if initial_date:
-            timelines = timelines.filter(created__gte=initial_date)
-        if final_date:
-            timelines = timelines.filter(created__lt=final_date)
-        if project_id:
-            timelines = timelines.filter(project__id=project_id)
-
-        timelines.delete()
-
-    with patch('taiga.timeline.service._add_to_object_timeline', new=custom_add_to_object_timeline):
-        # Projects api wasn't a HistoryResourceMixin so we can't interate on the HistoryEntries in this case
-        projects = Project.objects.order_by("created_date")
+def _get_project_objects(project):
+    """
+    Get the project and all its objects with history by history key.
+    """
+    objects = {make_key_from_model_object(project): project}
+    for queryset in (project.milestones.all(), project.user_stories.all(), project.tasks.all(),
+                     project.issues.all(), project.wiki_pages.all()):
+        objects.update((make_key_from_model_object(obj), obj) for obj in queryset)
+    return objects
+
+
+def rebuild_project_timeline(project_id, initial_date=None, final_date=None):
+    """
+    Regenerate the timeline entries of a project in a single transaction and
+    save a checkpoint for it. Return the number of created timeline entries.
+    """
+    bulk_creator = BulkCreator()
+
+    def push_entry_to_timelines(entry, timelines):
+        for timeline in build_timelines_entries(entry, timelines):
+            bulk_creator.create_element(timeline)
+
+    with transaction.atomic(), patch("taiga.timeline.signals._push_entry_to_timelines",
+                                     new=push_entry_to_timelines):
+        project = Project.objects.get(id=project_id)
+        projects = Project.objects.filter(id=project_id)
+        timelines = Timeline.objects.filter(project_id=project_id)
+        memberships = project.memberships.exclude(user=None).exclude(user=project.owner)
         history_entries = HistoryEntry.objects.order_by("created_at")
 
         if initial_date:
             projects = projects.filter(created_date__gte=initial_date)
+            timelines = timelines.filter(created__gte=initial_date)
+            memberships = memberships.filter(created_at__gte=initial_date)
             history_entries = history_entries.filter(created_at__gte=initial_date)
 
         if final_date:
             projects = projects.filter(created_date__lt=final_date)
+            timelines = timelines.filter(created__lt=final_date)
+            memberships = memberships.filter(created_at__lt=final_date)
             history_entries = history_entries.filter(created_at__lt=final_date)
 
-        if project_id:
-            project = Project.objects.get(id=project_id)
-            us_keys = ['userstories.userstory:%s'%(id) for id in project.user_stories.values_list("id", flat=True)]
-            tasks_keys = ['tasks.task:%s'%(id) for id in project.tasks.values_list("id", flat=True)]
-            issue_keys = ['issues.issue:%s'%(id) for id in project.issues.values_list("id", flat=True)]
-            wiki_keys = ['wiki.wikipage:%s'%(id) for id in project.wiki_pages.values_list("id", flat=True)]
-            keys = us_keys + tasks_keys + issue_keys + wiki_keys
-
-            projects = projects.filter(id=project_id)
-            history_entries = history_entries.filter(key__in=keys)
-
-            #Memberships
-            for membership in project.memberships.exclude(user=None).exclude(user=project.owner):
-                _push_to_timelines(project, membership.user, membership, "create", membership.created_at)
+        timelines.delete()
 
-        for project in projects.iterator():
-            print("Project:", bulk_creator.created)
+        # Projects api wasn't a HistoryResourceMixin so we can't interate on the HistoryEntries in this case
+        if projects.exists():
             extra_data = {
                 "values_diff": {},
                 "user": extract_user_info(project.owner),
             }
             _push_to_timelines(project, project.owner, project, "create", project.created_date, extra_data=extra_data)
-            del extra_data
 
-        for historyEntry in history_entries.iterator():
-            print("History entry:", historyEntry.created_at)
+        for membership in memberships.select_related("user"):
+            _push_to_timelines(project, membership.user, membership, "create", membership.created_at)
+
+        # The objects are fetched once per project instead of once per history entry
+        objects = _get_project_objects(project)
+        history_entries = history_entries.filter(key__in=list(objects.keys()))
+        for history_entry in history_entries.iterator():
+            history_entry._snapshot_object = objects[history_entry.key]
             try:
-                on_new_history_entry(None, historyEntry, None)
-            except ObjectDoesNotExist as e:
-                print("Ignoring")
+                on_new_history_entry(None, history_entry, None)
+            except ObjectDoesNotExist:
+                pass
+
+        bulk_creator.flush()
+        TimelineRebuildCheckpoint.objects.create(project_id=project_id, entries=bulk_creator.created)
+
+    return bulk_creator.created
 
-    bulk_creator.flush()
+
+def _rebuild_project_timeline(args):
+    project_id, initial_date, final_date = args
+    return project_id, rebuild_project_timeline(project_id, initial_date, final_date)
 
 
 class Command(BaseCommand):
@@ -165,11 +158,60 @@ class Command(BaseCommand):
                     dest='project',
                     default=None,
                     help='Selected project id for timeline generation'),
+        ) + (
+        make_option('--processes',
+                    action='store',
+                    dest='processes',
+                    type='int',
+                    default=1,
+                    help='Number of worker processes'),
+        ) + (
+        make_option('--resume',
+                    action='store_true',
+                    dest='resume',
+                    default=False,
+                    help='Skip the projects already rebuilt by a previous run'),
         )
 
     @override_settings(DEBUG=False)
     def handle(self, *args, **options):
+        if options["purge"] and options["resume"]:
+            # The timelines of the projects already rebuilt would be left empty
+            raise CommandError("--purge and --resume can't be used together")
+
         if options["purge"] == True:
             Timeline.objects.all().delete()
 
-        generate_timeline(options["initial_date"], options["final_date"], options["project"])
+        if not options["resume"]:
+            TimelineRebuildCheckpoint.objects.all().delete()
+
+        projects = Project.objects.order_by("id")
+        if options["project"]:
+            projects = projects.filter(id=options["project"])
+
+        rebuilt_projects = TimelineRebuildCheckpoint.objects.values("project_id")
+        project_ids = projects.exclude(id__in=rebuilt_projects).values_list("id", flat=True)
+        partitions = [(project_id, options["initial_date"], options["final_date"]) for project_id in project_ids]
+
+        if options["processes"] > 1:
+            # Every worker process has to open its own database connections
+            for connection in connections.all():
+                connection.close()
+
+            pool = Pool(options["processes"])
+            results = pool.imap_unordered(_rebuild_project_timeline, partitions)
+        else:
+            pool = None
+            results = map(_rebuild_project_timeline, partitions)
+
+        start = time.time()
+        total_created = 0
+        for count, (project_id, created) in enumerate(results, 1):
+            total_created += created
+            elapsed = time.time() - start
+            self.stdout.write("[{0}/{1}] Project {2}: {3} timeline entries ({4:.1f} entries/s)".format(
+                count, len(partitions), project_id, created, total_created / elapsed if elapsed else 0))
+
+        if pool is not None:
+            pool.close()
+            pool.join()
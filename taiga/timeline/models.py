@@ -40,6 +40,16 @@ class Timeline(models.Model):
         index_together = [('content_type', 'object_id', 'namespace'), ]
 
 
+class TimelineRebuildCheckpoint(models.Model):
+    """
+    Projects whose timeline has already been rebuilt by the rebuild_timeline
+    command, so an interrupted rebuild can be resumed.
+    """
+    project_id = models.IntegerField(unique=True)
+    entries = models.IntegerField(default=0)
+    created = models.DateTimeField(default=timezone.now)
+
+
 # Register all implementations
 from .timeline_implementations import *
 
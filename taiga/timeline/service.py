@@ -15,14 +15,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.apps import apps
-from django.contrib.contenttypes.models import ContentType
 from django.db.models import Model
 from django.db.models import Q
-from django.db.models.query import QuerySet
 
 from functools import partial, wraps
 
 from taiga.base.utils.db import get_typename_for_model_class
+from taiga.base.utils.db import get_content_type_id_for_model
+from taiga.base.utils.db import get_content_type_id_for_typename
 from taiga.celery import app
 from taiga.users.services import get_photo_or_gravatar_url, get_big_photo_or_gravatar_url
 
@@ -50,49 +50,52 @@ def build_project_namespace(project:object):
     return "{0}:{1}".format("project", project.id)
 
 
-def _add_to_object_timeline(obj:object, instance:object, event_type:str, created_datetime:object, namespace:str="default", extra_data:dict={}):
-    assert isinstance(obj, Model), "obj must be a instance of Model"
+def build_timeline_entry(instance:object, event_type:str, created_datetime:object, extra_data:dict={}):
+    """
+    Get the fields of the timeline entry for an event of `instance`, so it can
+    be written in many timelines without accessing the instance again.
+    """
     assert isinstance(instance, Model), "instance must be a instance of Model"
-    from .models import Timeline
     event_type_key = _get_impl_key_from_model(instance.__class__, event_type)
     impl = _timeline_impl_map.get(event_type_key, None)
 
-    project = None
-    if hasattr(instance, "project"):
-        project = instance.project
+    project_id = None
+    project = getattr(instance, "project", None)
+    if project is not None:
+        project_id = project.id
 
-    Timeline.objects.create(
-        content_object=obj,
-        namespace=namespace,
-        event_type=event_type_key,
-        project=project,
-        data=impl(instance, extra_data=extra_data),
-        data_content_type=ContentType.objects.get_for_model(instance.__class__),
-        created=created_datetime,
-    )
+    return {
+        "event_type": event_type_key,
+        "project_id": project_id,
+        "data": impl(instance, extra_data=extra_data),
+        "data_content_type_id": get_content_type_id_for_model(instance.__class__),
+        "created": created_datetime,
+    }
 
 
-def _add_to_objects_timeline(objects, instance:object, event_type:str, created_datetime:object, namespace:str="default", extra_data:dict={}):
-    for obj in objects:
-        _add_to_object_timeline(obj, instance, event_type, created_datetime, namespace, extra_data)
+def build_timelines_entries(entry:dict, timelines:list):
+    from .models import Timeline
+    return [Timeline(content_type_id=content_type_id, object_id=object_id, namespace=namespace, **entry)
+            for content_type_id, object_id, namespace in timelines]
 
 
 @app.task
-def push_to_timeline(objects, instance:object, event_type:str, created_datetime:object, namespace:str="default", extra_data:dict={}):
-    if isinstance(objects, Model):
-        _add_to_object_timeline(objects, instance, event_type, created_datetime, namespace, extra_data)
-    elif isinstance(objects, QuerySet) or isinstance(objects, list):
-        _add_to_objects_timeline(objects, instance, event_type, created_datetime, namespace, extra_data)
-    else:
-        raise Exception("Invalid objects parameter")
+def push_entry_to_timelines(entry:dict, timelines:list):
+    """
+    Write a timeline entry (see `build_timeline_entry`) in every timeline of
+    `timelines`, a list of (content type id, object id, namespace) tuples,
+    with a single insert.
+    """
+    from .models import Timeline
+    Timeline.objects.bulk_create(build_timelines_entries(entry, timelines))
 
 
 def get_timeline(obj, namespace=None):
     assert isinstance(obj, Model), "obj must be a instance of Model"
     from .models import Timeline
 
-    ct = ContentType.objects.get_for_model(obj.__class__)
-    timeline = Timeline.objects.filter(content_type=ct, object_id=obj.pk)
+    ct_id = get_content_type_id_for_model(obj.__class__)
+    timeline = Timeline.objects.filter(content_type_id=ct_id, object_id=obj.pk)
     if namespace is not None:
         timeline = timeline.filter(namespace=namespace)
 
@@ -106,25 +109,25 @@ def filter_timeline_for_user(timeline, user):
 
     # Filtering private project with some public parts
     content_types = {
-        "view_project": ContentType.objects.get(app_label="projects", model="project"),
-        "view_milestones": ContentType.objects.get(app_label="milestones", model="milestone"),
-        "view_us": ContentType.objects.get(app_label="userstories", model="userstory"),
-        "view_tasks": ContentType.objects.get(app_label="tasks", model="task"),
-        "view_issues": ContentType.objects.get(app_label="issues", model="issue"),
-        "view_wiki_pages": ContentType.objects.get(app_label="wiki", model="wikipage"),
-        "view_wiki_links": ContentType.objects.get(app_label="wiki", model="wikilink"),
+        "view_project": get_content_type_id_for_typename("projects.project"),
+        "view_milestones": get_content_type_id_for_typename("milestones.milestone"),
+        "view_us": get_content_type_id_for_typename("userstories.userstory"),
+        "view_tasks": get_content_type_id_for_typename("tasks.task"),
+        "view_issues": get_content_type_id_for_typename("issues.issue"),
+        "view_wiki_pages": get_content_type_id_for_typename("wiki.wikipage"),
+        "view_wiki_links": get_content_type_id_for_typename("wiki.wikilink"),
     }
 
     for content_type_key, content_type in content_types.items():
         tl_filter |= Q(project__is_private=True,
                                             project__anon_permissions__contains=[content_type_key],
-                                            data_content_type=content_type)
+                                            data_content_type_id=content_type)
 
     # There is no specific permission for seeing new memberships
-    membership_content_type = ContentType.objects.get(app_label="projects", model="membership")
+    membership_content_type = get_content_type_id_for_typename("projects.membership")
     tl_filter |= Q(project__is_private=True,
                    project__anon_permissions__contains=["view_project"],
-                   data_content_type=membership_content_type)
+                   data_content_type_id=membership_content_type)
 
     # Filtering private projects where user is member
     if not user.is_anonymous():
@@ -133,8 +136,8 @@ def filter_timeline_for_user(timeline, user):
         for membership in memberships_qs:
             for content_type_key, content_type in content_types.items():
                 if content_type_key in membership.role.permissions or membership.is_owner:
-                    tl_filter |= Q(project=membership.project, data_content_type=content_type)
-            tl_filter |= Q(project=membership.project, data_content_type=membership_content_type)
+                    tl_filter |= Q(project=membership.project, data_content_type_id=content_type)
+            tl_filter |= Q(project=membership.project, data_content_type_id=membership_content_type)
 
     timeline = timeline.filter(tl_filter)
     return timeline
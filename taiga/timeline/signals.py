@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import ugettext as _
 
@@ -22,7 +23,9 @@ from taiga.projects.history import services as history_services
 from taiga.projects.models import Project
 from taiga.users.models import User
 from taiga.projects.history.choices import HistoryType
-from taiga.timeline.service import (push_to_timeline,
+from taiga.base.utils.db import get_content_type_id_for_typename
+from taiga.timeline.service import (push_entry_to_timelines,
+                                    build_timeline_entry,
                                     build_user_namespace,
                                     build_project_namespace,
                                     extract_user_info)
@@ -31,53 +34,59 @@ from taiga.timeline.service import (push_to_timeline,
 # TODO: Add events to project watchers timeline when project watchers are implemented.
 
 
-def _push_to_timeline(*args, **kwargs):
+def _push_entry_to_timelines(entry, timelines):
     if settings.CELERY_ENABLED:
-        push_to_timeline.delay(*args, **kwargs)
+        push_entry_to_timelines.delay(entry, timelines)
     else:
-        push_to_timeline(*args, **kwargs)
+        push_entry_to_timelines(entry, timelines)
 
 
-def _push_to_timelines(project, user, obj, event_type, created_datetime, extra_data={}):
-    if project is not None:
-        # Actions related with a project
+def _get_related_people_ids(user, obj):
+    """
+    Get the ids of the active and not system users related with an action
+    of `user` over `obj` with a single query.
+    """
+    ## - Me
+    related_people = Q(id=user.id)
 
-        ## Project timeline
-        _push_to_timeline(project, obj, event_type, created_datetime,
-            namespace=build_project_namespace(project),
-            extra_data=extra_data)
+    ## - Owner
+    if hasattr(obj, "owner_id") and obj.owner_id:
+        related_people |= Q(id=obj.owner_id)
 
-        ## User profile timelines
-        ## - Me
-        related_people = User.objects.filter(id=user.id)
+    ## - Assigned to
+    if hasattr(obj, "assigned_to_id") and obj.assigned_to_id:
+        related_people |= Q(id=obj.assigned_to_id)
 
-        ## - Owner
-        if hasattr(obj, "owner_id") and obj.owner_id:
-            related_people |= User.objects.filter(id=obj.owner_id)
+    ## - Watchers
+    if hasattr(obj, "watchers"):
+        related_people |= Q(id__in=obj.watchers.values("id"))
 
-        ## - Assigned to
-        if hasattr(obj, "assigned_to_id") and obj.assigned_to_id:
-            related_people |= User.objects.filter(id=obj.assigned_to_id)
+    ## - Exclude inactive and system users
+    qs = User.objects.filter(related_people, is_active=True, is_system=False)
+    return list(qs.values_list("id", flat=True))
 
-        ## - Watchers
-        watchers = getattr(obj, "watchers", None)
-        if watchers:
-            related_people |= obj.watchers.all()
 
-        ## - Exclude inactive and system users and remove duplicate
-        related_people = related_people.exclude(is_active=False)
-        related_people = related_people.exclude(is_system=True)
-        related_people = related_people.distinct()
+def _push_to_timelines(project, user, obj, event_type, created_datetime, extra_data={}):
+    entry = build_timeline_entry(obj, event_type, created_datetime, extra_data=extra_data)
+    user_content_type_id = get_content_type_id_for_typename("users.user")
+    user_namespace = build_user_namespace(user)
+
+    if project is not None:
+        # Actions related with a project
 
-        _push_to_timeline(related_people, obj, event_type, created_datetime,
-            namespace=build_user_namespace(user),
-            extra_data=extra_data)
+        ## Project timeline
+        timelines = [(get_content_type_id_for_typename("projects.project"), project.id,
+                      build_project_namespace(project))]
+
+        ## User profile timelines
+        timelines += [(user_content_type_id, user_id, user_namespace)
+                      for user_id in _get_related_people_ids(user, obj)]
     else:
         # Actions not related with a project
         ## - Me
-        _push_to_timeline(user, obj, event_type, created_datetime,
-            namespace=build_user_namespace(user),
-            extra_data=extra_data)
+        timelines = [(user_content_type_id, user.id, user_namespace)]
+
+    _push_entry_to_timelines(entry, timelines)
 
 
 def _clean_description_fields(values_diff):
@@ -96,9 +105,13 @@ def on_new_history_entry(sender, instance, created, **kwargs):
     if instance.is_hidden:
         return None
 
-    model = history_services.get_model_from_key(instance.key)
-    pk = history_services.get_pk_from_key(instance.key)
-    obj = model.objects.get(pk=pk)
+    # The object is the one of the snapshot when the entry has just been
+    # taken, otherwise (rebuilding the timeline) it is fetched
+    obj = getattr(instance, "_snapshot_object", None)
+    if obj is None:
+        model = history_services.get_model_from_key(instance.key)
+        pk = history_services.get_pk_from_key(instance.key)
+        obj = model.objects.get(pk=pk)
     project = obj.project
 
     if instance.type == HistoryType.create:
@@ -108,7 +121,8 @@ def on_new_history_entry(sender, instance, created, **kwargs):
     elif instance.type == HistoryType.delete:
         event_type = "delete"
 
-    user = User.objects.get(id=instance.user["pk"])
+    # Only the id of the user is needed
+    user = User(id=instance.user["pk"])
     values_diff = instance.values_diff
     _clean_description_fields(values_diff)
 
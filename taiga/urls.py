@@ -41,20 +41,15 @@ handler500 = "taiga.base.api.views.api_server_error"
 ##############################################
 
 if settings.FRONT_SITEMAP_ENABLED:
-    from django.contrib.sitemaps.views import index
-    from django.contrib.sitemaps.views import sitemap
-    from django.views.decorators.cache import cache_page
-
-    from taiga.front.sitemaps import sitemaps
+    from taiga.front.views import sitemap_index
+    from taiga.front.views import sitemap
 
     urlpatterns += [
         url(r"^front/sitemap\.xml$",
-            cache_page(settings.FRONT_SITEMAP_CACHE_TIMEOUT)(index),
-            {"sitemaps": sitemaps, 'sitemap_url_name': 'front-sitemap'},
+            sitemap_index,
             name="front-sitemap-index"),
-        url(r"^front/sitemap-(?P<section>.+)\.xml$",
-            cache_page(settings.FRONT_SITEMAP_CACHE_TIMEOUT)(sitemap),
-            {"sitemaps": sitemaps},
+        url(r"^front/(?P<file_name>sitemap-[\w-]+-\d+\.xml\.gz)$",
+            sitemap,
             name="front-sitemap")
     ]
 
@@ -0,0 +1,2 @@
+
+default_app_config = "taiga.users.apps.UsersAppConfig"
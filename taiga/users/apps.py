@@ -0,0 +1,65 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from django.apps import AppConfig
+from django.apps import apps
+from django.db.models import signals
+
+from . import signals as handlers
+
+
+def connect_users_summaries_signals():
+    signals.pre_save.connect(handlers.cache_prev_membership_user,
+                             sender=apps.get_model("projects", "Membership"),
+                             dispatch_uid="cache_prev_membership_user")
+    signals.post_save.connect(handlers.refresh_users_summaries_when_change_membership,
+                              sender=apps.get_model("projects", "Membership"),
+                              dispatch_uid="refresh_users_summaries_when_change_membership")
+    signals.post_delete.connect(handlers.refresh_users_summaries_when_delete_membership,
+                                sender=apps.get_model("projects", "Membership"),
+                                dispatch_uid="refresh_users_summaries_when_delete_membership")
+    signals.post_save.connect(handlers.refresh_users_summaries_when_change_role,
+                              sender=apps.get_model("users", "Role"),
+                              dispatch_uid="refresh_users_summaries_when_change_role")
+    signals.post_save.connect(handlers.refresh_users_summaries_when_change_userstory,
+                              sender=apps.get_model("userstories", "UserStory"),
+                              dispatch_uid="refresh_users_summaries_when_change_userstory")
+    signals.post_delete.connect(handlers.refresh_users_summaries_when_delete_userstory,
+                                sender=apps.get_model("userstories", "UserStory"),
+                                dispatch_uid="refresh_users_summaries_when_delete_userstory")
+
+
+def disconnect_users_summaries_signals():
+    signals.pre_save.disconnect(sender=apps.get_model("projects", "Membership"), dispatch_uid="cache_prev_membership_user")
+    signals.post_save.disconnect(sender=apps.get_model("projects", "Membership"), dispatch_uid="refresh_users_summaries_when_change_membership")
+    signals.post_delete.disconnect(sender=apps.get_model("projects", "Membership"), dispatch_uid="refresh_users_summaries_when_delete_membership")
+    signals.post_save.disconnect(sender=apps.get_model("users", "Role"), dispatch_uid="refresh_users_summaries_when_change_role")
+    signals.post_save.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="refresh_users_summaries_when_change_userstory")
+    signals.post_delete.disconnect(sender=apps.get_model("userstories", "UserStory"), dispatch_uid="refresh_users_summaries_when_delete_userstory")
+
+
+class UsersAppConfig(AppConfig):
+    name = "taiga.users"
+    verbose_name = "Users"
+
+    def ready(self):
+        signals.post_save.connect(handlers.clear_user_cache,
+                                  sender=apps.get_model("users", "User"),
+                                  dispatch_uid="invalidate_cached_user")
+        signals.post_delete.connect(handlers.clear_user_cache,
+                                    sender=apps.get_model("users", "User"),
+                                    dispatch_uid="invalidate_cached_user_delete")
+        connect_users_summaries_signals()
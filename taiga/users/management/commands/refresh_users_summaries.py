@@ -0,0 +1,55 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Recalculate the summaries of all the active users. The summaries are
+# kept updated by signals, run it periodically (daily, for example) to
+# fix any drift.
+#
+# Examples:
+# python manage.py refresh_users_summaries
+# python manage.py refresh_users_summaries --batch-size 1000
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from taiga.users.models import User
+from taiga.users.services import refresh_users_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the stored stats and contacts of the users'
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size',
+                    action='store',
+                    dest='batch_size',
+                    type='int',
+                    default=500,
+                    help='Number of users refreshed together'),
+        )
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        user_ids = list(User.objects.filter(is_active=True, is_system=False)
+                                    .order_by("id")
+                                    .values_list("id", flat=True))
+
+        for start in range(0, len(user_ids), batch_size):
+            refresh_users_summaries(user_ids[start:start + batch_size])
+            self.stdout.write("{0}/{1} users refreshed".format(min(start + batch_size, len(user_ids)),
+                                                               len(user_ids)))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+import django.utils.timezone
+import django_pgjson.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_user_theme'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSummary',
+            fields=[
+                ('user', models.OneToOneField(serialize=False, related_name='summary', primary_key=True, verbose_name='user', to=settings.AUTH_USER_MODEL)),
+                ('projects', django_pgjson.fields.JsonField(default={}, blank=True, verbose_name='projects')),
+                ('modified_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='modified date')),
+            ],
+            options={
+                'verbose_name_plural': 'user summaries',
+                'verbose_name': 'user summary',
+            },
+            bases=(models.Model,),
+        ),
+    ]
@@ -215,6 +215,27 @@ class Role(models.Model):
         return self.name
 
 
+class UserSummary(models.Model):
+    """
+    Precalculated data of the user profile, by project: the role of the
+    user, the other members (contacts) and the number of closed user
+    stories assigned to the user. It's filtered by the projects visible
+    by the viewer when it's used.
+    """
+    user = models.OneToOneField("users.User", primary_key=True, related_name="summary",
+                                verbose_name=_("user"))
+    projects = JsonField(null=False, blank=True, default={}, verbose_name=_("projects"))
+    modified_date = models.DateTimeField(null=False, blank=False, default=timezone.now,
+                                         verbose_name=_("modified date"))
+
+    class Meta:
+        verbose_name = "user summary"
+        verbose_name_plural = "user summaries"
+
+    def __str__(self):
+        return "User summary: {}".format(self.user_id)
+
+
 class AuthData(models.Model):
     user = models.ForeignKey('users.User', related_name="auth_data")
     key = models.SlugField(max_length=50)
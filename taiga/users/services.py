@@ -18,8 +18,14 @@
 This model contains a domain logic for users application.
 """
 
+from itertools import chain
+
 from django.apps import apps
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db.models import Count
 from django.db.models import Q
+from django.db.transaction import atomic
 from django.conf import settings
 from django.utils.translation import ugettext as _
 
@@ -27,7 +33,10 @@ from easy_thumbnails.files import get_thumbnailer
 from easy_thumbnails.exceptions import InvalidImageFormatError
 
 from taiga.base import exceptions as exc
+from taiga.base.utils.lru import LRUCache
+from taiga.base.utils.instrumentation import record_cache_lookup
 from taiga.base.utils.urls import get_absolute_url
+from taiga.celery import app
 
 from .gravatar import get_gravatar_url
 
@@ -54,6 +63,52 @@ def get_and_validate_user(*, username:str, password:str) -> bool:
     return user
 
 
+_users_cache = LRUCache(maxsize=getattr(settings, "USERS_LOCAL_CACHE_SIZE", 1000),
+                        timeout=getattr(settings, "USERS_LOCAL_CACHE_TIMEOUT", 5))
+
+
+def _make_user_cache_key(user_id):
+    return "users-user-{}".format(user_id)
+
+
+def get_cached_user(user_id):
+    """
+    Get a user by id trying first with a short lived in-process
+    cache and then with the shared cache, before hit the database.
+
+    Returns None if the user does not exist.
+    """
+    user_model = apps.get_model("users", "User")
+    timeout = getattr(settings, "USERS_CACHE_TIMEOUT", 60)
+    key = _make_user_cache_key(user_id)
+
+    # The field values are cached instead the instance, so every
+    # caller gets its own user object.
+    values = _users_cache.get(key)
+    if values is None:
+        values = cache.get(key)
+        record_cache_lookup(values is not None)
+        if values is None:
+            attnames = [f.attname for f in user_model._meta.concrete_fields]
+            values = user_model.objects.filter(pk=user_id).values_list(*attnames).first()
+            if values is None:
+                return None
+
+            cache.set(key, values, timeout)
+        _users_cache.set(key, values)
+
+    user = user_model(*values)
+    user._state.adding = False
+    user._state.db = "default"
+    return user
+
+
+def invalidate_cached_user(user_id):
+    key = _make_user_cache_key(user_id)
+    _users_cache.delete(key)
+    cache.delete(key)
+
+
 def get_photo_url(photo):
     """Get a photo absolute url and the photo automatically cropped."""
     try:
@@ -114,31 +169,89 @@ def get_visible_project_ids(from_user, by_user):
     return project_ids
 
 
-def get_stats_for_user(from_user, by_user):
-    """Get the user stats"""
+@app.task
+def refresh_users_summaries(user_ids):
+    """
+    Recalculate the summaries of some users with three grouped queries,
+    whatever the number of users.
+    """
+    user_ids = set(user_ids) - {None}
+    if not user_ids:
+        return
+
+    Membership = apps.get_model("projects", "Membership")
+    UserStory = apps.get_model("userstories", "UserStory")
+    UserSummary = apps.get_model("users", "UserSummary")
+
+    summaries = {user_id: {} for user_id in user_ids}
+    memberships = Membership.objects.filter(user_id__in=user_ids).values_list("user_id", "project_id", "role__name")
+    for user_id, project_id, role_name in memberships:
+        summaries[user_id][project_id] = {"role": role_name, "contacts": [], "closed_userstories": 0}
+
+    project_ids = set(chain.from_iterable(summaries.values()))
+
+    members_by_project = {}
+    members = Membership.objects.filter(project_id__in=project_ids, user__isnull=False)
+    for project_id, member_id in members.values_list("project_id", "user_id"):
+        members_by_project.setdefault(project_id, set()).add(member_id)
+
+    for user_id, projects in summaries.items():
+        for project_id, project in projects.items():
+            project["contacts"] = sorted(members_by_project.get(project_id, set()) - {user_id})
+
+    closed_userstories = UserStory.objects.filter(assigned_to_id__in=user_ids, is_closed=True,
+                                                  project_id__in=project_ids)
+    closed_userstories = closed_userstories.values("assigned_to_id", "project_id")
+    for row in closed_userstories.annotate(count=Count("id")).order_by():
+        project = summaries[row["assigned_to_id"]].get(row["project_id"], None)
+        if project is not None:
+            project["closed_userstories"] = row["count"]
+
+    # The keys of json objects are strings
+    summaries = [UserSummary(user_id=user_id, projects={str(k): v for k, v in projects.items()})
+                 for user_id, projects in summaries.items()]
+    try:
+        with atomic():
+            UserSummary.objects.filter(user_id__in=user_ids).delete()
+            UserSummary.objects.bulk_create(summaries)
+    except IntegrityError:
+        # Refreshed at the same time by another process
+        pass
+
+
+def get_user_summary(user):
+    """Get the summary of the user, by project id, calculating it if it doesn't exist."""
+    UserSummary = apps.get_model("users", "UserSummary")
+    qs = UserSummary.objects.filter(user_id=user.id).values_list("projects", flat=True)
+    projects = qs.first()
+    if projects is None:
+        refresh_users_summaries([user.id])
+        projects = qs.first() or {}
+
+    return {int(project_id): project for project_id, project in projects.items()}
+
+
+def _get_visible_user_summary(from_user, by_user):
     project_ids = get_visible_project_ids(from_user, by_user)
+    summary = get_user_summary(from_user)
+    return [summary[project_id] for project_id in project_ids if project_id in summary]
 
-    total_num_projects = len(project_ids)
 
-    roles = [_(r) for r in from_user.memberships.filter(project__id__in=project_ids).values_list("role__name", flat=True)]
-    roles = list(set(roles))
+def get_contact_ids_for_user(from_user, by_user):
+    """Get the ids of the contacts of one user visible by another"""
+    projects = _get_visible_user_summary(from_user, by_user)
+    return set(chain.from_iterable(project["contacts"] for project in projects))
 
-    User = apps.get_model('users', 'User')
-    total_num_contacts = User.objects.filter(memberships__project__id__in=project_ids)\
-        .exclude(id=from_user.id)\
-        .distinct()\
-        .count()
 
-    UserStory = apps.get_model('userstories', 'UserStory')
-    total_num_closed_userstories = UserStory.objects.filter(
-        is_closed=True,
-        project__id__in=project_ids,
-        assigned_to=from_user).count()
+def get_stats_for_user(from_user, by_user):
+    """Get the user stats"""
+    projects = _get_visible_user_summary(from_user, by_user)
 
+    contact_ids = set(chain.from_iterable(project["contacts"] for project in projects))
     project_stats = {
-        'total_num_projects': total_num_projects,
-        'roles': roles,
-        'total_num_contacts': total_num_contacts,
-        'total_num_closed_userstories': total_num_closed_userstories,
+        'total_num_projects': len(projects),
+        'roles': list(set(_(project["role"]) for project in projects)),
+        'total_num_contacts': len(contact_ids),
+        'total_num_closed_userstories': sum(project["closed_userstories"] for project in projects),
     }
     return project_stats
@@ -18,3 +18,89 @@ import django.dispatch
 
 
 user_cancel_account = django.dispatch.Signal(providing_args=["user", "request_data"])
+
+
+def clear_user_cache(sender, instance, **kwargs):
+    from .services import invalidate_cached_user
+    invalidate_cached_user(instance.pk)
+
+
+####################################
+# Signals for refresh the user summaries
+####################################
+
+def _refresh_users_summaries(user_ids):
+    from django.conf import settings
+    from django.db import connection
+    from .services import refresh_users_summaries
+
+    user_ids = list(set(user_ids) - {None})
+    if not user_ids:
+        return
+
+    if settings.CELERY_ENABLED:
+        # The worker must find the membership changes
+        connection.on_commit(lambda: refresh_users_summaries.delay(user_ids))
+    else:
+        refresh_users_summaries(user_ids)
+
+
+def _get_project_member_ids(project_id):
+    from django.apps import apps
+    Membership = apps.get_model("projects", "Membership")
+    return list(Membership.objects.filter(project_id=project_id, user__isnull=False)
+                                  .values_list("user_id", flat=True))
+
+
+def cache_prev_membership_user(sender, instance, **kwargs):
+    instance._prev_user_id = None
+    if instance.id:
+        instance._prev_user_id = (sender.objects.filter(id=instance.id)
+                                                .values_list("user_id", flat=True)
+                                                .first())
+
+
+def refresh_users_summaries_when_change_membership(sender, instance, created, **kwargs):
+    prev_user_id = getattr(instance, "_prev_user_id", None)
+    if instance.user_id is None and prev_user_id is None:
+        return
+
+    if created or instance.user_id != prev_user_id:
+        # The new member (an accepted invitation too) is a new contact
+        # of the rest of members
+        _refresh_users_summaries(_get_project_member_ids(instance.project_id) + [prev_user_id])
+    else:
+        _refresh_users_summaries([instance.user_id])
+
+
+def refresh_users_summaries_when_delete_membership(sender, instance, **kwargs):
+    if instance.user_id is None:
+        return
+
+    _refresh_users_summaries(_get_project_member_ids(instance.project_id) + [instance.user_id])
+
+
+def refresh_users_summaries_when_change_role(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    _refresh_users_summaries(instance.memberships.values_list("user_id", flat=True))
+
+
+def refresh_users_summaries_when_change_userstory(sender, instance, **kwargs):
+    # Only the closed user stories are counted. The previous version of
+    # the user story is cached by the userstories app on pre_save.
+    prev = getattr(instance, "prev", None)
+    prev_assigned_to_id, prev_is_closed = (prev.assigned_to_id, prev.is_closed) if prev else (None, False)
+    if not prev_is_closed and not instance.is_closed:
+        return
+
+    if (prev_assigned_to_id, prev_is_closed) == (instance.assigned_to_id, instance.is_closed):
+        return
+
+    _refresh_users_summaries([instance.assigned_to_id, prev_assigned_to_id])
+
+
+def refresh_users_summaries_when_delete_userstory(sender, instance, **kwargs):
+    if instance.is_closed:
+        _refresh_users_summaries([instance.assigned_to_id])
@@ -22,6 +22,8 @@ import pytest
 import django
 from .fixtures import *
 
+pytest_plugins = ["tests.query_budget"]
+
 
 def pytest_addoption(parser):
     parser.addoption("--runslow", action="store_true", help="run slow tests")
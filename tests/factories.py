@@ -432,15 +432,6 @@ class VoteFactory(Factory):
     user = factory.SubFactory("tests.factories.UserFactory")
 
 
-class VotesFactory(Factory):
-    class Meta:
-        model = "votes.Votes"
-        strategy = factory.CREATE_STRATEGY
-
-    content_type = factory.SubFactory("tests.factories.ContentTypeFactory")
-    object_id = factory.Sequence(lambda n: n)
-
-
 class ContentTypeFactory(Factory):
     class Meta:
         model = "contenttypes.ContentType"
@@ -77,9 +77,7 @@ def data():
     f.VoteFactory(content_type=project_ct, object_id=m.private_project2.pk, user=m.project_member_with_perms)
     f.VoteFactory(content_type=project_ct, object_id=m.private_project2.pk, user=m.project_owner)
 
-    f.VotesFactory(content_type=project_ct, object_id=m.public_project.pk, count=2)
-    f.VotesFactory(content_type=project_ct, object_id=m.private_project1.pk, count=2)
-    f.VotesFactory(content_type=project_ct, object_id=m.private_project2.pk, count=2)
+    Project.objects.filter(pk__in=[m.public_project.pk, m.private_project1.pk, m.private_project2.pk]).update(total_voters=2)
 
     return m
 
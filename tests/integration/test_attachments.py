@@ -1,8 +1,24 @@
+import os
+import time
+import uuid
 import pytest
+from unittest.mock import patch
 
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+
+from taiga.base.utils import json
+from taiga.projects.attachments import services
+from taiga.projects.attachments import tasks
+from taiga.projects.history.freeze_impl import extract_attachments
+from taiga.projects.issues.models import Issue
+
 from .. import factories as f
 
 pytestmark = pytest.mark.django_db
@@ -45,3 +61,202 @@ def test_create_attachment_on_wrong_project(client):
     client.login(issue1.owner)
     response = client.post(url, data)
     assert response.status_code == 400
+
+
+def test_attachments_with_the_same_content_share_the_stored_file():
+    attachment1 = f.AttachmentFactory.create(attached_file=SimpleUploadedFile("test.txt", b"test"))
+    attachment2 = f.AttachmentFactory.create(attached_file=SimpleUploadedFile("test.txt", b"test"))
+    attachment3 = f.AttachmentFactory.create(attached_file=SimpleUploadedFile("test.txt", b"other"))
+
+    assert attachment1.attached_file.name == attachment2.attached_file.name
+    assert attachment1.attached_file.name != attachment3.attached_file.name
+
+
+DUMMY_BMP_DATA = b'BM:\x00\x00\x00\x00\x00\x00\x006\x00\x00\x00(\x00\x00\x00\x01\x00\x00\x00\x01\x00\x00\x00\x01\x00\x18\x00\x00\x00\x00\x00\x04\x00\x00\x00\x13\x0b\x00\x00\x13\x0b\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+
+def _create_image_attachment(**kwargs):
+    # A new content every time, so the stored file has no thumbnails yet
+    data = DUMMY_BMP_DATA + uuid.uuid4().bytes
+    return f.AttachmentFactory.create(attached_file=SimpleUploadedFile("test.bmp", data), **kwargs)
+
+
+def _get_existing_thumbnail(attached_file):
+    return get_thumbnailer(attached_file).get_existing_thumbnail(aliases.get("timeline-image"))
+
+
+def test_generate_thumbnails_task(settings):
+    settings.CELERY_ENABLED = True
+    with patch("taiga.projects.attachments.tasks.generate_thumbnails.delay") as delay_mock:
+        attachment = _create_image_attachment()
+
+    delay_mock.assert_called_once_with(attachment.attached_file.name)
+    assert _get_existing_thumbnail(attachment.attached_file) is None
+
+    tasks.generate_thumbnails(attachment.attached_file.name)
+    assert _get_existing_thumbnail(attachment.attached_file) is not None
+
+
+def test_freeze_attachments_queues_the_missing_thumbnails(settings):
+    settings.CELERY_ENABLED = True
+    issue = f.IssueFactory.create()
+    content_type = ContentType.objects.get_for_model(Issue)
+
+    with patch("taiga.projects.attachments.tasks.generate_thumbnails.delay") as delay_mock:
+        attachment = _create_image_attachment(content_type=content_type, object_id=issue.id,
+                                              project=issue.project)
+        # The generation queued on upload is not queued again
+        frozen_attachments = list(extract_attachments(issue))
+        delay_mock.assert_called_once_with(attachment.attached_file.name)
+
+        delay_mock.reset_mock()
+        cache.delete(services._make_thumbnails_cache_key("generation", attachment.attached_file))
+        list(extract_attachments(issue))
+        delay_mock.assert_called_once_with(attachment.attached_file.name)
+
+    assert len(frozen_attachments) == 1
+
+    tasks.generate_thumbnails(attachment.attached_file.name)
+    thumbnail = _get_existing_thumbnail(attachment.attached_file)
+    assert frozen_attachments[0]["thumb_url"].endswith(thumbnail.url)
+
+    with patch("taiga.projects.attachments.tasks.generate_thumbnails.delay") as delay_mock:
+        assert list(extract_attachments(issue))[0]["thumb_url"] == frozen_attachments[0]["thumb_url"]
+
+    assert delay_mock.call_count == 0
+
+
+def test_freeze_attachments_doesnt_generate_the_thumbnails(settings):
+    settings.CELERY_ENABLED = False
+    issue = f.IssueFactory.create()
+    content_type = ContentType.objects.get_for_model(Issue)
+    attachment = _create_image_attachment(content_type=content_type, object_id=issue.id,
+                                          project=issue.project)
+    thumbnail = _get_existing_thumbnail(attachment.attached_file)
+    os.remove(thumbnail.path)
+    cache.delete(services._make_thumbnails_cache_key("generation", attachment.attached_file))
+
+    assert list(extract_attachments(issue))[0]["thumb_url"].endswith(thumbnail.url)
+    assert _get_existing_thumbnail(attachment.attached_file) is None
+
+
+def test_failed_thumbnails_are_not_queued_again(settings):
+    settings.CELERY_ENABLED = True
+    issue = f.IssueFactory.create()
+    content_type = ContentType.objects.get_for_model(Issue)
+
+    with patch("taiga.projects.attachments.tasks.generate_thumbnails.delay"):
+        attachment = f.AttachmentFactory.create(
+            attached_file=SimpleUploadedFile("corrupt.png", uuid.uuid4().bytes),
+            content_type=content_type, object_id=issue.id, project=issue.project)
+
+    tasks.generate_thumbnails(attachment.attached_file.name)
+    cache.delete(services._make_thumbnails_cache_key("generation", attachment.attached_file))
+
+    with patch("taiga.projects.attachments.tasks.generate_thumbnails.delay") as delay_mock:
+        assert list(extract_attachments(issue))[0]["thumb_url"] is None
+
+    assert delay_mock.call_count == 0
+
+
+def test_generate_attachments_thumbnails_command(settings):
+    settings.CELERY_ENABLED = True
+    with patch("taiga.projects.attachments.tasks.generate_thumbnails.delay"):
+        attachment = _create_image_attachment()
+        f.AttachmentFactory.create(attached_file=SimpleUploadedFile("test.txt", b"text"))
+
+    call_command("generate_attachments_thumbnails")
+
+    assert _get_existing_thumbnail(attachment.attached_file) is not None
+
+
+def test_create_attachment_from_a_chunked_upload(client):
+    us = f.UserStoryFactory.create()
+    f.MembershipFactory(project=us.project, user=us.owner, is_owner=True)
+    client.login(us.owner)
+
+    response = client.json.post(reverse("attachment-uploads-list"),
+                                json.dumps({"name": "test.txt", "size": 8}))
+    assert response.status_code == 201
+    upload = response.data["id"]
+    url = reverse("attachment-uploads-detail", args=[upload])
+
+    response = client.put(url, b"test", content_type="application/octet-stream",
+                          HTTP_CONTENT_RANGE="bytes 0-3/8")
+    assert response.status_code == 200
+    assert response.data["offset"] == 4
+
+    # A chunk that doesn't start at the received offset must be resent
+    response = client.put(url, b"data", content_type="application/octet-stream",
+                          HTTP_CONTENT_RANGE="bytes 6-9/8")
+    assert response.status_code == 400
+    response = client.put(url, b"da", content_type="application/octet-stream",
+                          HTTP_CONTENT_RANGE="bytes 6-7/8")
+    assert response.status_code == 409
+    assert response.data["offset"] == 4
+
+    # A resent chunk overwrites the received bytes
+    response = client.put(url, b"test", content_type="application/octet-stream",
+                          HTTP_CONTENT_RANGE="bytes 0-3/8")
+    assert response.status_code == 200
+    assert response.data["offset"] == 4
+
+    response = client.put(url, b"data", content_type="application/octet-stream",
+                          HTTP_CONTENT_RANGE="bytes 4-7/8")
+    assert response.status_code == 200
+    assert response.data["offset"] == 8
+
+    attachment_data = {"description": "test",
+                       "object_id": us.pk,
+                       "project": us.project_id,
+                       "upload": upload}
+    response = client.json.post(reverse("userstory-attachments-list"), json.dumps(attachment_data))
+    assert response.status_code == 201
+    assert response.data["name"] == "test.txt"
+    assert response.data["size"] == 8
+
+    response = client.get(url)
+    assert response.status_code == 404
+
+
+def test_chunked_upload_max_size(client, settings):
+    settings.ATTACHMENTS_UPLOADS_MAX_SIZE = 8
+    user = f.UserFactory.create()
+    client.login(user)
+
+    response = client.json.post(reverse("attachment-uploads-list"),
+                                json.dumps({"name": "test.txt", "size": 9}))
+    assert response.status_code == 400
+
+    response = client.json.post(reverse("attachment-uploads-list"),
+                                json.dumps({"name": "test.txt", "size": 8}))
+    assert response.status_code == 201
+
+
+def test_remove_expired_uploads(settings):
+    user = f.UserFactory.create()
+    expired_upload = services.get_upload(services.create_upload(user, "test.txt", 8), user)
+    upload = services.get_upload(services.create_upload(user, "test.txt", 8), user)
+
+    expired_time = time.time() - settings.ATTACHMENTS_UPLOADS_MAX_AGE - 60
+    os.utime(expired_upload["path"], (expired_time, expired_time))
+
+    call_command("remove_expired_uploads")
+
+    assert not os.path.exists(expired_upload["path"])
+    assert os.path.exists(upload["path"])
+
+
+def test_download_attachment_is_offloaded_to_the_web_server(client, settings):
+    settings.ATTACHMENTS_SENDFILE_HEADER = "X-Accel-Redirect"
+    us = f.UserStoryFactory.create()
+    f.MembershipFactory(project=us.project, user=us.owner, is_owner=True)
+    attachment = f.UserStoryAttachmentFactory(project=us.project, content_object=us, owner=us.owner)
+
+    url = reverse("userstory-attachments-download", args=[attachment.pk])
+
+    client.login(us.owner)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response["X-Accel-Redirect"] == "/protected/" + attachment.attached_file.name
+    assert response.content == b""
@@ -0,0 +1,142 @@
+import gzip
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test.client import RequestFactory
+
+from taiga.front import views
+from taiga.front.sitemaps import generator
+from taiga.front.sitemaps.projects import ProjectsSitemap
+from taiga.projects.models import Project
+
+from .. import factories as f
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sitemaps_path(settings, tmpdir):
+    settings.FRONT_SITEMAP_PATH = str(tmpdir)
+    return str(tmpdir)
+
+
+def _read_section(sitemaps_path, section, page=1):
+    file_name = generator.get_section_file_name(section, page)
+    with open(os.path.join(sitemaps_path, file_name), "rb") as f:
+        return gzip.decompress(f.read()).decode("utf-8")
+
+
+def _get_content(response):
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+def test_generate_sitemaps(sitemaps_path):
+    project = f.ProjectFactory.create(is_private=False)
+
+    generator.generate_sitemaps()
+
+    assert project.slug in _read_section(sitemaps_path, "projects")
+    with open(os.path.join(sitemaps_path, generator.INDEX_FILE_NAME)) as index:
+        assert generator.get_section_file_name("projects", 1) in index.read()
+
+
+def test_generate_only_the_modified_pages(sitemaps_path):
+    project = f.ProjectFactory.create(is_private=False)
+    page = generator._get_page(project)
+    generator.generate_sitemaps()
+    last_generation_date = generator.get_last_generation_date()
+
+    assert generator.generate_section("projects", ProjectsSitemap(), since=last_generation_date) == []
+
+    project.name = "New name"
+    project.save()
+
+    assert generator.generate_section("projects", ProjectsSitemap(), since=last_generation_date) == [page]
+
+
+def test_empty_pages_are_removed(sitemaps_path):
+    project = f.ProjectFactory.create(is_private=False)
+    generator.generate_sitemaps()
+    file_name = generator.get_section_file_name("projects", generator._get_page(project))
+    assert os.path.exists(os.path.join(sitemaps_path, file_name))
+
+    project.is_private = True
+    project.anon_permissions = []
+    project.save()
+    generator.generate_sitemaps()
+
+    assert not os.path.exists(os.path.join(sitemaps_path, file_name))
+
+
+def test_incremental_generation_removes_the_hidden_items(sitemaps_path):
+    project = f.ProjectFactory.create(is_private=False)
+    other_project = f.ProjectFactory.create(is_private=False)
+    generator.generate_sitemaps()
+    last_generation_date = generator.get_last_generation_date()
+
+    # Making a project private doesn't change its modified date in the items of the sitemap
+    project.is_private = True
+    project.anon_permissions = []
+    project.save()
+    Project.objects.filter(id=project.id).update(modified_date=last_generation_date)
+    generator.generate_sitemaps(incremental=True)
+
+    content = _read_section(sitemaps_path, "projects", generator._get_page(other_project))
+    assert other_project.slug in content
+    assert project.slug not in content
+
+
+def test_sitemap_views(sitemaps_path):
+    project = f.ProjectFactory.create(is_private=False)
+    request = RequestFactory().get("/front/sitemap.xml")
+
+    response = views.sitemap_index(request)
+    assert response.status_code == 503
+
+    generator.generate_sitemaps()
+
+    response = views.sitemap_index(request)
+    assert response.status_code == 200
+    assert generator.get_section_file_name("projects", 1) in _get_content(response)
+
+    response = views.sitemap(request, generator.get_section_file_name("projects", 1))
+    assert response.status_code == 200
+    assert project.slug in gzip.decompress(b"".join(response.streaming_content)).decode("utf-8")
+
+
+def test_sitemap_index_never_generates_the_sitemaps(sitemaps_path, settings):
+    settings.CELERY_ENABLED = False
+    generator.generate_sitemaps()
+    index_path = os.path.join(sitemaps_path, generator.INDEX_FILE_NAME)
+    old_time = time.time() - settings.FRONT_SITEMAP_CACHE_TIMEOUT - 60
+    os.utime(index_path, (old_time, old_time))
+    request = RequestFactory().get("/front/sitemap.xml")
+
+    with patch("taiga.front.sitemaps.generator.generate_sitemaps") as generate_mock:
+        assert views.sitemap_index(request).status_code == 200
+
+    assert not generate_mock.called
+
+
+def test_sitemap_index_queues_the_generation(sitemaps_path, settings):
+    settings.CELERY_ENABLED = True
+    cache.delete(views.GENERATION_CACHE_KEY)
+    request = RequestFactory().get("/front/sitemap.xml")
+
+    with patch("taiga.front.tasks.generate_sitemaps.delay") as delay_mock:
+        assert views.sitemap_index(request).status_code == 503
+        assert views.sitemap_index(request).status_code == 503
+
+        delay_mock.assert_called_once_with(incremental=False)
+
+        cache.delete(views.GENERATION_CACHE_KEY)
+        generator.generate_sitemaps()
+        index_path = os.path.join(sitemaps_path, generator.INDEX_FILE_NAME)
+        old_time = time.time() - settings.FRONT_SITEMAP_CACHE_TIMEOUT - 60
+        os.utime(index_path, (old_time, old_time))
+
+        assert views.sitemap_index(request).status_code == 200
+        delay_mock.assert_called_with(incremental=True)
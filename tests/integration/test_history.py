@@ -19,11 +19,14 @@ import pytest
 from unittest.mock import patch
 
 from django.core.urlresolvers import reverse
+from django.db import transaction as tx
 from .. import factories as f
 
 from taiga.base.utils import json
+from taiga.base.utils.instrumentation import get_lock_wait_metrics
 from taiga.projects.history import services
 from taiga.projects.history.models import HistoryEntry
+from taiga.projects.history.models import QueuedSnapshot
 from taiga.projects.history.choices import HistoryType
 from taiga.projects.history.services import make_key_from_model_object
 
@@ -97,6 +100,149 @@ def test_take_snapshot_from_deleted_object():
     assert qs_deleted.count() == 1
 
 
+@pytest.mark.django_db(transaction=True)
+def test_queued_snapshots_are_stored_in_order(settings):
+    settings.CELERY_ENABLED = True
+    issue = f.IssueFactory.create()
+    key = make_key_from_model_object(issue)
+
+    with patch("taiga.projects.history.services.store_queued_snapshots.delay") as delay_mock:
+        services.queue_snapshot(issue, user=issue.owner)
+        issue.subject = "new subject"
+        issue.save()
+        services.queue_snapshot(issue, user=issue.owner, comment="a comment")
+
+    assert delay_mock.call_count == 2
+    assert HistoryEntry.objects.count() == 0
+
+    services.store_queued_snapshots(key)
+
+    entries = list(HistoryEntry.objects.filter(key=key).order_by("created_at"))
+    assert [entry.type for entry in entries] == [HistoryType.create, HistoryType.change]
+    assert entries[1].diff["subject"][1] == "new subject"
+    assert entries[1].comment == "a comment"
+    assert QueuedSnapshot.objects.count() == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queued_snapshots_are_stored_after_commit(settings):
+    settings.CELERY_ENABLED = True
+    issue = f.IssueFactory.create()
+    key = make_key_from_model_object(issue)
+
+    with patch("taiga.projects.history.services.store_queued_snapshots.delay") as delay_mock:
+        with tx.atomic():
+            services.queue_snapshot(issue, user=issue.owner)
+            assert delay_mock.call_count == 0
+
+        delay_mock.assert_called_once_with(key)
+
+
+def test_take_snapshot_stores_the_queued_snapshots_before(settings):
+    settings.CELERY_ENABLED = True
+    settings.HISTORY_ASYNC_ENABLED = True
+    issue = f.IssueFactory.create()
+    key = make_key_from_model_object(issue)
+
+    with patch("taiga.projects.history.services.store_queued_snapshots.delay"):
+        services.queue_snapshot(issue, user=issue.owner)
+
+    services.take_snapshot(issue, user=issue.owner, delete=True)
+
+    entries = list(HistoryEntry.objects.filter(key=key).order_by("created_at"))
+    assert [entry.type for entry in entries] == [HistoryType.create, HistoryType.delete]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queued_snapshots_are_stored_with_the_object_as_it_was(settings):
+    settings.CELERY_ENABLED = True
+    issue = f.IssueFactory.create(subject="old subject")
+    key = make_key_from_model_object(issue)
+
+    with patch("taiga.projects.history.services.store_queued_snapshots.delay"):
+        services.queue_snapshot(issue, user=issue.owner)
+        issue.subject = "new subject"
+        issue.save()
+        services.queue_snapshot(issue, user=issue.owner)
+
+    with patch("taiga.projects.notifications.services.send_notifications") as send_notifications_mock:
+        services.store_queued_snapshots(key)
+
+    objs = [call[0][0] for call in send_notifications_mock.call_args_list]
+    assert [obj.subject for obj in objs] == ["old subject", "new subject"]
+    assert all(obj.pk == issue.pk for obj in objs)
+
+
+def test_get_modified_fields_includes_the_queued_snapshots(settings):
+    settings.CELERY_ENABLED = True
+    settings.HISTORY_ASYNC_ENABLED = True
+    issue = f.IssueFactory.create()
+
+    with patch("taiga.projects.history.services.store_queued_snapshots.delay"):
+        services.queue_snapshot(issue, user=issue.owner)
+        issue.subject = "new subject"
+        issue.save()
+        services.queue_snapshot(issue, user=issue.owner)
+
+    assert "subject" in services.get_modified_fields(issue, 1)
+    assert QueuedSnapshot.objects.count() == 0
+
+
+def test_take_snapshot_numbers_the_entries_of_the_object():
+    issue = f.IssueFactory.create()
+    key = make_key_from_model_object(issue)
+
+    services.take_snapshot(issue, user=issue.owner)
+    issue.subject = "new subject"
+    issue.save()
+    services.take_snapshot(issue, user=issue.owner)
+
+    entries = HistoryEntry.objects.filter(key=key).order_by("created_at")
+    assert [entry.key_version for entry in entries] == [1, 2]
+    assert get_lock_wait_metrics()["history:issues.issue"]["count"] >= 2
+
+
+def test_optimistic_snapshot_retries_on_conflict(settings):
+    settings.HISTORY_OPTIMISTIC_SNAPSHOTS = True
+    issue = f.IssueFactory.create()
+    key = make_key_from_model_object(issue)
+    services.take_snapshot(issue, user=issue.owner)
+
+    # The first attempt doesn't see the last entry, like a concurrent writer
+    get_last_snapshot_for_key = services._get_last_snapshot_for_key
+    stale_results = [(None, True, 0)]
+
+    def _get_last_snapshot_for_key(key):
+        if stale_results:
+            return stale_results.pop()
+        return get_last_snapshot_for_key(key)
+
+    conflicts = get_lock_wait_metrics().get("history:issues.issue", {}).get("conflicts", 0)
+
+    issue.subject = "new subject"
+    issue.save()
+    with patch("taiga.projects.history.services._get_last_snapshot_for_key",
+               side_effect=_get_last_snapshot_for_key):
+        entry = services.take_snapshot(issue, user=issue.owner)
+
+    assert entry.type == HistoryType.change
+    assert entry.key_version == 2
+    assert entry.diff["subject"][1] == "new subject"
+    assert HistoryEntry.objects.filter(key=key).count() == 2
+    assert get_lock_wait_metrics()["history:issues.issue"]["conflicts"] == conflicts + 1
+
+
+def test_optimistic_snapshot_retries_at_least_once(settings):
+    settings.HISTORY_OPTIMISTIC_SNAPSHOTS = True
+    settings.HISTORY_OPTIMISTIC_RETRIES = 0
+    issue = f.IssueFactory.create()
+
+    entry = services.take_snapshot(issue, user=issue.owner)
+
+    assert entry is not None
+    assert entry.type == HistoryType.create
+
+
 def test_real_snapshot_frequency(settings):
     settings.MAX_PARTIAL_DIFFS = 2
 
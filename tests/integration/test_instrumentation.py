@@ -0,0 +1,213 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import uuid
+
+import pytest
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from taiga.base.utils import json
+from taiga.base.utils.instrumentation import get_endpoint_metrics
+from taiga.base.utils.instrumentation import get_lock_wait_metrics
+from taiga.base.utils.instrumentation import record_requests
+
+from .. import factories as f
+from ..query_budget import check_query_budgets
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_request_metrics(client, settings):
+    settings.DEBUG = True
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+
+    url = reverse("projects-detail", args=[project.pk])
+    client.login(user)
+    with CaptureQueriesContext(connection) as captured, record_requests() as requests:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert len(requests) == 1
+    assert requests[0].endpoint == "projects-detail"
+    assert requests[0].view == "GET ProjectViewSet"
+    assert requests[0].queries == len(captured.captured_queries)
+    assert requests[0].payload_size == len(response.content)
+    assert response["X-Queries-Count"] == str(requests[0].queries)
+    assert response["X-Payload-Size"] == str(len(response.content))
+    assert get_endpoint_metrics()["projects-detail"]["requests"] >= 1
+
+
+def test_request_metrics_count_the_cache_lookups(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+    sprint = f.MilestoneFactory.create(project=project, owner=user)
+
+    url = reverse("milestones-stats", args=[sprint.pk])
+    client.login(user)
+    with record_requests() as requests:
+        client.get(url)
+        client.get(url)
+
+    assert requests[0].cache_misses >= 1
+    assert requests[1].cache_hits >= 1
+    assert requests[1].queries < requests[0].queries
+
+
+def test_request_metrics_count_the_history_lock_waits(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+    issue = f.IssueFactory.create(project=project, owner=user)
+
+    def get_lock_waits():
+        return get_lock_wait_metrics().get("history:issues.issue", {}).get("count", 0)
+
+    lock_waits = get_lock_waits()
+
+    url = reverse("issues-detail", args=[issue.pk])
+    client.login(user)
+    with record_requests() as requests:
+        response = client.json.patch(url, json.dumps({"subject": "new subject", "version": issue.version}))
+
+    assert response.status_code == 200
+    assert requests[0].lock_conflicts == 0
+    assert requests[0].lock_wait >= 0
+    assert get_lock_waits() == lock_waits + 1
+    assert "lock_wait" in get_endpoint_metrics()["issues-detail"]
+
+
+def test_request_metrics_of_streaming_responses(client):
+    project = f.ProjectFactory.create(userstories_csv_uuid=uuid.uuid4().hex)
+    f.UserStoryFactory.create(project=project)
+
+    url = "{}?uuid={}".format(reverse("userstories-csv"), project.userstories_csv_uuid)
+    with CaptureQueriesContext(connection) as captured, record_requests() as requests:
+        response = client.get(url)
+        # The metrics are recorded when the content is consumed
+        assert requests == []
+        content = b"".join(response.streaming_content)
+
+    assert len(requests) == 1
+    assert requests[0].endpoint == "userstories-csv"
+    assert requests[0].payload_size == len(content) > 0
+    assert requests[0].queries == len(captured.captured_queries)
+
+
+def test_check_query_budgets(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+
+    client.login(user)
+    with record_requests() as requests:
+        client.get(reverse("projects-detail", args=[project.pk]))
+
+    assert check_query_budgets(requests, {"projects-detail": 1000}) == []
+    assert check_query_budgets(requests, {"projects-list": 0}) == []
+
+    errors = check_query_budgets(requests, {"projects-detail": 0})
+    assert len(errors) == 1
+    assert errors[0].startswith("projects-detail (GET ProjectViewSet) ran")
+
+
+@pytest.mark.query_budget({"projects-detail": 60})
+def test_project_detail_query_budget(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+
+    client.login(user)
+    response = client.get(reverse("projects-detail", args=[project.pk]))
+    assert response.status_code == 200
+
+
+def _create_project_with_member():
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+    return project, user
+
+
+# Budgets with more items than queries, so they fail if the queries grow with the items
+
+@pytest.mark.query_budget({"userstories-list": 50, "userstories-filters-data": 50})
+def test_userstories_query_budget(client):
+    project, user = _create_project_with_member()
+    for i in range(50):
+        f.UserStoryFactory.create(project=project, owner=f.UserFactory.create(),
+                                  assigned_to=user, tags=["tag{}".format(i)])
+
+    client.login(user)
+    response = client.get(reverse("userstories-list") + "?project={}".format(project.id),
+                          HTTP_X_DISABLE_PAGINATION="1")
+    assert response.status_code == 200
+    assert len(response.data) == 50
+
+    response = client.get(reverse("userstories-filters-data") + "?project={}".format(project.id))
+    assert response.status_code == 200
+
+
+@pytest.mark.query_budget({"tasks-list": 50})
+def test_tasks_query_budget(client):
+    project, user = _create_project_with_member()
+    us = f.UserStoryFactory.create(project=project)
+    for i in range(50):
+        f.TaskFactory.create(project=project, user_story=us, owner=f.UserFactory.create(),
+                             assigned_to=user)
+
+    client.login(user)
+    response = client.get(reverse("tasks-list") + "?project={}".format(project.id),
+                          HTTP_X_DISABLE_PAGINATION="1")
+    assert response.status_code == 200
+    assert len(response.data) == 50
+
+
+@pytest.mark.query_budget({"issues-list": 50, "issues-filters-data": 50})
+def test_issues_query_budget(client):
+    project, user = _create_project_with_member()
+    for i in range(50):
+        f.IssueFactory.create(project=project, owner=f.UserFactory.create(), assigned_to=user,
+                              tags=["tag{}".format(i)])
+
+    client.login(user)
+    response = client.get(reverse("issues-list") + "?project={}".format(project.id),
+                          HTTP_X_DISABLE_PAGINATION="1")
+    assert response.status_code == 200
+    assert len(response.data) == 50
+
+    response = client.get(reverse("issues-filters-data") + "?project={}".format(project.id))
+    assert response.status_code == 200
+
+
+@pytest.mark.query_budget({"milestones-stats": 50})
+def test_milestones_stats_query_budget(client):
+    project, user = _create_project_with_member()
+    milestone = f.MilestoneFactory.create(project=project, owner=user)
+    for i in range(50):
+        us = f.UserStoryFactory.create(project=project, milestone=milestone)
+        f.TaskFactory.create(project=project, user_story=us, milestone=milestone)
+
+    client.login(user)
+    response = client.get(reverse("milestones-stats", args=[milestone.pk]))
+    assert response.status_code == 200
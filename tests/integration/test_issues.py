@@ -3,7 +3,10 @@ import csv
 
 from unittest import mock
 
+from django.contrib.contenttypes.models import ContentType
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from taiga.projects.issues import services, models
 from taiga.base.utils import json
@@ -415,3 +418,32 @@ def test_custom_fields_csv_generation():
     assert row[16] == attr.name
     row = next(reader)
     assert row[16] == "val1"
+
+
+def test_csv_generation_uses_constant_queries_per_chunk(settings):
+    settings.CSV_EXPORT_CHUNK_SIZE = 3
+    project = f.ProjectFactory.create(issues_csv_uuid=uuid.uuid4().hex)
+    f.IssueCustomAttributeFactory.create(project=project)
+    # Warm the content types cache, it's shared between requests
+    ContentType.objects.get_for_model(models.Issue)
+
+    def count_queries():
+        queryset = project.issues.all().order_by("ref")
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(services.iter_issues_csv(project, queryset))
+        return len(ctx.captured_queries), rows
+
+    def create_issues(n):
+        for i in range(n):
+            issue = f.IssueFactory.create(project=project, assigned_to=f.UserFactory.create())
+            f.IssueAttachmentFactory.create(project=project, content_object=issue)
+
+    # Two chunks with 4 and 6 issues
+    create_issues(4)
+    queries_with_four, rows = count_queries()
+    assert len(rows) == 5
+
+    create_issues(2)
+    queries_with_six, rows = count_queries()
+    assert len(rows) == 7
+    assert queries_with_six == queries_with_four
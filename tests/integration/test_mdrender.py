@@ -17,10 +17,13 @@
 
 import pytest
 
-from taiga.mdrender.service import render, render_and_extract
+from taiga.mdrender.service import render, render_and_extract, get_render_version
 
 from unittest.mock import MagicMock
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from .. import factories
 
 pytestmark = pytest.mark.django_db
@@ -47,7 +50,35 @@ def test_render_and_extract_mentions():
     (_, extracted) = render_and_extract(dummy_project, "**@user1**")
     assert extracted['mentions'] == [user]
 
+
+def test_render_and_extract_mentions_with_one_query():
+    user1 = factories.UserFactory(username="user1", full_name="test1")
+    user2 = factories.UserFactory(username="user2", full_name="test2")
+
+    with CaptureQueriesContext(connection) as ctx:
+        (_, extracted) = render_and_extract(dummy_project, "@user1 @user2 @user1 @nobody")
+
+    assert len(ctx.captured_queries) == 1
+    assert extracted['mentions'] == [user1, user2, user1]
+
 def test_proccessor_valid_email():
     result = render(dummy_project, "**beta.tester@taiga.io**")
     expected_result = "<p><strong><a href=\"mailto:beta.tester@taiga.io\" target=\"_blank\">beta.tester@taiga.io</a></strong></p>"
     assert result == expected_result
+
+
+def test_render_version_only_changes_with_the_referenced_values():
+    us = factories.UserStoryFactory.create(subject="old subject")
+    version = get_render_version(us.project)
+
+    us.description = "new description"
+    us.save()
+    assert get_render_version(us.project) == version
+
+    us.subject = "new subject"
+    us.save()
+    assert get_render_version(us.project) != version
+
+    version = get_render_version(us.project)
+    factories.UserStoryFactory.create(project=us.project)
+    assert get_render_version(us.project) != version
@@ -15,11 +15,18 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import datetime
 import pytest
 
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from taiga.base.utils import json
+from taiga.projects.milestones import models
+from taiga.projects.milestones import services as milestones_services
+from taiga.projects.userstories.models import UserStory
 from taiga.projects.userstories.serializers import UserStorySerializer
 
 from .. import factories as f
@@ -47,3 +54,99 @@ def test_update_milestone_with_userstories_list(client):
     client.login(user)
     response = client.json.patch(url, json.dumps(form_data))
     assert response.status_code == 200
+
+
+def test_milestone_stats_burndown(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    role = f.RoleFactory.create(project=project, computable=False)
+    f.MembershipFactory.create(project=project, user=user, role=role, is_owner=True)
+    start = datetime.date.today() - datetime.timedelta(days=4)
+    sprint = f.MilestoneFactory.create(project=project, owner=user, estimated_start=start,
+                                       estimated_finish=start + datetime.timedelta(days=7))
+    points = f.PointsFactory.create(project=project, value=2)
+    closed_status = f.UserStoryStatusFactory.create(project=project, is_closed=True)
+    open_status = f.UserStoryStatusFactory.create(project=project, is_closed=False)
+    closed_us = f.UserStoryFactory.create(project=project, owner=user, milestone=sprint, status=closed_status)
+    open_us = f.UserStoryFactory.create(project=project, owner=user, milestone=sprint, status=open_status)
+    f.RolePointsFactory.create(user_story=closed_us, role=role, points=points)
+    f.RolePointsFactory.create(user_story=open_us, role=role, points=points)
+
+    finish_date = datetime.datetime.combine(start + datetime.timedelta(days=1), datetime.time(12))
+    finish_date = timezone.make_aware(finish_date, timezone.get_default_timezone())
+    UserStory.objects.filter(id=closed_us.id).update(finish_date=finish_date)
+
+    url = reverse("milestones-stats", args=[sprint.pk])
+    client.login(user)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data["total_points"][role.id] == 4
+    assert response.data["completed_userstories"] == 1
+    assert len(response.data["days"]) == 8
+    assert [day["open_points"] for day in response.data["days"]] == [4, 2, 2, 2, 2, 2, 2, 2]
+
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    stats_queries = [q for q in captured.captured_queries if "generate_series" in q["sql"]]
+    assert len(stats_queries) == 0
+
+    open_us.status = closed_status
+    open_us.save()
+    response = client.get(url)
+    assert response.data["completed_userstories"] == 2
+    assert response.data["days"][-1]["open_points"] == 0
+
+
+def test_milestone_stats_are_invalidated_when_change_points_or_statuses():
+    project = f.ProjectFactory.create()
+    role = f.RoleFactory.create(project=project, computable=False)
+    sprint = f.MilestoneFactory.create(project=project)
+    points = f.PointsFactory.create(project=project, value=2)
+    status = f.UserStoryStatusFactory.create(project=project, is_closed=False)
+    us = f.UserStoryFactory.create(project=project, milestone=sprint, status=status)
+    role_points = f.RolePointsFactory.create(user_story=us, role=role, points=points)
+
+    assert milestones_services.get_milestone_stats(sprint)["total_points"][role.id] == 2
+
+    points.value = 5
+    points.save()
+    assert milestones_services.get_milestone_stats(sprint)["total_points"][role.id] == 5
+
+    role_points.delete()
+    assert role.id not in milestones_services.get_milestone_stats(sprint)["total_points"]
+
+    task_status = f.TaskStatusFactory.create(project=project, is_closed=False)
+    f.TaskFactory.create(project=project, milestone=sprint, status=task_status)
+    assert milestones_services.get_milestone_stats(sprint)["completed_tasks"] == 0
+
+    task_status.is_closed = True
+    task_status.save()
+    assert milestones_services.get_milestone_stats(sprint)["completed_tasks"] == 1
+
+
+def test_increment_points_by_milestone():
+    project = f.ProjectFactory.create()
+    role = f.RoleFactory.create(project=project, computable=False)
+    points = f.PointsFactory.create(project=project, value=3)
+    start = datetime.date.today() - datetime.timedelta(days=10)
+    sprint1 = f.MilestoneFactory.create(project=project, estimated_start=start,
+                                        estimated_finish=start + datetime.timedelta(days=7))
+    sprint2 = f.MilestoneFactory.create(project=project, estimated_start=start + datetime.timedelta(days=7),
+                                        estimated_finish=start + datetime.timedelta(days=14))
+
+    for client_requirement, team_requirement in [(True, False), (False, True), (True, True), (False, True)]:
+        us = f.UserStoryFactory.create(project=project, client_requirement=client_requirement,
+                                       team_requirement=team_requirement)
+        f.RolePointsFactory.create(user_story=us, role=role, points=points)
+    created_date = timezone.now() - datetime.timedelta(days=8)
+    UserStory.objects.filter(project=project, client_requirement=True).update(created_date=created_date)
+
+    milestones = milestones_services.attach_increment_points(project, [sprint1, sprint2])
+    for milestone in milestones:
+        expected = models.Milestone.objects.get(id=milestone.id)
+        assert milestone.client_increment_points == expected.client_increment_points
+        assert milestone.team_increment_points == expected.team_increment_points
+        assert milestone.shared_increment_points == expected.shared_increment_points
+
+    assert sum(milestones[0].client_increment_points.values()) == 4.5
+    assert sum(milestones[1].team_increment_points.values()) == 6
@@ -18,6 +18,8 @@ import pytest
 from unittest.mock import patch
 
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from taiga.base.utils import json
 
@@ -356,3 +358,42 @@ def test_invalid_save_without_version_parameter(client):
         data = {"subject": "test 1"}
         response = client.patch(url, json.dumps(data), content_type="application/json")
         assert response.status_code == 400
+
+
+def test_version_is_not_increased_when_the_save_fails(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+    us = f.UserStoryFactory.create(project=project, owner=user,
+                                   status=f.UserStoryStatusFactory.create(project=project))
+    client.login(user)
+
+    url = reverse("userstories-detail", args=(us.id,))
+    data = {"version": 1, "status": f.UserStoryStatusFactory.create().id}
+    response = client.patch(url, json.dumps(data), content_type="application/json")
+    assert response.status_code == 403
+
+    data = {"version": 1, "subject": "test 1"}
+    response = client.patch(url, json.dumps(data), content_type="application/json")
+    assert response.status_code == 200
+    assert response.data["version"] == 2
+
+
+def test_version_is_checked_and_increased_with_a_conditional_update(client):
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create(owner=user)
+    f.MembershipFactory.create(project=project, user=user, is_owner=True)
+    issue = f.IssueFactory.create(project=project, owner=user)
+    client.login(user)
+
+    url = reverse("issues-detail", args=(issue.id,))
+    data = {"version": issue.version, "subject": "new subject"}
+    with CaptureQueriesContext(connection) as captured:
+        response = client.patch(url, json.dumps(data), content_type="application/json")
+
+    assert response.status_code == 200
+    assert response.data["version"] == 2
+    version_updates = [q["sql"] for q in captured.captured_queries
+                       if q["sql"].startswith('UPDATE "issues_issue" SET "version" = ')]
+    assert len(version_updates) == 1
+    assert issue.__class__.objects.get(id=issue.id).version == 2
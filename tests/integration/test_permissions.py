@@ -1,7 +1,13 @@
 import pytest
 
+from unittest import mock
+
+from taiga.base import filters
 from taiga.permissions import service, permissions
+from taiga.projects.userstories.models import UserStory
 from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from .. import factories
 
@@ -113,3 +119,23 @@ def test_authenticated_user_has_perm_on_project_related_object():
 def test_authenticated_user_has_perm_on_invalid_object():
     user1 = factories.UserFactory()
     assert service.user_has_perm(user1, "test", user1) is False
+
+
+def test_permission_filter_backend_uses_one_query_with_many_memberships():
+    user = factories.UserFactory()
+    role = factories.RoleFactory(permissions=["view_us"])
+
+    for i in range(200):
+        membership = factories.MembershipFactory(user=user, role=role)
+        if i % 20 == 0:
+            factories.UserStoryFactory(project=membership.project)
+
+    request = mock.Mock(user=user, QUERY_PARAMS={})
+    view = mock.Mock(spec=[])
+
+    with CaptureQueriesContext(connection) as ctx:
+        queryset = filters.CanViewUsFilterBackend().filter_queryset(request, UserStory.objects.all(), view)
+        user_stories = list(queryset)
+
+    assert len(ctx.captured_queries) == 1
+    assert len(user_stories) == 10
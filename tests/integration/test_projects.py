@@ -1,5 +1,6 @@
 from django.core.urlresolvers import reverse
 from taiga.base.utils import json
+from taiga.projects import services
 from taiga.projects.services import stats as stats_services
 from taiga.projects.history.services import take_snapshot
 from taiga.permissions.permissions import ANON_PERMISSIONS
@@ -406,3 +407,43 @@ def test_projects_user_order(client):
     response_content = response.data
     assert response.status_code == 200
     assert(response_content[0]["id"] == project_2.id)
+
+
+def test_tags_dictionary_is_updated_with_the_items_tags():
+    project = f.ProjectFactory.create()
+    us = f.UserStoryFactory.create(project=project, tags=["back", "front"])
+    f.IssueFactory.create(project=project, tags=["back"])
+
+    def get_tags():
+        return {t["name"]: t["count"] for t in services.get_tags_dictionary(project)}
+
+    assert get_tags() == {"back": 2, "front": 1}
+
+    us.tags = ["front", "api"]
+    us.save()
+    assert get_tags() == {"back": 1, "front": 1, "api": 1}
+
+    us.delete()
+    assert get_tags() == {"back": 1}
+
+
+def test_tags_dictionary_accepts_long_tags():
+    project = f.ProjectFactory.create()
+    long_tag = "a" * 300
+    f.UserStoryFactory.create(project=project, tags=[long_tag])
+
+    assert [t["name"] for t in services.get_tags_dictionary(project)] == [long_tag]
+
+
+def test_get_project_tags_by_prefix(client):
+    user = f.UserFactory.create(is_superuser=True)
+    project = f.create_project(owner=user)
+    f.MembershipFactory(user=user, project=project, is_owner=True)
+    f.UserStoryFactory.create(project=project, tags=["backend", "frontend"])
+    f.TaskFactory.create(project=project, tags=["backlog"])
+
+    client.login(user)
+    url = reverse("projects-tags", args=(project.id,))
+    response = client.json.get(url + "?q=back")
+    assert response.status_code == 200
+    assert response.data == [{"name": "backend", "count": 1}, {"name": "backlog", "count": 1}]
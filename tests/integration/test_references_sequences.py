@@ -141,3 +141,29 @@ def test_regenerate_issue_reference_on_project_change(seq, refmodels):
     issue.save()
 
     assert issue.ref == 201
+
+
+@pytest.mark.django_db
+def test_reserve_references_in_bulk(seq, refmodels):
+    project = factories.ProjectFactory.create()
+    seqname = refmodels.make_sequence_name(project)
+    seq.alter(seqname, 100)
+
+    assert seq.next_values(seqname, 3) == [101, 102, 103]
+
+    owner = factories.UserFactory.create()
+    status = factories.UserStoryStatusFactory.create(project=project)
+    user_stories = [refmodels.UserStory(subject="US #{}".format(i), project=project,
+                                        owner=owner, status=status)
+                    for i in range(3)]
+
+    refmodels.reserve_references_in_bulk(user_stories, project)
+    assert [us.ref for us in user_stories] == [104, 105, 106]
+
+    for us in user_stories:
+        us.save()
+    assert [us.ref for us in user_stories] == [104, 105, 106]
+
+    refmodels.store_references_in_bulk(user_stories, project)
+    references = refmodels.Reference.objects.filter(project=project).order_by("ref")
+    assert [(r.ref, r.object_id) for r in references] == [(us.ref, us.id) for us in user_stories]
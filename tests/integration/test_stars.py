@@ -102,11 +102,10 @@ def test_list_user_starred_projects(client):
 
 def test_get_project_stars(client):
     user = f.UserFactory.create()
-    project = f.ProjectFactory.create(owner=user)
+    project = f.ProjectFactory.create(owner=user, total_voters=5)
     f.MembershipFactory.create(project=project, user=user, is_owner=True)
     url = reverse("projects-detail", args=(project.id,))
-    f.VotesFactory.create(content_object=project, count=5)
-    f.VotesFactory.create(count=3)
+    f.ProjectFactory.create(total_voters=3)
 
     client.login(user)
     response = client.get(url)
@@ -3,10 +3,13 @@ import csv
 
 from unittest import mock
 
+from django.contrib.contenttypes.models import ContentType
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from taiga.base.utils import json
-from taiga.projects.tasks import services
+from taiga.projects.tasks import services, models
 
 from .. import factories as f
 
@@ -166,3 +169,52 @@ def test_custom_fields_csv_generation():
     assert row[17] == attr.name
     row = next(reader)
     assert row[17] == "val1"
+
+
+def test_csv_generation_uses_constant_queries_per_chunk(settings):
+    settings.CSV_EXPORT_CHUNK_SIZE = 3
+    project = f.ProjectFactory.create(tasks_csv_uuid=uuid.uuid4().hex)
+    f.TaskCustomAttributeFactory.create(project=project)
+    # Warm the content types cache, it's shared between requests
+    ContentType.objects.get_for_model(models.Task)
+
+    def count_queries():
+        queryset = project.tasks.all().order_by("ref")
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(services.iter_tasks_csv(project, queryset))
+        return len(ctx.captured_queries), rows
+
+    def create_tasks(n):
+        for i in range(n):
+            task = f.TaskFactory.create(project=project, assigned_to=f.UserFactory.create())
+            f.TaskAttachmentFactory.create(project=project, content_object=task)
+
+    # Two chunks with 4 and 6 tasks
+    create_tasks(4)
+    queries_with_four, rows = count_queries()
+    assert len(rows) == 5
+
+    create_tasks(2)
+    queries_with_six, rows = count_queries()
+    assert len(rows) == 7
+    assert queries_with_six == queries_with_four
+
+
+def test_list_values_serializer_matches_list_serializer():
+    from taiga.projects.tasks.serializers import TaskListSerializer, TaskListValuesSerializer
+
+    project = f.ProjectFactory.create()
+    milestone = f.MilestoneFactory.create(project=project)
+    user = f.UserFactory.create()
+    us = f.UserStoryFactory.create(project=project, milestone=milestone)
+    task1 = f.TaskFactory.create(project=project, milestone=milestone, user_story=us,
+                                 assigned_to=user, tags=["back"], is_blocked=True,
+                                 blocked_note="blocked")
+    task1.watchers.add(user)
+    f.TaskFactory.create(project=project, milestone=None, user_story=None)
+
+    queryset = models.Task.objects.filter(project=project).order_by("id")
+    expected = TaskListSerializer(queryset, many=True).data
+    result = TaskListValuesSerializer(queryset, many=True).data
+
+    assert [dict(item) for item in expected] == result
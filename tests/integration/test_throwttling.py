@@ -15,11 +15,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pytest
+import threading
+import time
 from unittest import mock
 
 from django.core.urlresolvers import reverse
 from django.core.cache import cache
 
+from taiga.base.api import throttling
 from taiga.base.utils import json
 
 from .. import factories as f
@@ -122,3 +125,41 @@ def test_import_mode_throttling_policy(client, settings):
         assert response.status_code == 429
 
     client.logout()
+
+
+@pytest.mark.parametrize("storage_class", [throttling.CacheThrottleStorage,
+                                           throttling.LocalMemoryThrottleStorage])
+def test_throttle_storage_window(storage_class):
+    cache.clear()
+    storage = storage_class()
+
+    assert storage.hit("test-window", 2, 60, 1000) == (True, None)
+    assert storage.hit("test-window", 2, 60, 1010) == (True, None)
+    assert storage.hit("test-window", 2, 60, 1020) == (False, 40)
+
+    if storage_class is throttling.LocalMemoryThrottleStorage:
+        # The cache storage windows expire with the cache timeout
+        assert storage.hit("test-window", 2, 60, 1060) == (True, None)
+
+
+def test_throttle_storage_under_contention():
+    # The cache storage is only atomic with backends with an atomic incr
+    # (memcached, redis), not with the local memory cache used in tests
+    storage = throttling.LocalMemoryThrottleStorage()
+    results = []
+
+    def make_requests():
+        for i in range(50):
+            results.append(storage.hit("test-contention", 100, 60, time.time())[0])
+
+    threads = [threading.Thread(target=make_requests) for i in range(8)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+
+    assert len(results) == 400
+    assert results.count(True) == 100
+    assert elapsed < 5
@@ -17,17 +17,29 @@
 
 import pytest
 
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from .. import factories
 
+from taiga.base.utils.db import get_content_type_id_for_model
 from taiga.projects.history import services as history_services
 from taiga.timeline import service
-from taiga.timeline.models import Timeline
+from taiga.timeline import signals
+from taiga.timeline.models import Timeline, TimelineRebuildCheckpoint
 from taiga.timeline.serializers import TimelineSerializer
 
 
 pytestmark = pytest.mark.django_db
 
 
+def _add_to_object_timeline(obj, instance, event_type, created_datetime):
+    entry = service.build_timeline_entry(instance, event_type, created_datetime)
+    service.push_entry_to_timelines(entry, [(get_content_type_id_for_model(obj.__class__), obj.pk, "default")])
+
+
 def test_add_to_object_timeline():
     Timeline.objects.all().delete()
     user1 = factories.UserFactory()
@@ -35,7 +47,7 @@ def test_add_to_object_timeline():
 
     service.register_timeline_implementation("tasks.task", "test", lambda x, extra_data=None: str(id(x)))
 
-    service._add_to_object_timeline(user1, task, "test", task.created_date)
+    _add_to_object_timeline(user1, task, "test", task.created_date)
 
     assert Timeline.objects.filter(object_id=user1.id).count() == 2
     assert Timeline.objects.order_by("-id")[0].data == id(task)
@@ -54,11 +66,11 @@ def test_get_timeline():
 
     service.register_timeline_implementation("tasks.task", "test", lambda x, extra_data=None: str(id(x)))
 
-    service._add_to_object_timeline(user1, task1, "test", task1.created_date)
-    service._add_to_object_timeline(user1, task2, "test", task2.created_date)
-    service._add_to_object_timeline(user1, task3, "test", task3.created_date)
-    service._add_to_object_timeline(user1, task4, "test", task4.created_date)
-    service._add_to_object_timeline(user2, task1, "test", task1.created_date)
+    _add_to_object_timeline(user1, task1, "test", task1.created_date)
+    _add_to_object_timeline(user1, task2, "test", task2.created_date)
+    _add_to_object_timeline(user1, task3, "test", task3.created_date)
+    _add_to_object_timeline(user1, task4, "test", task4.created_date)
+    _add_to_object_timeline(user2, task1, "test", task1.created_date)
 
     assert Timeline.objects.filter(object_id=user1.id).count() == 5
     assert Timeline.objects.filter(object_id=user2.id).count() == 2
@@ -72,7 +84,7 @@ def test_filter_timeline_no_privileges():
     task1= factories.TaskFactory()
 
     service.register_timeline_implementation("tasks.task", "test", lambda x, extra_data=None: str(id(x)))
-    service._add_to_object_timeline(user1, task1, "test", task1.created_date)
+    _add_to_object_timeline(user1, task1, "test", task1.created_date)
     timeline = Timeline.objects.exclude(event_type="users.user.create")
     timeline = service.filter_timeline_for_user(timeline, user2)
     assert timeline.count() == 0
@@ -87,8 +99,8 @@ def test_filter_timeline_public_project():
     task2= factories.TaskFactory.create(project=project)
 
     service.register_timeline_implementation("tasks.task", "test", lambda x, extra_data=None: str(id(x)))
-    service._add_to_object_timeline(user1, task1, "test", task1.created_date)
-    service._add_to_object_timeline(user1, task2, "test", task2.created_date)
+    _add_to_object_timeline(user1, task1, "test", task1.created_date)
+    _add_to_object_timeline(user1, task2, "test", task2.created_date)
     timeline = Timeline.objects.exclude(event_type="users.user.create")
     timeline = service.filter_timeline_for_user(timeline, user2)
     assert timeline.count() == 1
@@ -103,8 +115,8 @@ def test_filter_timeline_private_project_anon_permissions():
     task2= factories.TaskFactory.create(project=project)
 
     service.register_timeline_implementation("tasks.task", "test", lambda x, extra_data=None: str(id(x)))
-    service._add_to_object_timeline(user1, task1, "test", task1.created_date)
-    service._add_to_object_timeline(user1, task2, "test", task2.created_date)
+    _add_to_object_timeline(user1, task1, "test", task1.created_date)
+    _add_to_object_timeline(user1, task2, "test", task2.created_date)
     timeline = Timeline.objects.exclude(event_type="users.user.create")
     timeline = service.filter_timeline_for_user(timeline, user2)
     assert timeline.count() == 1
@@ -122,8 +134,8 @@ def test_filter_timeline_private_project_member_permissions():
     task2= factories.TaskFactory.create(project=project)
 
     service.register_timeline_implementation("tasks.task", "test", lambda x, extra_data=None: str(id(x)))
-    service._add_to_object_timeline(user1, task1, "test", task1.created_date)
-    service._add_to_object_timeline(user1, task2, "test", task2.created_date)
+    _add_to_object_timeline(user1, task1, "test", task1.created_date)
+    _add_to_object_timeline(user1, task2, "test", task2.created_date)
     timeline = Timeline.objects.exclude(event_type="users.user.create")
     timeline = service.filter_timeline_for_user(timeline, user2)
     assert timeline.count() == 3
@@ -443,3 +455,53 @@ def test_timeline_error_use_member_ids_instead_of_memberships_ids():
     external_user_timeline = service.get_profile_timeline(external_user)
     assert len(external_user_timeline) == 1
     assert external_user_timeline[0].event_type == "users.user.create"
+
+
+def test_filter_timeline_for_user_does_not_query_content_types():
+    user = factories.UserFactory()
+    service.filter_timeline_for_user(Timeline.objects.all(), user)
+
+    with CaptureQueriesContext(connection) as captured:
+        service.filter_timeline_for_user(Timeline.objects.all(), user)
+
+    assert not [q for q in captured.captured_queries if "django_content_type" in q["sql"]]
+
+
+def test_related_people_timelines_are_resolved_in_one_query():
+    membership = factories.MembershipFactory.create()
+    inactive_user = factories.UserFactory.create(is_active=False)
+    system_user = factories.UserFactory.create(is_system=True)
+    user_story = factories.UserStoryFactory.create(subject="test us timeline", project=membership.project,
+                                                   assigned_to=membership.user)
+    user_story.watchers.add(membership.user, inactive_user, system_user)
+
+    with CaptureQueriesContext(connection) as captured:
+        related_people_ids = signals._get_related_people_ids(user_story.owner, user_story)
+
+    assert len(captured.captured_queries) == 1
+    assert sorted(related_people_ids) == sorted([user_story.owner.id, membership.user.id])
+
+    history_services.take_snapshot(user_story, user=user_story.owner)
+    assert service.get_profile_timeline(membership.user).filter(event_type="userstories.userstory.create").count() == 1
+    assert service.get_profile_timeline(inactive_user).filter(event_type="userstories.userstory.create").count() == 0
+    assert service.get_profile_timeline(system_user).filter(event_type="userstories.userstory.create").count() == 0
+
+
+def test_rebuild_timeline_command_is_resumable():
+    user_story = factories.UserStoryFactory.create(subject="test us timeline")
+    history_services.take_snapshot(user_story, user=user_story.owner)
+    project_timeline = service.get_project_timeline(user_story.project)
+    assert project_timeline.filter(event_type="userstories.userstory.create").count() == 1
+
+    call_command("rebuild_timeline", project=user_story.project.id)
+    assert project_timeline.filter(event_type="userstories.userstory.create").count() == 1
+    assert TimelineRebuildCheckpoint.objects.filter(project_id=user_story.project.id).exists()
+
+    Timeline.objects.filter(project=user_story.project).delete()
+    call_command("rebuild_timeline", project=user_story.project.id, resume=True)
+    assert project_timeline.filter(event_type="userstories.userstory.create").count() == 0
+
+
+def test_rebuild_timeline_command_rejects_purge_and_resume():
+    with pytest.raises(CommandError):
+        call_command("rebuild_timeline", purge=True, resume=True)
@@ -1,13 +1,20 @@
 import pytest
 from tempfile import NamedTemporaryFile
+from unittest.mock import patch
 
+from django.contrib.auth.models import AnonymousUser
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.db import transaction as tx
+from django.test.utils import CaptureQueriesContext
 
 from .. import factories as f
 
 from taiga.base.utils import json
 from taiga.users import models
+from taiga.users import services
 from taiga.auth.tokens import get_token_for_user
+from taiga.auth.services import private_register_for_existing_user
 from taiga.permissions.permissions import MEMBERS_PERMISSIONS, ANON_PERMISSIONS, USER_PERMISSIONS
 
 pytestmark = pytest.mark.django_db
@@ -249,3 +256,87 @@ def test_list_contacts_public_projects(client):
     response_content = response.data
     assert len(response_content) == 1
     assert response_content[0]["id"] == user_2.id
+
+
+def test_user_stats_are_refreshed_and_filtered_by_viewer():
+    user_1 = f.UserFactory.create()
+    user_2 = f.UserFactory.create()
+    user_3 = f.UserFactory.create()
+    public_project = f.ProjectFactory.create(anon_permissions=["view_project"])
+    private_project = f.ProjectFactory.create(anon_permissions=[])
+    public_role = f.RoleFactory(project=public_project, name="Back", permissions=["view_project"])
+    private_role = f.RoleFactory(project=private_project, name="Front", permissions=["view_project"])
+    f.MembershipFactory.create(project=public_project, user=user_1, role=public_role)
+    f.MembershipFactory.create(project=public_project, user=user_2, role=public_role)
+    f.MembershipFactory.create(project=private_project, user=user_1, role=private_role)
+    f.MembershipFactory.create(project=private_project, user=user_3, role=private_role)
+    us = f.UserStoryFactory.create(project=private_project, assigned_to=user_1)
+
+    us.status = f.UserStoryStatusFactory.create(project=private_project, is_closed=True)
+    us.save()
+
+    stats = services.get_stats_for_user(user_1, user_3)
+    assert stats["total_num_projects"] == 2
+    assert sorted(stats["roles"]) == ["Back", "Front"]
+    assert stats["total_num_contacts"] == 2
+    assert stats["total_num_closed_userstories"] == 1
+
+    anonymous_stats = services.get_stats_for_user(user_1, AnonymousUser())
+    assert anonymous_stats["total_num_projects"] == 1
+    assert anonymous_stats["roles"] == ["Back"]
+    assert anonymous_stats["total_num_contacts"] == 1
+    assert anonymous_stats["total_num_closed_userstories"] == 0
+
+
+def test_user_summaries_are_refreshed_when_accept_an_invitation():
+    member = f.UserFactory.create()
+    invited = f.UserFactory.create()
+    membership = f.MembershipFactory.create(user=member)
+    invitation = f.InvitationFactory.create(project=membership.project, role=membership.role)
+
+    assert services.get_contact_ids_for_user(member, member) == set()
+
+    private_register_for_existing_user(invitation.token, invited.username, invited.username)
+
+    assert services.get_contact_ids_for_user(member, member) == {invited.id}
+    assert services.get_contact_ids_for_user(invited, invited) == {member.id}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_user_summaries_are_refreshed_after_commit(settings):
+    settings.CELERY_ENABLED = True
+    user = f.UserFactory.create()
+    project = f.ProjectFactory.create()
+
+    with patch("taiga.users.services.refresh_users_summaries.delay") as delay_mock:
+        with tx.atomic():
+            f.MembershipFactory.create(project=project, user=user)
+            assert delay_mock.call_count == 0
+
+        assert delay_mock.call_count == 1
+        assert user.id in delay_mock.call_args[0][0]
+
+
+def test_user_stats_do_not_depend_on_the_number_of_projects():
+    user = f.UserFactory.create()
+
+    def count_queries():
+        services.get_stats_for_user(user, user)
+        with CaptureQueriesContext(connection) as ctx:
+            services.get_stats_for_user(user, user)
+        return len(ctx.captured_queries)
+
+    def create_project_with_closed_userstory():
+        membership = f.MembershipFactory.create(user=user, is_owner=True)
+        f.MembershipFactory.create(project=membership.project)
+        status = f.UserStoryStatusFactory.create(project=membership.project, is_closed=True)
+        f.UserStoryFactory.create(project=membership.project, assigned_to=user, status=status)
+
+    create_project_with_closed_userstory()
+    queries_with_one = count_queries()
+
+    for i in range(5):
+        create_project_with_closed_userstory()
+
+    assert count_queries() == queries_with_one == 2
+    assert services.get_stats_for_user(user, user)["total_num_closed_userstories"] == 6
@@ -1,9 +1,15 @@
 import copy
 import uuid
 import csv
+import time
+import tracemalloc
 
 from unittest import mock
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from taiga.base.utils import json
 from taiga.projects.userstories import services, models
@@ -73,6 +79,24 @@ def test_api_delete_userstory(client):
     assert response.status_code == 204
 
 
+def test_api_get_userstory_with_stored_description_html(client):
+    us = f.UserStoryFactory.create(description="**test**")
+    f.MembershipFactory.create(project=us.project, user=us.owner, is_owner=True)
+    assert us.description_html == "<p><strong>test</strong></p>"
+
+    url = reverse("userstories-detail", kwargs={"pk": us.pk})
+    client.login(us.owner)
+
+    # Without cached renders, every markdown render builds the html with _get_markdown
+    cache.clear()
+    with mock.patch("taiga.mdrender.service._get_markdown") as get_markdown:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.data["description_html"] == "<p><strong>test</strong></p>"
+    assert not get_markdown.called
+
+
 def test_api_filter_by_subject_or_ref(client):
     user = f.UserFactory.create()
     project = f.ProjectFactory.create(owner=user)
@@ -445,3 +469,124 @@ def test_custom_fields_csv_generation():
     assert row[24] == attr.name
     row = next(reader)
     assert row[24] == "val1"
+
+
+def test_csv_generation_uses_constant_queries_per_chunk(settings):
+    settings.CSV_EXPORT_CHUNK_SIZE = 3
+    project = f.ProjectFactory.create(userstories_csv_uuid=uuid.uuid4().hex)
+    f.UserStoryCustomAttributeFactory.create(project=project)
+    # Warm the content types cache, it's shared between requests
+    ContentType.objects.get_for_model(models.UserStory)
+
+    def count_queries():
+        queryset = project.user_stories.all().order_by("ref")
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(services.iter_userstories_csv(project, queryset))
+        return len(ctx.captured_queries), rows
+
+    def create_userstories(n):
+        for i in range(n):
+            us = f.UserStoryFactory.create(project=project)
+            f.UserStoryAttachmentFactory.create(project=project, content_object=us)
+            f.TaskFactory.create(project=project, user_story=us)
+
+    # Two chunks with 4 and 6 user stories
+    create_userstories(4)
+    queries_with_four, rows = count_queries()
+    assert len(rows) == 5
+
+    create_userstories(2)
+    queries_with_six, rows = count_queries()
+    assert len(rows) == 7
+    assert queries_with_six == queries_with_four
+
+
+def test_get_valid_csv_is_streamed(client):
+    url = reverse("userstories-csv")
+    project = f.ProjectFactory.create(userstories_csv_uuid=uuid.uuid4().hex)
+    f.UserStoryFactory.create(project=project, subject="streamed story")
+
+    response = client.get("{}?uuid={}".format(url, project.userstories_csv_uuid))
+    assert response.status_code == 200
+    assert response.streaming
+    content = b"".join(response.streaming_content).decode("utf-8")
+    assert "streamed story" in content
+
+
+def test_list_values_serializer_matches_list_serializer():
+    from taiga.projects.userstories.serializers import (UserStoryListSerializer,
+                                                        UserStoryListValuesSerializer)
+
+    project = f.ProjectFactory.create()
+    milestone = f.MilestoneFactory.create(project=project)
+    issue = f.IssueFactory.create(project=project)
+    user = f.UserFactory.create()
+    us1 = f.UserStoryFactory.create(project=project, milestone=milestone, assigned_to=user,
+                                    generated_from_issue=issue, tags=["back"])
+    us1.watchers.add(user)
+    role = f.RoleFactory.create(project=project, computable=True)
+    f.RolePointsFactory.create(user_story=us1, role=role,
+                               points=f.PointsFactory.create(project=project, value=3))
+    f.UserStoryFactory.create(project=project)
+
+    queryset = models.UserStory.objects.filter(project=project).order_by("id")
+    expected = UserStoryListSerializer(queryset, many=True).data
+    result = UserStoryListValuesSerializer(queryset, many=True).data
+
+    assert [dict(item) for item in expected] == result
+
+
+@pytest.mark.slow
+def test_list_values_serializer_benchmark():
+    from taiga.projects.userstories.serializers import (UserStoryListSerializer,
+                                                        UserStoryListValuesSerializer)
+
+    project = f.ProjectFactory.create()
+    owner = f.UserFactory.create()
+    milestone = f.MilestoneFactory.create(project=project)
+    role = f.RoleFactory.create(project=project, computable=True)
+    points = f.PointsFactory.create(project=project, value=3)
+    for i in range(200):
+        us = f.UserStoryFactory.create(project=project, owner=owner, assigned_to=owner,
+                                       milestone=milestone, tags=["back", "front"])
+        f.RolePointsFactory.create(user_story=us, role=role, points=points)
+
+    def measure(serializer_class):
+        queryset = models.UserStory.objects.filter(project=project).order_by("id")
+        tracemalloc.start()
+        start = time.perf_counter()
+        data = serializer_class(queryset, many=True).data
+        elapsed = time.perf_counter() - start
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed / len(data), peak / len(data)
+
+    list_time, list_memory = measure(UserStoryListSerializer)
+    values_time, values_memory = measure(UserStoryListValuesSerializer)
+
+    print("Per card: {:.3f}ms and {:.0f} bytes with UserStoryListSerializer, "
+          "{:.3f}ms and {:.0f} bytes with UserStoryListValuesSerializer".format(
+          list_time * 1000, list_memory, values_time * 1000, values_memory))
+
+    assert values_time < list_time
+    assert values_memory < list_memory
+
+
+def test_list_values_serializer_uses_constant_queries():
+    from taiga.projects.userstories.serializers import UserStoryListValuesSerializer
+
+    project = f.ProjectFactory.create()
+    owner = f.UserFactory.create()
+
+    def count_queries():
+        queryset = models.UserStory.objects.filter(project=project).order_by("id")
+        with CaptureQueriesContext(connection) as ctx:
+            UserStoryListValuesSerializer(queryset, many=True).data
+        return len(ctx.captured_queries)
+
+    f.UserStoryFactory.create(project=project, owner=owner)
+    queries_with_one = count_queries()
+
+    for i in range(10):
+        f.UserStoryFactory.create(project=project, owner=owner, milestone=None)
+    assert count_queries() == queries_with_one
@@ -81,10 +81,28 @@ def test_get_issue_votes(client):
     f.MembershipFactory.create(project=issue.project, user=user, is_owner=True)
     url = reverse("issues-detail", args=(issue.id,))
 
-    f.VotesFactory.create(content_object=issue, count=5)
+    issue.total_voters = 5
+    issue.save(update_fields=["total_voters"])
 
     client.login(user)
     response = client.get(url)
 
     assert response.status_code == 200
     assert response.data['votes'] == 5
+
+
+def test_list_issues_with_the_user_votes(client):
+    user = f.UserFactory.create()
+    issue = f.create_issue(owner=user)
+    other_issue = f.create_issue(owner=user, project=issue.project)
+    f.MembershipFactory.create(project=issue.project, user=user, is_owner=True)
+    f.VoteFactory.create(content_object=issue, user=user)
+    url = reverse("issues-list") + "?project={}".format(issue.project.id)
+
+    client.login(user)
+    response = client.get(url)
+
+    assert response.status_code == 200
+    is_voter = {data["id"]: data["is_voter"] for data in response.data}
+    assert is_voter == {issue.id: True, other_issue.id: False}
+    assert "total_voters" not in response.data[0]
@@ -18,8 +18,11 @@
 import pytest
 
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from taiga.projects.votes import services as votes, models
+from taiga.projects.models import Project
+from taiga.projects.votes import services as votes
 
 from .. import factories as f
 
@@ -28,42 +31,48 @@ pytestmark = pytest.mark.django_db
 
 def test_add_vote():
     project = f.ProjectFactory()
-    project_type = ContentType.objects.get_for_model(project)
     user = f.UserFactory()
-    votes_qs = models.Votes.objects.filter(content_type=project_type, object_id=project.id)
 
     votes.add_vote(project, user)
 
-    assert votes_qs.get().count == 1
+    assert project.total_voters == 1
+    assert Project.objects.get(id=project.id).total_voters == 1
 
     votes.add_vote(project, user)  # add_vote must be idempotent
 
-    assert votes_qs.get().count == 1
+    assert project.total_voters == 1
+    assert Project.objects.get(id=project.id).total_voters == 1
 
 
 def test_remove_vote():
     user = f.UserFactory()
-    project = f.ProjectFactory()
+    project = f.ProjectFactory(total_voters=1)
     project_type = ContentType.objects.get_for_model(project)
-    votes_qs = models.Votes.objects.filter(content_type=project_type, object_id=project.id)
-    f.VotesFactory(content_type=project_type, object_id=project.id, count=1)
     f.VoteFactory(content_type=project_type, object_id=project.id, user=user)
 
-    assert votes_qs.get().count == 1
-
     votes.remove_vote(project, user)
 
-    assert votes_qs.get().count == 0
+    assert project.total_voters == 0
+    assert Project.objects.get(id=project.id).total_voters == 0
 
     votes.remove_vote(project, user)  # remove_vote must be idempotent
 
-    assert votes_qs.get().count == 0
+    assert Project.objects.get(id=project.id).total_voters == 0
 
 
-def test_get_votes():
+def test_saving_a_voted_object_does_not_overwrite_its_votes():
     project = f.ProjectFactory()
-    project_type = ContentType.objects.get_for_model(project)
-    f.VotesFactory(content_type=project_type, object_id=project.id, count=4)
+    stale_project = Project.objects.get(id=project.id)
+
+    votes.add_vote(project, f.UserFactory())
+    stale_project.name = "New name"
+    stale_project.save()
+
+    assert Project.objects.get(id=project.id).total_voters == 1
+
+
+def test_get_votes():
+    project = f.ProjectFactory(total_voters=4)
 
     assert votes.get_votes(project) == 4
 
@@ -84,3 +93,19 @@ def test_get_voted():
     vote = f.VoteFactory(content_type=project_type, object_id=project.id)
 
     assert list(votes.get_voted(vote.user, type(project))) == [project]
+
+
+def test_get_voted_ids():
+    user = f.UserFactory()
+    project1 = f.ProjectFactory()
+    project2 = f.ProjectFactory()
+    project3 = f.ProjectFactory()
+    f.VoteFactory(content_object=project1, user=user)
+    f.VoteFactory(content_object=project3, user=user)
+    f.VoteFactory(content_object=project2)
+
+    with CaptureQueriesContext(connection) as captured:
+        voted_ids = votes.get_voted_ids(user, Project, [project1.id, project2.id])
+
+    assert voted_ids == {project1.id}
+    assert len(captured) == 1
@@ -0,0 +1,65 @@
+# Copyright (C) 2014 Andrey Antukh <niwi@niwi.be>
+# Copyright (C) 2014 Jesús Espino <jespinog@gmail.com>
+# Copyright (C) 2014 David Barragán <bameda@dbarragan.com>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Query budgets of the API endpoints. A test declares the maximum number
+of queries of the requests to every endpoint (by url name):
+
+    @pytest.mark.query_budget({"issues-list": 10, "issues-detail": 8})
+    def test_issues_api(client):
+        ...
+
+and fails when one of them runs more.
+"""
+
+import pytest
+
+from taiga.base.utils.instrumentation import record_requests
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "query_budget(budgets): maximum number of queries of the "
+                                       "requests to every endpoint (by url name)")
+
+
+def check_query_budgets(requests, budgets:dict):
+    """
+    Get the error messages of the requests that exceed their budget.
+    """
+    errors = []
+    for request in requests:
+        budget = budgets.get(request.endpoint)
+        if budget is not None and request.queries > budget:
+            errors.append("{} ({}) ran {} queries, the budget is {}".format(
+                          request.endpoint, request.view, request.queries, budget))
+    return errors
+
+
+@pytest.yield_fixture(autouse=True)
+def _query_budget(request):
+    marker = request.node.get_marker("query_budget")
+    if marker is None:
+        yield
+        return
+
+    budgets = marker.args[0]
+    with record_requests() as requests:
+        yield
+
+    errors = check_query_budgets(requests, budgets)
+    if errors:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(errors), pytrace=False)
@@ -15,46 +15,38 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from unittest.mock import patch, call
+from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
 
 from taiga.timeline import service
 from taiga.timeline.models import Timeline
-from taiga.projects.models import Project
-from taiga.users.models import User
 
 import pytest
 
 
-def test_push_to_timeline_many_objects():
-    with patch("taiga.timeline.service._add_to_object_timeline") as mock:
-        users = [User(), User(), User()]
-        project = Project()
-        service.push_to_timeline(users, project, "test", project.created_date)
-        assert mock.call_count == 3
-        assert mock.mock_calls == [
-            call(users[0], project, "test", project.created_date, "default", {}),
-            call(users[1], project, "test", project.created_date, "default", {}),
-            call(users[2], project, "test", project.created_date, "default", {}),
-        ]
-        with pytest.raises(Exception):
-            service.push_to_timeline(None, project, "test")
-
-
-def test_add_to_objects_timeline():
-    with patch("taiga.timeline.service._add_to_object_timeline") as mock:
-        users = [User(), User(), User()]
-        project = Project()
-        service._add_to_objects_timeline(users, project, "test", project.created_date)
-        assert mock.call_count == 3
-        assert mock.mock_calls == [
-            call(users[0], project, "test", project.created_date, "default", {}),
-            call(users[1], project, "test", project.created_date, "default", {}),
-            call(users[2], project, "test", project.created_date, "default", {}),
-        ]
-        with pytest.raises(Exception):
-            service.push_to_timeline(None, project, "test")
+def test_build_timelines_entries():
+    entry = {"event_type": "projects.project.test", "project_id": 1, "data": {"test": "data"},
+             "data_content_type_id": 2, "created": None}
+    timelines = [(3, 1, "default"), (3, 2, "user:2")]
+
+    result = service.build_timelines_entries(entry, timelines)
+
+    assert [(t.content_type_id, t.object_id, t.namespace) for t in result] == timelines
+    assert all(t.event_type == "projects.project.test" and t.project_id == 1 for t in result)
+    assert all(t.data == {"test": "data"} and t.data_content_type_id == 2 for t in result)
+
+
+def test_push_entry_to_timelines():
+    entry = {"event_type": "projects.project.test", "project_id": 1, "data": {},
+             "data_content_type_id": 2, "created": None}
+    timelines = [(3, 1, "default"), (3, 2, "default"), (3, 3, "default")]
+
+    with patch.object(Timeline.objects, "bulk_create") as mock:
+        service.push_entry_to_timelines(entry, timelines)
+
+    assert mock.call_count == 1
+    assert [t.object_id for t in mock.call_args[0][0]] == [1, 2, 3]
 
 
 def test_get_impl_key_from_model():
@@ -19,8 +19,12 @@ import pytest
 
 from .. import factories as f
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from taiga.base import exceptions as exc
 from taiga.auth.tokens import get_token_for_user, get_user_for_token
+from taiga.users.services import invalidate_cached_user
 
 
 pytestmark = pytest.mark.django_db
@@ -51,3 +55,25 @@ def test_invalid_token_scope():
     user = f.UserFactory.create(email="old@email.com")
     token = get_token_for_user(user, "testing_scope")
     get_user_for_token(token, "testing_invalid_scope")
+
+
+def test_valid_token_cached():
+    user = f.UserFactory.create(email="old@email.com")
+    invalidate_cached_user(user.id)
+    token = get_token_for_user(user, "testing_scope")
+
+    with CaptureQueriesContext(connection) as ctx:
+        get_user_for_token(token, "testing_scope")
+        user_from_token = get_user_for_token(token, "testing_scope")
+
+    assert len(ctx.captured_queries) == 1
+    assert user.id == user_from_token.id
+    assert user.email == user_from_token.email
+
+
+@pytest.mark.xfail(raises=exc.NotAuthenticated)
+def test_invalid_cached_token_expiration():
+    user = f.UserFactory.create(email="old@email.com")
+    token = get_token_for_user(user, "testing_scope")
+    get_user_for_token(token, "testing_scope")
+    get_user_for_token(token, "testing_scope", max_age=-1)
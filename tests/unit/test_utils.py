@@ -20,6 +20,8 @@ import django_sites as sites
 
 from taiga.base.utils.urls import get_absolute_url, is_absolute_url, build_url
 from taiga.base.utils.db import save_in_bulk, update_in_bulk, update_in_bulk_with_ids
+from taiga.base.utils.db import get_typename_for_model_instance, get_model_from_typename
+from taiga.projects.userstories.models import UserStory
 
 
 def test_is_absolute_url():
@@ -89,3 +91,12 @@ def test_update_in_bulk_with_ids():
     ]
 
     model.objects.filter.assert_has_calls(expected_calls)
+
+
+def test_get_typename_for_model_instance():
+    # Unit tests can't access the database, so this runs without queries
+    assert get_typename_for_model_instance(UserStory()) == "userstories.userstory"
+
+
+def test_get_model_from_typename():
+    assert get_model_from_typename("userstories.userstory") is UserStory